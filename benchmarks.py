@@ -0,0 +1,773 @@
+"""Headless benchmarks and reports for the data structures and algorithms.
+
+Run ``python benchmarks.py`` to print every report, or pass report names
+(e.g. ``python benchmarks.py node-memory``) to run a subset.
+"""
+
+import argparse
+import gc
+import math
+import queue
+import random
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+from data_structures import (
+    DATA_STRUCTURES,
+    ArrayStructure,
+    AVLTree,
+    BlockingQueue,
+    BloomFilter,
+    ConcurrentStack,
+    CountMinSketch,
+    DisjointSet,
+    DoublyLinkedNode,
+    HashTable,
+    LFUCache,
+    LRUCache,
+    Node,
+    PersistentHeap,
+    PersistentList,
+    PersistentQueue,
+    PersistentStack,
+    Queue,
+    RadixTree,
+    RedBlackTree,
+    Rope,
+    SinglyLinkedNode,
+    SizedTreeNode,
+    SkipList,
+    TreeNode,
+    TwoLockQueue,
+    deep_memory,
+)
+from sorting import (
+    heap_top_k,
+    median_of_medians_fast,
+    quickselect_fast,
+    top_k_fast,
+)
+
+
+def percentile(sorted_samples, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return 0
+    index = min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))
+    return sorted_samples[index]
+
+
+def _allocated_bytes(factory, count):
+    """Return the bytes allocated while building ``count`` objects"""
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    objects = [factory(None) for _ in range(count)]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Don't charge the holding list to the nodes
+    list_bytes = len(objects) * 8
+    del objects
+    return end - start - list_bytes
+
+
+def node_memory_report(count=100_000):
+    """Per-node overhead of the legacy ``Node`` versus the slotted node types"""
+    baseline = _allocated_bytes(Node, count) / count
+    rows = [("Node (legacy, __dict__)", baseline, baseline)]
+    for label, factory in (
+        ("SinglyLinkedNode", SinglyLinkedNode),
+        ("DoublyLinkedNode", DoublyLinkedNode),
+        ("TreeNode", TreeNode),
+        ("SizedTreeNode", SizedTreeNode),
+    ):
+        rows.append((label, _allocated_bytes(factory, count) / count, baseline))
+
+    lines = ["Node memory ({:,} elements)".format(count)]
+    lines.append("{:<26}{:>14}{:>12}".format("node type", "bytes/elem", "vs legacy"))
+    for label, per_element, base in rows:
+        lines.append(
+            "{:<26}{:>14.1f}{:>11.0%}".format(label, per_element, per_element / base)
+        )
+    return "\n".join(lines)
+
+
+def sorted_insert_report(count=100_000):
+    """Adversarial sorted inserts: balanced trees must stay O(log n) deep"""
+    lines = ["Sorted inserts ({:,} keys, ascending)".format(count)]
+    lines.append(
+        "{:<16}{:>12}{:>14}{:>10}{:>12}".format(
+            "structure", "seconds", "inserts/sec", "height", "search/sec"
+        )
+    )
+    for label, cls in (("AVL Tree", AVLTree), ("Red-Black Tree", RedBlackTree)):
+        tree = cls()
+        start = time.perf_counter()
+        for key in range(count):
+            tree.insert_fast(key)
+        insert_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for key in range(count):
+            tree.search_fast(key)
+        search_time = time.perf_counter() - start
+
+        lines.append(
+            "{:<16}{:>12.3f}{:>14,.0f}{:>10}{:>12,.0f}".format(
+                label,
+                insert_time,
+                count / insert_time,
+                tree.height(),
+                count / search_time,
+            )
+        )
+    lines.append(
+        "An unbalanced BST would reach height {:,}; log2(n) = {:.1f}".format(
+            count, math.log2(count)
+        )
+    )
+    return "\n".join(lines)
+
+
+def hash_table_report(count=200_000, seed=7):
+    """Throughput and tail latency of HashTable against the built-in dict,
+    on random keys and on sequential ones (ids), whose raw hashes are
+    consecutive. After the lookups every other key is deleted and then
+    searched for again, which walks any tombstone clusters."""
+    key_sets = (
+        ("random", random.Random(seed).sample(range(count * 10), count)),
+        ("sequential", list(range(count))),
+    )
+    perf_counter_ns = time.perf_counter_ns
+
+    def run(keys, insert, lookup, delete):
+        timings = {}
+        deleted = keys[::2]
+        gc.disable()  # keep collector pauses out of the tail
+        for name, op, batch in (
+            ("insert", insert, keys),
+            ("lookup", lookup, keys),
+            ("delete", delete, deleted),
+            ("miss", lookup, deleted),
+        ):
+            samples = []
+            start = perf_counter_ns()
+            for key in batch:
+                t0 = perf_counter_ns()
+                op(key)
+                samples.append(perf_counter_ns() - t0)
+            elapsed = (perf_counter_ns() - start) / 1e9
+            samples.sort()
+            timings[name] = (len(batch) / elapsed, samples)
+        gc.enable()
+        return timings
+
+    candidates = [("dict", None)]
+    for probing in HashTable.PROBING:
+        candidates.append(("{} (incremental)".format(probing), (probing, 4)))
+        candidates.append(("{} (stop-the-world)".format(probing), (probing, None)))
+
+    lines = ["Hash tables ({:,} int keys; latencies in microseconds)".format(count)]
+    lines.append(
+        "{:<12}{:<28}{:<8}{:>12}{:>8}{:>8}{:>9}{:>10}".format(
+            "keys", "structure", "op", "ops/sec", "p50", "p99", "p99.9", "max"
+        )
+    )
+    for key_label, keys in key_sets:
+        for label, config in candidates:
+            if config is None:
+                table = {}
+                timings = run(
+                    keys,
+                    lambda key: table.__setitem__(key, key),
+                    table.get,
+                    table.pop,
+                )
+            else:
+                probing, batch = config
+                table = HashTable(probing=probing, migrate_batch=batch)
+                timings = run(
+                    keys,
+                    lambda key: table.insert_fast(key, key),
+                    table.get,
+                    table.delete_fast,
+                )
+            for op, (throughput, samples) in timings.items():
+                lines.append(
+                    "{:<12}{:<28}{:<8}{:>12,.0f}{:>8.2f}{:>8.2f}{:>9.2f}{:>10.1f}".format(
+                        key_label,
+                        label,
+                        op,
+                        throughput,
+                        percentile(samples, 0.50) / 1000,
+                        percentile(samples, 0.99) / 1000,
+                        percentile(samples, 0.999) / 1000,
+                        samples[-1] / 1000,
+                    )
+                )
+    return "\n".join(lines)
+
+
+def ordered_map_report(count=100_000, seed=11):
+    """Skip list against the balanced BSTs on random keys"""
+    rng = random.Random(seed)
+    keys = rng.sample(range(count * 10), count)
+    lookups = [rng.choice(keys) for _ in range(count)]
+    scans = [
+        (low, low + 500) for low in (rng.randrange(count * 10) for _ in range(1000))
+    ]
+
+    lines = ["Ordered maps ({:,} random keys; operations per second)".format(count)]
+    lines.append(
+        "{:<16}{:>12}{:>12}{:>14}{:>12}".format(
+            "structure", "insert", "search", "range scan", "delete"
+        )
+    )
+    for label, factory in (
+        ("Skip List", lambda: SkipList(seed=seed)),
+        ("AVL Tree", AVLTree),
+        ("Red-Black Tree", RedBlackTree),
+    ):
+        structure = factory()
+        rates = []
+        for op, args in (
+            (structure.insert_fast, [(key,) for key in keys]),
+            (structure.search_fast, [(key,) for key in lookups]),
+            (structure.range_query_fast, scans),
+            (structure.delete_fast, [(key,) for key in keys]),
+        ):
+            start = time.perf_counter()
+            for call_args in args:
+                op(*call_args)
+            rates.append(len(args) / (time.perf_counter() - start))
+        lines.append(
+            "{:<16}{:>12,.0f}{:>12,.0f}{:>14,.0f}{:>12,.0f}".format(label, *rates)
+        )
+    return "\n".join(lines)
+
+
+def union_find_report(count=200_000, stream=1_000_000, seed=3):
+    """Connectivity queries interleaved with unions over a random edge stream"""
+    rng = random.Random(seed)
+    edges = [(rng.randrange(count), rng.randrange(count)) for _ in range(stream)]
+    components = DisjointSet(range(count))
+    union, connected = components.union_fast, components.connected
+
+    start = time.perf_counter()
+    for i, (u, v) in enumerate(edges):
+        if i % 2:
+            connected(u, v)
+        else:
+            union(u, v)
+    elapsed = time.perf_counter() - start
+
+    # Longest remaining pointer chain after path compression
+    parent = components.parent
+    depth = 0
+    for i in range(count):
+        hops = 0
+        while parent[i] != i:
+            i = parent[i]
+            hops += 1
+        depth = max(depth, hops)
+
+    lines = ["Union-find ({:,} elements, {:,} mixed operations)".format(count, stream)]
+    lines.append("{:<24}{:>14,.0f}".format("operations/sec", stream / elapsed))
+    lines.append("{:<24}{:>14,}".format("components left", components.count))
+    lines.append("{:<24}{:>14}".format("max pointer chain", depth))
+    return "\n".join(lines)
+
+
+def _traced_bytes(build):
+    """Bytes still allocated by whatever ``build()`` returns"""
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    kept = build()
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return end - start
+
+
+def persistent_history_report(count=5_000):
+    """Memory for a full undo history: persistent versions vs array snapshots"""
+    lines = ["Version history ({:,} inserts, every version kept)".format(count)]
+    lines.append(
+        "{:<20}{:>18}{:>18}{:>10}".format(
+            "structure", "persistent B/ver", "copies B/ver", "ratio"
+        )
+    )
+
+    def snapshots():
+        # What a mutable structure needs: one to_array() copy per step
+        items = []
+        history = []
+        for value in range(count):
+            items.append(value)
+            history.append(list(items))
+        return history
+
+    copied = _traced_bytes(snapshots) / count
+    for label, cls, op in (
+        ("Persistent List", PersistentList, "append_fast"),
+        ("Persistent Stack", PersistentStack, "push_fast"),
+        ("Persistent Queue", PersistentQueue, "enqueue_fast"),
+        ("Persistent Heap", PersistentHeap, "insert_fast"),
+    ):
+
+        def persistent():
+            structure = cls()
+            insert = getattr(structure, op)
+            for value in range(count):
+                insert(value)
+            return structure
+
+        shared = _traced_bytes(persistent) / count
+        lines.append(
+            "{:<20}{:>18,.0f}{:>18,.0f}{:>9.0f}x".format(
+                label, shared, copied, copied / shared
+            )
+        )
+    return "\n".join(lines)
+
+
+def zipf_trace(keys, length, exponent, seed=0):
+    """Synthetic access trace where key rank r has weight 1 / r**exponent"""
+    weights = 1.0 / np.arange(1, keys + 1) ** exponent
+    rng = np.random.default_rng(seed)
+    # Shuffle ranks so popular keys are not simply the small integers
+    ranks = rng.permutation(keys)
+    return ranks[rng.choice(keys, size=length, p=weights / weights.sum())].tolist()
+
+
+def cache_report(keys=100_000, length=500_000, seed=5):
+    """Replay Zipf traces through the caches: hit rate and ops/sec"""
+    missing = object()
+    lines = [
+        "Cache trace replay ({:,} keys, {:,} requests; read-through)".format(
+            keys, length
+        )
+    ]
+    lines.append(
+        "{:<10}{:>10}{:>10}{:>10}{:>12}".format(
+            "zipf s", "capacity", "cache", "hit rate", "ops/sec"
+        )
+    )
+    for exponent in (0.8, 1.0, 1.2):
+        trace = zipf_trace(keys, length, exponent, seed)
+        for fraction in (0.01, 0.1):
+            capacity = int(keys * fraction)
+            for label, cls in (("LRU", LRUCache), ("LFU", LFUCache)):
+                cache = cls(capacity)
+                get, put = cache.get, cache.put
+                start = time.perf_counter()
+                for key in trace:
+                    if get(key, missing) is missing:
+                        put(key, key)
+                elapsed = time.perf_counter() - start
+                lines.append(
+                    "{:<10}{:>10}{:>10}{:>10.1%}{:>12,.0f}".format(
+                        exponent,
+                        "{:.0%}".format(fraction),
+                        label,
+                        cache.hit_rate,
+                        length / elapsed,
+                    )
+                )
+    return "\n".join(lines)
+
+
+def probabilistic_report(count=200_000, seed=13):
+    """False-positive rate and error versus memory for the sketches"""
+    rng = np.random.default_rng(seed)
+    ids = rng.choice(2**62, size=2 * count, replace=False)
+    members, strangers = ids[:count], ids[count:]
+    exact_bytes = _traced_bytes(lambda: set(members.tolist()))
+
+    lines = ["Bloom filter ({:,} random 64-bit IDs)".format(count)]
+    lines.append(
+        "{:<14}{:>8}{:>12}{:>14}{:>14}{:>12}".format(
+            "bits/key", "hashes", "KiB", "measured FPR", "expected FPR", "vs set()"
+        )
+    )
+    for bits_per_key in (4, 8, 10, 16, 24):
+        bloom = BloomFilter(
+            count * bits_per_key, max(1, round(bits_per_key * math.log(2)))
+        )
+        bloom.insert_many(members)
+        assert bloom.contains_many(members).all()
+        fpr = bloom.contains_many(strangers).mean()
+        lines.append(
+            "{:<14}{:>8}{:>12,.0f}{:>14.3%}{:>14.3%}{:>11.1%}".format(
+                bits_per_key,
+                bloom.num_hashes,
+                bloom.bits.nbytes / 1024,
+                fpr,
+                bloom.expected_fpr(),
+                bloom.bits.nbytes / exact_bytes,
+            )
+        )
+    lines.append("Exact set() of the same IDs: {:,.0f} KiB".format(exact_bytes / 1024))
+
+    stream = zipf_trace(count, 5 * count, 1.1, seed)
+    truth = np.bincount(stream, minlength=count)
+    keys = np.arange(count)
+    lines.append("")
+    lines.append(
+        "Count-min sketch ({:,} Zipf(1.1) events over {:,} keys)".format(
+            len(stream), count
+        )
+    )
+    lines.append(
+        "{:<14}{:>8}{:>12}{:>18}{:>16}".format(
+            "width", "depth", "KiB", "mean overcount", "max overcount"
+        )
+    )
+    for width in (1_000, 10_000, 100_000):
+        sketch = CountMinSketch(width, 4)
+        sketch.insert_many(stream)
+        over = sketch.estimate_many(keys) - truth
+        lines.append(
+            "{:<14,}{:>8}{:>12,.0f}{:>18.2f}{:>16,}".format(
+                width,
+                sketch.depth,
+                sketch.counters.nbytes / 1024,
+                over.mean(),
+                over.max(),
+            )
+        )
+    return "\n".join(lines)
+
+
+def splice_report(sizes=(10_000, 100_000, 1_000_000, 4_000_000), edits=5_000, seed=17):
+    """Editing-style workload: inserts and deletes at random positions"""
+    lines = ["Random splices ({:,} insert + delete pairs, ops/sec)".format(edits)]
+    lines.append("{:<14}{:>14}{:>14}{:>14}".format("length", "Rope", "Array", "list"))
+    for size in sizes:
+        rng = random.Random(seed)
+        positions = [
+            (rng.randrange(size), rng.randrange(size - 1)) for _ in range(edits)
+        ]
+        row = []
+        for build, insert_name, delete_name in (
+            (Rope, "insert_at_fast", "delete_at_fast"),
+            (ArrayStructure, "insert_at_fast", None),
+            (list, "insert", "pop"),
+        ):
+            sequence = build(range(size))
+            insert_at = getattr(sequence, insert_name)
+            if delete_name:
+                delete_at = getattr(sequence, delete_name)
+            else:
+                delete_at = sequence.items.pop
+            start = time.perf_counter()
+            for insert_index, delete_index in positions:
+                insert_at(insert_index, 0)
+                delete_at(delete_index)
+            row.append(2 * edits / (time.perf_counter() - start))
+        lines.append("{:<14,}{:>14,.0f}{:>14,.0f}{:>14,.0f}".format(size, *row))
+    return "\n".join(lines)
+
+
+def memory_report(count=20_000, seed=19):
+    """Footprint of every visualizer structure holding the same values"""
+    values = random.Random(seed).sample(range(10**9), count)
+    lines = ["Memory footprint ({:,} random ints)".format(count)]
+    lines.append(
+        "{:<20}{:>12}{:>14}   {}".format(
+            "structure", "KiB", "bytes/value", "largest share"
+        )
+    )
+    baselines = (("list", list), ("set", set), ("dict", dict.fromkeys))
+    for name, build in baselines:
+        total = sum(size for _, size in deep_memory(build(values)).values())
+        lines.append(
+            "{:<20}{:>12,.0f}{:>14,.1f}".format(name, total / 1024, total / count)
+        )
+    for name, cls in DATA_STRUCTURES.items():
+        structure = build_structure(name, values)
+        total = structure.memory_usage()
+        kind, (objects, size) = next(iter(structure.memory_breakdown().items()))
+        lines.append(
+            "{:<20}{:>12,.0f}{:>14,.1f}   {} x{:,} ({:.0%})".format(
+                name, total / 1024, total / count, kind, objects, size / total
+            )
+        )
+    return "\n".join(lines)
+
+
+def _producers_consumers(put, take, threads, items):
+    """Items per second moved through ``put`` / ``take`` by ``threads``
+    producers and as many consumers, all released at once"""
+    per_thread = items // threads
+    barrier = threading.Barrier(2 * threads + 1)
+
+    def produce():
+        barrier.wait()
+        for item in range(per_thread):
+            put(item)
+
+    def consume():
+        barrier.wait()
+        for _ in range(per_thread):
+            take()
+
+    workers = [
+        threading.Thread(target=work)
+        for work in (produce, consume)
+        for _ in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return threads * per_thread / (time.perf_counter() - start)
+
+
+def _retrying(get):
+    """Wrap a non-blocking ``get`` that raises IndexError (or returns None)
+    when empty so it yields the interpreter until an item arrives"""
+
+    def take():
+        while True:
+            try:
+                item = get()
+            except IndexError:
+                item = None
+            if item is not None:
+                return item
+            time.sleep(0)
+
+    return take
+
+
+def contention_report(threads=(1, 2, 4, 8, 16, 32), items=60_000, capacity=1_024):
+    """Work-queue throughput with 1-32 producer and consumer threads each"""
+
+    def candidates():
+        standard = queue.Queue(capacity)
+        yield "queue.Queue", standard.put, standard.get
+        ring = deque()
+        yield "deque", ring.append, _retrying(ring.popleft)
+        stack = ConcurrentStack()
+        yield "ConcStack", stack.push_fast, _retrying(stack.pop_fast)
+        two_lock = TwoLockQueue()
+        yield "TwoLock", two_lock.enqueue_fast, _retrying(two_lock.dequeue_fast)
+        blocking = BlockingQueue(capacity)
+        yield "Blocking", blocking.put, blocking.get
+
+    labels = [label for label, _, _ in candidates()]
+    lines = [
+        "Producer / consumer throughput ({:,} items, items/sec; bounded "
+        "queues hold {:,}; non-blocking ones retry on empty)".format(items, capacity)
+    ]
+    lines.append(("{:<10}" + "{:>14}" * len(labels)).format("threads", *labels))
+    for count in threads:
+        row = [
+            _producers_consumers(put, take, count, items)
+            for _, put, take in candidates()
+        ]
+        lines.append(("{:<10}" + "{:>14,.0f}" * len(row)).format(count, *row))
+    return "\n".join(lines)
+
+
+def _key_sets(count, seed):
+    """Named string key sets, each with queries for longest-prefix match"""
+    rng = random.Random(seed)
+    # IPv4 routes as 8-24 bit prefixes of the address, matched by addresses
+    routes = {
+        format(rng.getrandbits(24), "024b")[: rng.randint(8, 24)] for _ in range(count)
+    }
+    addresses = [format(rng.getrandbits(32), "032b") for _ in range(count)]
+    sections = ("api", "static", "users", "orders", "images")
+    paths = {
+        "/{}/v{}/{}/{}".format(
+            rng.choice(sections), rng.randint(1, 3), rng.choice(sections), i
+        )
+        for i in range(count)
+    }
+    requests = [path + "/details" for path in rng.sample(sorted(paths), count // 2)]
+    numbers = {str(rng.randrange(10**9)) for _ in range(count)}
+    lookups = [str(rng.randrange(10**9)) for _ in range(count)]
+    return (
+        ("routes", sorted(routes), addresses),
+        ("url paths", sorted(paths), requests),
+        ("decimal", sorted(numbers), lookups),
+    )
+
+
+def radix_report(count=50_000, seed=23):
+    """Radix tree against a dict of the same strings"""
+    lines = [
+        "Radix tree vs dict of strings (~{:,} keys; ops/sec; LPM = longest "
+        "prefix match, dict probes every prefix length)".format(count)
+    ]
+    lines.append(
+        "{:<12}{:>8}{:>10}{:>10}{:>12}{:>12}{:>12}{:>12}".format(
+            "keys",
+            "count",
+            "dict KiB",
+            "tree KiB",
+            "dict get",
+            "tree get",
+            "dict LPM",
+            "tree LPM",
+        )
+    )
+    for label, keys, queries in _key_sets(count, seed):
+        table = dict.fromkeys(keys)
+        tree = RadixTree.from_iterable(keys)
+        dict_bytes = sum(size for _, size in deep_memory(table).values())
+
+        def dict_longest(text):
+            for end in range(len(text), -1, -1):
+                if text[:end] in table:
+                    return text[:end]
+            return None
+
+        rates = []
+        for run, probes in (
+            (table.__contains__, keys),
+            (tree.search_fast, keys),
+            (dict_longest, queries),
+            (tree.longest_prefix_fast, queries),
+        ):
+            start = time.perf_counter()
+            for probe in probes:
+                run(probe)
+            rates.append(len(probes) / (time.perf_counter() - start))
+        lines.append(
+            "{:<12}{:>8,}{:>10,.0f}{:>10,.0f}{:>12,.0f}{:>12,.0f}{:>12,.0f}"
+            "{:>12,.0f}".format(
+                label,
+                len(keys),
+                dict_bytes / 1024,
+                tree.memory_usage() / 1024,
+                *rates,
+            )
+        )
+    return "\n".join(lines)
+
+
+def selection_report(sizes=(100_000, 1_000_000), ks=(10, 1_000), seed=29):
+    """Selection against sorting first: the median, and the k smallest"""
+
+    def ms(call):
+        start = time.perf_counter()
+        call()
+        return (time.perf_counter() - start) * 1000
+
+    lines = [
+        "Median of n values (ms; records are (float, id) tuples selected by "
+        "key=; np.partition on a float64 array is the C reference)"
+    ]
+    lines.append(
+        "{:<10}{:>12}{:>12}{:>12}{:>12}{:>14}".format(
+            "input", "n", "sorted", "quickselect", "med of meds", "np.partition"
+        )
+    )
+    first = lambda record: record[0]
+    for size in sizes:
+        rng = random.Random(seed)
+        values = [rng.random() for _ in range(size)]
+        records = [(value, i) for i, value in enumerate(values)]
+        array = np.array(values)
+        k = size // 2
+        for label, data, key in (("floats", values, None), ("records", records, first)):
+            lines.append(
+                "{:<10}{:>12,}{:>12.1f}{:>12.1f}{:>12.1f}{:>14}".format(
+                    label,
+                    size,
+                    ms(lambda: sorted(data, key=key)[k]),
+                    ms(lambda: quickselect_fast(data, k, key=key)),
+                    ms(lambda: median_of_medians_fast(data, k, key=key)),
+                    (
+                        "{:.1f}".format(ms(lambda: np.partition(array, k)[k]))
+                        if key is None
+                        else "-"
+                    ),
+                )
+            )
+    lines.append("")
+    lines.append("k smallest of n floats (ms; steps drains the Heap Top-k generator)")
+    lines.append(
+        "{:<10}{:>12}{:>12}{:>12}{:>12}".format("k", "n", "sorted", "heapq", "steps")
+    )
+    for size in sizes:
+        rng = random.Random(seed)
+        values = [rng.random() for _ in range(size)]
+        for k in ks:
+            lines.append(
+                "{:<10,}{:>12,}{:>12.1f}{:>12.1f}{:>12.1f}".format(
+                    k,
+                    size,
+                    ms(lambda: sorted(values)[:k]),
+                    ms(lambda: top_k_fast(values, k)),
+                    ms(lambda: deque(heap_top_k(list(values), k), maxlen=0)),
+                )
+            )
+    return "\n".join(lines)
+
+
+def build_structure(name, values, **options):
+    """Load ``values`` into the registered structure ``name``, sizing the
+    bounded ones (queues, caches, Bloom filter) so that nothing is rejected
+    or evicted. Values are converted to the structure's ``KEY_TYPE``."""
+    key_type = DATA_STRUCTURES[name].KEY_TYPE
+    values = [key_type(value) for value in values]
+    if name == "Queue":
+        structure = Queue()
+        # Room for as many again, so timed enqueues are not turned away
+        structure.max_size = 2 * len(values)
+    elif name == "Blocking Queue":
+        structure = BlockingQueue(max_size=None)
+    elif name in ("LRU Cache", "LFU Cache"):
+        structure = DATA_STRUCTURES[name](max(1, len(values)))
+    elif name == "Bloom Filter":
+        structure = BloomFilter.for_capacity(max(1, len(values)))
+    else:
+        structure = DATA_STRUCTURES[name](**options)
+    structure._bulk_load(values)
+    return structure
+
+
+REPORTS = {
+    "node-memory": node_memory_report,
+    "sorted-inserts": sorted_insert_report,
+    "hash-table": hash_table_report,
+    "ordered-maps": ordered_map_report,
+    "union-find": union_find_report,
+    "persistent-history": persistent_history_report,
+    "caches": cache_report,
+    "probabilistic": probabilistic_report,
+    "splices": splice_report,
+    "memory": memory_report,
+    "contention": contention_report,
+    "radix": radix_report,
+    "selection": selection_report,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "reports", nargs="*", help="reports to run: {}".format(", ".join(REPORTS))
+    )
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.reports if name not in REPORTS]
+    if unknown:
+        parser.error("unknown report(s): {}".format(", ".join(unknown)))
+    for name in args.reports or REPORTS:
+        print(REPORTS[name]())
+        print()
+
+
+if __name__ == "__main__":
+    main()
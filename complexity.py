@@ -0,0 +1,678 @@
+"""Empirical checks of the documented complexity classes.
+
+Every operation listed in ``DATA_STRUCTURE_INFO`` and every sort in
+``ALGORITHM_INFO`` is timed over growing n, the per-operation times are fitted
+against the usual complexity classes, and any operation whose cost grows
+faster than its documented class is flagged.
+
+Run ``python complexity.py`` for the report. As a regression gate, save the
+timings once with ``--save baseline.json`` and later run
+``--baseline baseline.json``: the exit status is non-zero when an operation
+got slower than the baseline (or, with ``--strict``, when any operation
+disagrees with its documentation). Every sort is also run with ``key=`` and
+``reverse=`` on records with equal keys; unsorted output, recomputed keys or
+a documented-stable sort that reorders equal keys always fail, as do
+selections whose answer differs from sorting first and Bloom filter or
+count-min sketch batches that hash keys differently from the scalar calls.
+"""
+
+import argparse
+import inspect
+import json
+import math
+import random
+import re
+import sys
+import time
+import types
+from collections import deque, namedtuple
+
+import numpy as np
+
+from benchmarks import build_structure
+from data_structures import DATA_STRUCTURE_INFO, DATA_STRUCTURES
+from sorting import (
+    ALGORITHM_INFO,
+    SELECTION_ALGORITHMS,
+    SELECTION_FAST_PATHS,
+    SORTING_ALGORITHMS,
+)
+
+# -----------------------------------------------------------------------------
+# Complexity classes
+# -----------------------------------------------------------------------------
+
+COMPLEXITY_CLASSES = {
+    "O(1)": lambda n: 1.0,
+    "O(log n)": lambda n: math.log2(n),
+    "O(n)": lambda n: float(n),
+    "O(n log n)": lambda n: n * math.log2(n),
+    "O(n²)": lambda n: float(n * n),
+}
+
+
+def parse_complexity(text):
+    """Reduce a documented cost such as ``"O(log n + k) expected"`` to one of
+    ``COMPLEXITY_CLASSES``.
+
+    Only the leading O(...) term counts. Costs that do not grow with n (``k``
+    hashes, sketch ``depth``, inverse Ackermann) are O(1), so ``n log k`` is
+    O(n); any power of ``log n`` and ``log_B n`` is O(log n).
+    """
+    match = re.search(r"O\((.*?)\)(?:\s|,|$)", text)
+    if not match:
+        raise ValueError("no complexity class in {!r}".format(text))
+    term = match.group(1).split("+")[0].replace(" ", "")
+    if term in ("n²", "n^2", "n**2"):
+        return "O(n²)"
+    if term == "nlogk":
+        return "O(n)"
+    if term.startswith("nlog"):
+        return "O(n log n)"
+    if term.startswith("log"):
+        return "O(log n)"
+    if term == "n":
+        return "O(n)"
+    return "O(1)"
+
+
+def fit_complexity(sizes, seconds):
+    """Complexity class whose curve best explains ``seconds`` over ``sizes``.
+
+    Each class is scaled to the data by its best constant; the winner has the
+    smallest spread of log(time / f(n)).
+    """
+
+    def spread(name):
+        f = COMPLEXITY_CLASSES[name]
+        logs = [math.log(t / f(n)) for n, t in zip(sizes, seconds)]
+        mean = sum(logs) / len(logs)
+        return sum((x - mean) ** 2 for x in logs)
+
+    return min(COMPLEXITY_CLASSES, key=spread)
+
+
+def drift(sizes, seconds, name):
+    """How much time / f(n) grew from the smallest to the largest n; about 1
+    when ``name`` describes the data, well above 1 when it grows faster"""
+    f = COMPLEXITY_CLASSES[name]
+    return (seconds[-1] / f(sizes[-1])) / (seconds[0] / f(sizes[0]))
+
+
+def loglog_slope(sizes, seconds):
+    """Least-squares slope of log(time) against log(n)"""
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(t) for t in seconds]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sum(
+        (x - mx) ** 2 for x in xs
+    )
+
+
+# -----------------------------------------------------------------------------
+# Operations to time
+# -----------------------------------------------------------------------------
+
+# One timed operation: ``method`` is called on the structure with arguments
+# drawn according to ``arguments`` (see ``_arguments``); "build" times
+# ``build_structure`` itself. ``options`` go to the structure's constructor.
+Check = namedtuple(
+    "Check", "structure operation method arguments options", defaults=({},)
+)
+
+SPAN = 8  # keys or positions covered by each range operation
+
+CHECKS = [
+    Check("Linked List", "insertion", "insert_front_fast", "fresh"),
+    Check("Linked List", "deletion", "delete_fast", "first"),
+    Check("Linked List", "search", "search_fast", "present"),
+    Check("Stack", "push", "push_fast", "fresh"),
+    Check("Stack", "pop", "pop_fast", "none"),
+    Check("Stack", "peek", "peek", "none"),
+    Check("Stack", "min / max", "min", "none"),
+    Check("Queue", "enqueue", "enqueue_fast", "fresh"),
+    Check("Queue", "dequeue", "dequeue_fast", "none"),
+    Check("Queue", "peek", "peek_fast", "none"),
+    Check("Binary Tree", "insertion", "insert_fast", "fresh"),
+    Check("Binary Tree", "pop (last node)", "pop_fast", "none"),
+    Check("Binary Tree", "traversal", "inorder_traversal", "none"),
+    Check(
+        "Binary Tree",
+        "select (inorder position)",
+        "select_fast",
+        "index",
+        {"order_statistics": True},
+    ),
+    Check("Array", "insert", "insert_fast", "fresh"),
+    Check("Array", "delete", "delete", "present"),
+    Check("Array", "search", "search_fast", "present"),
+    Check("Binary Heap", "insert", "insert_fast", "fresh"),
+    Check("Binary Heap", "delete", "delete_fast", "none"),
+    Check("Binary Heap", "remove (value)", "remove_fast", "present"),
+    Check("Binary Heap", "search", "search_fast", "present"),
+]
+for _tree in ("AVL Tree", "Red-Black Tree"):
+    CHECKS += [
+        Check(_tree, "insert", "insert_fast", "fresh"),
+        Check(_tree, "delete", "delete_fast", "present"),
+        Check(_tree, "search", "search_fast", "present"),
+        Check(_tree, "predecessor/successor", "successor_fast", "present"),
+        Check(_tree, "range query", "range_query_fast", "key_range"),
+        Check(_tree, "select/rank", "rank_fast", "present", {"order_statistics": True}),
+    ]
+CHECKS += [
+    Check("Hash Table", "insert", "insert_fast", "fresh"),
+    Check("Hash Table", "delete", "delete_fast", "present"),
+    Check("Hash Table", "search", "search_fast", "present"),
+    Check("Skip List", "insert", "insert_fast", "fresh"),
+    Check("Skip List", "delete", "delete_fast", "present"),
+    Check("Skip List", "search", "search_fast", "present"),
+    Check("Skip List", "rank", "rank_fast", "present"),
+    Check("Skip List", "range scan", "range_query_fast", "key_range"),
+    Check("B+ Tree", "insert", "insert_fast", "fresh"),
+    Check("B+ Tree", "delete", "delete_fast", "present"),
+    Check("B+ Tree", "search", "search_fast", "present"),
+    Check("B+ Tree", "range scan", "range_query_fast", "key_range"),
+    Check("B+ Tree", "bulk load", None, "build"),
+    Check("Disjoint Set", "make set", "insert_fast", "fresh"),
+    Check("Disjoint Set", "find", "find_fast", "present"),
+    Check("Disjoint Set", "union", "union_fast", "pair"),
+    Check("Persistent List", "append", "append_fast", "fresh"),
+    Check("Persistent List", "delete", "pop_fast", "none"),
+    Check("Persistent List", "search", "search", "present"),
+    Check("Persistent Stack", "push", "push_fast", "fresh"),
+    Check("Persistent Stack", "pop", "pop_fast", "none"),
+    Check("Persistent Stack", "peek", "peek", "none"),
+    Check("Persistent Queue", "enqueue", "enqueue_fast", "fresh"),
+    Check("Persistent Queue", "dequeue", "dequeue_fast", "none"),
+    Check("Persistent Queue", "peek", "peek", "none"),
+    Check("Persistent Heap", "insert", "insert_fast", "fresh"),
+    Check("Persistent Heap", "delete", "delete_fast", "none"),
+    Check("Persistent Heap", "search", "search", "present"),
+]
+for _cache in ("LRU Cache", "LFU Cache"):
+    CHECKS += [
+        Check(_cache, "put", "put", "fresh"),
+        Check(_cache, "get", "get", "present"),
+        # The cache is built full, so every new key evicts one
+        Check(_cache, "evict", "put", "fresh"),
+    ]
+CHECKS += [
+    Check("Bloom Filter", "insert", "insert_fast", "fresh"),
+    Check("Bloom Filter", "search", "search_fast", "present"),
+    Check("Count-Min Sketch", "insert", "insert_fast", "fresh"),
+    Check("Count-Min Sketch", "search", "estimate", "present"),
+    Check("Fenwick Tree", "build", None, "build"),
+    Check("Fenwick Tree", "append", "insert", "fresh"),
+    Check("Fenwick Tree", "update", "update_fast", "index_value"),
+    Check("Fenwick Tree", "prefix sum", "prefix_sum_fast", "index"),
+    Check("Segment Tree", "build", None, "build"),
+    Check("Segment Tree", "query", "query_fast", "index_range"),
+    Check("Segment Tree", "point update", "update_fast", "index_value"),
+    Check("Segment Tree", "range add", "range_add_fast", "index_range_value"),
+    Check("Rope", "insert at index", "insert_at_fast", "index_value"),
+    Check("Rope", "delete at index", "delete_at_fast", "index"),
+    Check("Rope", "delete slice", "delete_slice_fast", "index_range"),
+    Check("Rope", "index access", "__getitem__", "index"),
+    Check("Rope", "search", "search_fast", "present"),
+    Check("Radix Tree", "insert", "insert_fast", "fresh"),
+    Check("Radix Tree", "delete", "delete_fast", "present"),
+    Check("Radix Tree", "search", "search_fast", "present"),
+    Check("Radix Tree", "prefix search", "prefix_search_fast", "present"),
+    Check("Radix Tree", "longest prefix", "longest_prefix_fast", "present"),
+    Check("Radix Tree", "sorted batch insert", None, "build"),
+    Check("Concurrent Stack", "push", "push_fast", "fresh"),
+    Check("Concurrent Stack", "pop", "pop_fast", "none"),
+    Check("Concurrent Stack", "peek", "peek", "none"),
+    Check("Concurrent Stack", "min / max", "min", "none"),
+]
+for _queue in ("Two-Lock Queue", "Blocking Queue"):
+    CHECKS += [
+        Check(_queue, "enqueue", "enqueue_fast", "fresh"),
+        Check(_queue, "dequeue", "dequeue_fast", "none"),
+        Check(_queue, "peek", "peek_fast", "none"),
+    ]
+
+
+def _arguments(kind, count, rng, structure, present, fresh):
+    """Argument tuples for ``count`` calls; keys are sampled without
+    replacement so deletes always hit"""
+    size = len(present)
+    if kind == "none":
+        return [()] * count
+    if kind == "fresh":
+        return [(key,) for key in fresh[:count]]
+    if kind == "present":
+        return [(key,) for key in rng.sample(present, count)]
+    if kind == "first":
+        return [(key,) for key in structure.to_array()[:count]]
+    if kind == "pair":
+        return [(rng.choice(present), rng.choice(present)) for _ in range(count)]
+    if kind == "key_range":
+        # Keys fill a quarter of the key space, so each range holds ~SPAN keys
+        starts = rng.sample(present, count)
+        return [(key, key + 4 * SPAN) for key in starts]
+    # Positions stay clear of the end so shrinking structures remain valid
+    positions = [rng.randrange(size - count - SPAN) for _ in range(count)]
+    if kind == "index":
+        return [(i,) for i in positions]
+    if kind == "index_value":
+        return [(i, 1) for i in positions]
+    if kind == "index_range":
+        return [(i, i + SPAN) for i in positions]
+    if kind == "index_range_value":
+        return [(i, i + SPAN, 1) for i in positions]
+    raise ValueError("unknown argument kind {!r}".format(kind))
+
+
+def time_check(check, size, amortized=False, seed=0):
+    """Seconds per call of ``check`` on a structure holding ``size`` values.
+
+    Up to 1,000 calls are made, stopping after 0.05 s so slow operations on
+    large inputs are sampled rather than repeated. Amortized costs need a
+    sequence as long as the structure to pay off, so those make ``size / 2``
+    calls within one second. Step generators are drained, so operations
+    without a fast path include their animation cost.
+    """
+    rng = random.Random(seed)
+    count, budget = (size // 2, 1.0) if amortized else (min(1_000, size // 4), 0.05)
+    key_type = DATA_STRUCTURES[check.structure].KEY_TYPE
+    keys = [key_type(key) for key in rng.sample(range(4 * size), size + count)]
+    present, fresh = keys[:size], keys[size:]
+    if check.arguments == "build":
+        start = time.perf_counter()
+        build_structure(check.structure, present, **check.options)
+        return time.perf_counter() - start
+
+    structure = build_structure(check.structure, present, **check.options)
+    calls = _arguments(check.arguments, count, rng, structure, present, fresh)
+    method = getattr(structure, check.method)
+    done = 0
+    start = time.perf_counter()
+    for args in calls:
+        result = method(*args)
+        if isinstance(result, types.GeneratorType):
+            deque(result, maxlen=0)
+        done += 1
+        if time.perf_counter() - start > budget:
+            break
+    return (time.perf_counter() - start) / done
+
+
+def time_sort(name, size, seed=0):
+    """Seconds to drain the sorting generator on shuffled input"""
+    data = random.Random(seed).sample(range(size * 4), size)
+    start = time.perf_counter()
+    deque(SORTING_ALGORITHMS[name](data), maxlen=0)
+    return time.perf_counter() - start
+
+
+TOP_K = 10  # k for timing top-k, so that O(n log k) is O(n)
+
+
+def time_select(name, size, seed=0):
+    """Seconds to drain the selection generator for the median (or the
+    ``TOP_K`` smallest) of shuffled input"""
+    data = random.Random(seed).sample(range(size * 4), size)
+    k = TOP_K if name == "Heap Top-k" else size // 2
+    start = time.perf_counter()
+    deque(SELECTION_ALGORITHMS[name](data, k), maxlen=0)
+    return time.perf_counter() - start
+
+
+def check_sort(name, size=256, seed=0):
+    """Problems found when ``name`` sorts records with many equal keys.
+
+    The output must be in key order both ways, ``key`` must be computed once
+    per record, and sorts documented as ``stable`` must keep records with
+    equal keys in input order (in reverse too, as ``sorted`` does). Floats
+    and strings are sorted without a key as well.
+    """
+    rng = random.Random(seed)
+    records = [(rng.randrange(size // 8), i) for i in range(size)]
+    stable = ALGORITHM_INFO[name]["stable"]
+    problems = []
+    for reverse in (False, True):
+        direction = "descending" if reverse else "ascending"
+        calls = []
+
+        def key(record):
+            calls.append(record)
+            return record[0]
+
+        data = list(records)
+        deque(SORTING_ALGORITHMS[name](data, key=key, reverse=reverse), maxlen=0)
+        expected = sorted(records, key=lambda record: record[0], reverse=reverse)
+        if len(calls) != len(records):
+            problems.append(
+                "key computed {} times for {} records".format(len(calls), size)
+            )
+        if [record[0] for record in data] != [record[0] for record in expected]:
+            problems.append("records not sorted {}".format(direction))
+        elif stable and data != expected:
+            problems.append("equal keys reordered ({})".format(direction))
+        for values in (
+            [rng.uniform(-1, 1) for _ in range(size)],
+            [rng.choice("abc") * rng.randint(1, 3) for _ in range(size)],
+        ):
+            data = list(values)
+            deque(SORTING_ALGORITHMS[name](data, reverse=reverse), maxlen=0)
+            if data != sorted(values, reverse=reverse):
+                problems.append(
+                    "{}s not sorted {}".format(type(values[0]).__name__, direction)
+                )
+    return problems
+
+
+def check_select(name, size=256, seed=0):
+    """Problems found when ``name`` selects from records with many equal keys.
+
+    For several k, both ways, the generator must compute ``key`` once per
+    record and return the key that sorting puts at rank k (or the k first
+    keys, for top-k), leaving ``arr`` partitioned around it; the fast path
+    must return exactly what ``sorted`` gives. A rank past the end must
+    raise IndexError.
+    """
+    rng = random.Random(seed)
+    records = [(rng.randrange(size // 8), i) for i in range(size)]
+    top_k = name == "Heap Top-k"
+    problems = []
+    for reverse in (False, True):
+        direction = "descending" if reverse else "ascending"
+        expected = sorted(records, key=lambda record: record[0], reverse=reverse)
+        for k in (0, 1, size // 3, size // 2, size - 1):
+            calls = []
+
+            def key(record):
+                calls.append(record)
+                return record[0]
+
+            data = list(records)
+            steps = SELECTION_ALGORITHMS[name](data, k, key=key, reverse=reverse)
+            try:
+                while True:
+                    next(steps)
+            except StopIteration as stop:
+                answer = stop.value
+            keys = [record[0] for record in data]
+            if top_k:
+                wanted = expected[:k]
+                first = [record[0] for record in wanted]
+                correct = [record[0] for record in answer] == keys[:k] == first
+            else:
+                wanted = expected[k]
+                pivot = wanted[0]
+                lower, upper = keys[:k], keys[k + 1 :]
+                if reverse:
+                    lower, upper = upper, lower
+                correct = (
+                    answer[0] == keys[k] == pivot
+                    and all(item <= pivot for item in lower)
+                    and all(item >= pivot for item in upper)
+                )
+            if len(calls) != size:
+                problems.append(
+                    "key computed {} times for {} records".format(len(calls), size)
+                )
+                break
+            if not correct:
+                problems.append("wrong answer for k={} {}".format(k, direction))
+                break
+            fast = SELECTION_FAST_PATHS[name](records, k, key=key, reverse=reverse)
+            if fast != wanted:
+                problems.append(
+                    "fast path differs from sorted for k={} {}".format(k, direction)
+                )
+                break
+    if not top_k:
+        try:
+            deque(SELECTION_ALGORITHMS[name](list(records), size), maxlen=0)
+            problems.append("rank past the end accepted")
+        except IndexError:
+            pass
+    return problems
+
+
+BATCHED = {
+    "Bloom Filter": ("insert_many", "contains_many", "search_fast"),
+    "Count-Min Sketch": ("insert_many", "estimate_many", "estimate"),
+}
+
+
+def check_batch(name, count=500, seed=0):
+    """Problems found when the vectorized ``*_many`` calls of ``name`` hash
+    other values than its scalar paths: 64-bit IDs, negative ints, ints
+    mixed with strings and floats, tuples and an int64 array are inserted
+    in one batch, then every key is queried both ways."""
+    rng = random.Random(seed)
+    insert_many, query_many, query = BATCHED[name]
+    key_sets = {
+        "64-bit ids": [rng.getrandbits(64) for _ in range(count)] + [7, 8],
+        "negative ints": [rng.randrange(-(2**63), 0) for _ in range(count)],
+        "mixed types": [rng.choice((i, str(i), i + 0.5)) for i in range(count)],
+        "tuples": [(i, str(i)) for i in range(count)],
+        "int64 array": np.array(
+            [rng.randrange(-(2**63), 2**63) for _ in range(count)], dtype=np.int64
+        ),
+    }
+    problems = []
+    for label, keys in key_sets.items():
+        # Sparse enough that a wrong hash shows up as a miss or a mismatch
+        structure = DATA_STRUCTURES[name](1 << 16, 4)
+        getattr(structure, insert_many)(keys)
+        scalar = [getattr(structure, query)(key) for key in keys]
+        batch = getattr(structure, query_many)(keys).tolist()
+        if not all(scalar):
+            missing = len(scalar) - sum(map(bool, scalar))
+            problems.append("{}: {} inserted keys missing".format(label, missing))
+        elif scalar != batch:
+            problems.append("{}: batch and scalar answers differ".format(label))
+    return problems
+
+
+# -----------------------------------------------------------------------------
+# Verification
+# -----------------------------------------------------------------------------
+
+Result = namedtuple("Result", "name documented fitted slope drift seconds status via")
+
+SIZES = (250, 1_000, 4_000, 16_000, 64_000)
+SORT_SIZES = (125, 250, 500, 1_000)
+# Stop growing n once a call takes this long (after at least three sizes)
+SLOW_CALL = 0.005
+
+
+def _measure(timer, sizes):
+    """Time ``timer(n)`` over ``sizes`` until calls get slow; returns the
+    sizes actually used and their timings"""
+    seconds = []
+    for size in sizes:
+        seconds.append(timer(size))
+        if len(seconds) >= 3 and seconds[-1] > SLOW_CALL:
+            break
+        if len(seconds) >= 2 and seconds[-1] > 100 * SLOW_CALL:
+            break
+    return sizes[: len(seconds)], seconds
+
+
+def _result(name, documented, sizes, seconds, slack, via):
+    fitted = fit_complexity(sizes, seconds)
+    growth = drift(sizes, seconds, documented)
+    if growth > slack:
+        status = "SLOWER"
+    elif growth < 1 / slack:
+        status = "faster"
+    else:
+        status = "ok"
+    return Result(
+        name,
+        documented,
+        fitted,
+        loglog_slope(sizes, seconds),
+        growth,
+        seconds[-1],
+        status,
+        via,
+    )
+
+
+def verify(structures=None, sizes=SIZES, sort_sizes=SORT_SIZES, slack=6.0):
+    """Yield a ``Result`` per documented operation and sort.
+
+    An operation is SLOWER when time / f(n) for its documented class grows
+    by more than ``slack`` across the sizes measured. The default of 6 still
+    separates O(1) from O(n) over a 16x range, while tolerating the cache
+    misses that large Python structures add on top of their nominal cost.
+    """
+    for check in CHECKS:
+        if structures and check.structure not in structures:
+            continue
+        text = DATA_STRUCTURE_INFO[check.structure]["time_complexity"][check.operation]
+        amortized = "amortized" in text
+        via = check.method or "build"
+        if inspect.isgeneratorfunction(
+            getattr(DATA_STRUCTURES[check.structure], via, None)
+        ):
+            via += " (steps)"
+        used, seconds = _measure(lambda size: time_check(check, size, amortized), sizes)
+        yield _result(
+            "{}: {}".format(check.structure, check.operation),
+            parse_complexity(text),
+            used,
+            seconds,
+            slack,
+            via,
+        )
+    for name in SORTING_ALGORITHMS:
+        if structures and name not in structures:
+            continue
+        documented = parse_complexity(ALGORITHM_INFO[name]["time_complexity"])
+        used, seconds = _measure(lambda size: time_sort(name, size), sort_sizes)
+        yield _result(name, documented, used, seconds, slack, "sort")
+    for name in SELECTION_ALGORITHMS:
+        if structures and name not in structures:
+            continue
+        documented = parse_complexity(ALGORITHM_INFO[name]["time_complexity"])
+        used, seconds = _measure(lambda size: time_select(name, size), sort_sizes)
+        yield _result(name, documented, used, seconds, slack, "select")
+
+
+def format_result(result):
+    return "{:<46}{:<12}{:<12}{:>7.2f}{:>9.1f}x{:>12.2e}  {:<7}{}".format(
+        result.name,
+        result.documented,
+        result.fitted,
+        result.slope,
+        result.drift,
+        result.seconds,
+        result.status,
+        result.via,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "names", nargs="*", help="structures or sorts to check (default: all)"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda text: tuple(int(n) for n in text.split(",")),
+        default=SIZES,
+        help="comma-separated structure sizes",
+    )
+    parser.add_argument("--slack", type=float, default=6.0)
+    parser.add_argument("--save", help="write the timings to this JSON file")
+    parser.add_argument("--baseline", help="compare with timings saved by --save")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.5,
+        help="allowed slowdown against the baseline",
+    )
+    parser.add_argument(
+        "--strict", action="store_true", help="fail on any SLOWER-than-documented op"
+    )
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(
+        "{:<46}{:<12}{:<12}{:>7}{:>10}{:>12}  {:<7}{}".format(
+            "operation",
+            "documented",
+            "fitted",
+            "slope",
+            "drift",
+            "s/op @max",
+            "",
+            "via",
+        )
+    )
+    failures = []
+    timings = {}
+    for result in verify(args.names, args.sizes, slack=args.slack):
+        print(format_result(result))
+        sys.stdout.flush()
+        timings[result.name] = {"seconds": result.seconds, "fitted": result.fitted}
+        if args.strict and result.status == "SLOWER":
+            failures.append(
+                "{} grows faster than {}".format(result.name, result.documented)
+            )
+        previous = baseline.get(result.name)
+        if previous and result.seconds > previous["seconds"] * args.tolerance:
+            failures.append(
+                "{} slowed down {:.1f}x against the baseline".format(
+                    result.name, result.seconds / previous["seconds"]
+                )
+            )
+
+    for name in SORTING_ALGORITHMS:
+        if args.names and name not in args.names:
+            continue
+        problems = check_sort(name)
+        claim = "stable" if ALGORITHM_INFO[name]["stable"] else "unstable"
+        print(
+            "{:<46}{:<12}{}".format(
+                "{}: key / reverse".format(name), claim, "; ".join(problems) or "ok"
+            )
+        )
+        failures += ["{}: {}".format(name, problem) for problem in problems]
+    for name in SELECTION_ALGORITHMS:
+        if args.names and name not in args.names:
+            continue
+        problems = check_select(name)
+        print(
+            "{:<46}{:<12}{}".format(
+                "{}: key / reverse".format(name),
+                "selection",
+                "; ".join(problems) or "ok",
+            )
+        )
+        failures += ["{}: {}".format(name, problem) for problem in problems]
+    for name in BATCHED:
+        if args.names and name not in args.names:
+            continue
+        problems = check_batch(name)
+        print(
+            "{:<46}{:<12}{}".format(
+                "{}: batch / scalar".format(name),
+                "same hash",
+                "; ".join(problems) or "ok",
+            )
+        )
+        failures += ["{}: {}".format(name, problem) for problem in problems]
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(timings, f, indent=2, sort_keys=True)
+    for failure in failures:
+        print("FAIL:", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,28 @@
+import bisect
+import gc
+import json
+import math
+import mmap
+import os
 import random
+import struct
+import sys
+import tempfile
+import threading
+import types
+from array import array
+from collections import deque, namedtuple
+from queue import Empty, Full
+
+import numpy as np
 
 
 class Node:
-    """Node class for linked list and tree structures"""
+    """Node class for linked list and tree structures
+
+    Kept for backwards compatibility; the structures below use the compact
+    ``__slots__`` node types instead.
+    """
 
     def __init__(self, data):
         self.data = data
@@ -11,24 +31,391 @@ class Node:
         self.right = None
 
 
-class LinkedList:
+class SinglyLinkedNode:
+    """Compact node for singly linked lists"""
+
+    __slots__ = ("data", "next")
+
+    def __init__(self, data, next=None):
+        self.data = data
+        self.next = next
+
+
+class DoublyLinkedNode:
+    """Compact node for doubly linked lists"""
+
+    __slots__ = ("data", "prev", "next")
+
+    def __init__(self, data, prev=None, next=None):
+        self.data = data
+        self.prev = prev
+        self.next = next
+
+
+class TreeNode:
+    """Compact node for binary trees"""
+
+    __slots__ = ("data", "left", "right")
+
+    def __init__(self, data, left=None, right=None):
+        self.data = data
+        self.left = left
+        self.right = right
+
+
+class SizedTreeNode(TreeNode):
+    """Binary tree node that also counts the nodes in its subtree, used only
+    by trees built with order statistics"""
+
+    __slots__ = ("size",)
+
+    def __init__(self, data, left=None, right=None):
+        TreeNode.__init__(self, data, left, right)
+        self.size = 1
+
+
+# Objects that belong to the interpreter rather than to any one structure
+_SHARED_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+)
+
+
+def deep_memory(root):
+    """``{type name: [objects, bytes]}`` for everything reachable from ``root``.
+
+    Each object is counted once even when shared, so persistent versions that
+    reuse nodes are not double counted. Classes, functions and the cached
+    singletons (None, bools, small ints) are skipped. NumPy views add their
+    base buffer and an mmap adds its mapped length.
+    """
+    sizes = {}
+    seen = set()
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if (
+            id(obj) in seen
+            or obj is None
+            or isinstance(obj, _SHARED_TYPES)
+            or type(obj) is bool
+            or (type(obj) is int and -5 <= obj <= 256)
+        ):
+            continue
+        seen.add(id(obj))
+        size = sys.getsizeof(obj)
+        if isinstance(obj, mmap.mmap) and not obj.closed:
+            size += len(obj)
+        elif isinstance(obj, np.ndarray) and obj.base is not None:
+            stack.append(obj.base)
+        elif isinstance(obj, dict):
+            stack.extend(obj)  # referents omit the keys of str-keyed dicts
+        entry = sizes.setdefault(type(obj).__name__, [0, 0])
+        entry[0] += 1
+        entry[1] += size
+        stack.extend(gc.get_referents(obj))
+    return sizes
+
+
+# One operation a structure supports. ``method`` names the step generator the
+# visualizer animates (None when there is only a fast path), ``arity`` is the
+# number of values it takes and ``fast`` names the non-generator equivalent.
+# ``inverse`` names the operation that undoes it: called with the same values
+# when the arities match, with none when the inverse takes none, and with the
+# removed value when a removal that takes no values is undone. ``mutates`` is
+# False for queries that leave the structure as it was, which an
+# ``OperationLog`` does not record.
+Operation = namedtuple(
+    "Operation",
+    "name method arity fast inverse mutates",
+    defaults=(None, None, True),
+)
+
+
+def apply_operation(operation, values=(), fast=True):
+    """Run a bound operation (see ``BulkLoadable.operations``) to completion.
+
+    Uses the fast path when there is one (and ``fast`` is set); otherwise
+    drains the step generator. Either way returns the operation's result, as
+    the generators return what their fast paths do; a pop, dequeue or delete
+    on an empty structure returns None from both rather than raising.
+    """
+    if operation.fast is not None and (fast or operation.method is None):
+        return operation.fast(*values)
+    return _drain(operation.method(*values))
+
+
+def _drain(steps):
+    """Run a step generator to the end and return its result"""
+    try:
+        while True:
+            next(steps)
+    except StopIteration as stop:
+        return stop.value
+
+
+class Frame(types.SimpleNamespace):
+    """What the visualizer draws for one step of an operation.
+
+    ``data`` holds the values as ``to_array()`` lists them; structures drawn
+    from more than that add fields (``nodes``, ``colors``, ``lanes``,
+    ``levels`` ...). Balanced trees keep ``data`` compact and give each
+    node's heap index in ``nodes``.
+    Operations that run first and then replay a trace of their steps record
+    a frame per step, since the structure has moved on by the time each
+    step is drawn.
+    """
+
+
+class BulkLoadable:
+    """Base for structures that can be filled in one pass.
+
+    Subclasses implement ``_bulk_load(values)``, which adds every value without
+    going through the per-element step generators, and list what they support
+    in ``OPERATIONS``. Every structure also reports its memory footprint
+    through ``memory_usage()``. ``KEY_TYPE`` converts typed-in or generated
+    keys to the type the structure stores.
+    """
+
+    OPERATIONS = ()
+    KEY_TYPE = int
+
+    @classmethod
+    def from_iterable(cls, values, *args, **kwargs):
+        """Build a new structure holding ``values``; extra args go to ``cls``"""
+        structure = cls(*args, **kwargs)
+        structure._bulk_load(values)
+        return structure
+
+    def bulk_load(self, values):
+        """Add all ``values`` at once and emit a single final state"""
+        values = list(values)
+        self._bulk_load(values)
+        yield self.frame(), [], "Loaded {} values".format(len(values))
+
+    def _bulk_load(self, values):
+        raise NotImplementedError
+
+    def frame(self):
+        """``Frame`` of the structure as it is now"""
+        return Frame(data=self.to_array())
+
+    def operations(self):
+        """``{name: Operation}`` with ``method`` and ``fast`` resolved to
+        bound methods, so callers look them up once rather than probing per
+        call; ``inverse`` stays a name in the same dict"""
+        return {
+            op.name: op._replace(
+                method=op.method and getattr(self, op.method),
+                fast=op.fast and getattr(self, op.fast),
+            )
+            for op in self.OPERATIONS
+        }
+
+    def run_batch(self, batch, fast=True):
+        """Apply ``(name, *values)`` tuples in order; returns their results"""
+        operations = self.operations()
+        return [
+            apply_operation(operations[name], values, fast) for name, *values in batch
+        ]
+
+    def memory_usage(self):
+        """Total bytes held: the structure, its nodes and backing buffers"""
+        return sum(size for _, size in deep_memory(self).values())
+
+    def memory_breakdown(self):
+        """``{type name: (objects, bytes)}``, largest share first"""
+        sizes = deep_memory(self)
+        return {
+            name: tuple(sizes[name])
+            for name in sorted(sizes, key=lambda name: -sizes[name][1])
+        }
+
+
+def _parse_key(text):
+    try:
+        return int(text)
+    except ValueError:
+        return text
+
+
+class OperationLog:
+    """Event-sourced history of the operations run on one structure.
+
+    Each mutating call is recorded as ``(name, values, undo)``, where ``undo``
+    lists the ``(name, values)`` calls that reverse it, derived from the
+    registry's ``inverse`` names. Undo and redo therefore cost one operation
+    each rather than a rebuild. ``undo`` is empty for calls that changed
+    nothing and None for operations without an inverse, which cannot be
+    undone. Queries run through the log but are not recorded. The log starts
+    from whatever the structure held when it was created.
+    """
+
+    def __init__(self, structure):
+        self.structure = structure
+        self.operations = structure.operations()
+        self.entries = []
+        self.position = 0  # entries[position:] are undone, ready for redo
+        self._running = None  # (op, values, steps) of an unfinished call
+
+    def apply(self, name, *values):
+        """Run ``name`` (through its fast path when there is one) and record
+        it; returns the operation's result"""
+        self._finish()
+        op = self.operations[name]
+        result = apply_operation(op, values)
+        self._record(op, values, result)
+        return result
+
+    def steps(self, name, *values):
+        """Step generator for ``name`` that records the call once drained.
+
+        Steps may change the structure as soon as they start, so a call cut
+        short (its generator closed, or another call started through the log)
+        is run to the end and recorded first, keeping the log in step with
+        the structure and in the order the calls began.
+        """
+        self._finish()
+        op = self.operations[name]
+        call = self._running = (op, values, op.method(*values))
+        try:
+            while self._running is call:
+                yield next(call[2])
+        except StopIteration as stop:
+            self._running = None
+            self._record(op, values, stop.value)
+            return stop.value
+        except GeneratorExit:
+            self._finish()
+            raise
+        except Exception:
+            self._running = None
+            raise
+
+    def _finish(self):
+        """Run the rest of the call ``steps`` left unfinished and record it"""
+        if self._running is not None:
+            op, values, steps = self._running
+            self._running = None
+            if op.mutates:
+                self._record(op, values, _drain(steps))
+
+    def _record(self, op, values, result):
+        if not op.mutates:
+            return
+        del self.entries[self.position :]
+        self.entries.append((op.name, tuple(values), self._undo(op, values, result)))
+        self.position += 1
+
+    def _undo(self, op, values, result):
+        if result is False or (op.arity == 0 and result is None):
+            return ()  # a full stack, duplicate key, empty pop, ...
+        if op.inverse is None:
+            return None
+        arity = self.operations[op.inverse].arity
+        if arity == op.arity:
+            return ((op.inverse, tuple(values)),)
+        if arity == 0:
+            return ((op.inverse, ()),)
+        return ((op.inverse, (result,)),)
+
+    def can_undo(self):
+        return self.position > 0 and self.entries[self.position - 1][2] is not None
+
+    def can_redo(self):
+        return self.position < len(self.entries)
+
+    def undo(self):
+        """Reverse the latest recorded call; returns False when there is
+        nothing to undo and raises ValueError if it has no inverse"""
+        self._finish()
+        if not self.position:
+            return False
+        name, values, undo = self.entries[self.position - 1]
+        if undo is None:
+            raise ValueError("{}{} cannot be undone".format(name, values))
+        for inverse, arguments in undo:
+            apply_operation(self.operations[inverse], arguments)
+        self.position -= 1
+        return True
+
+    def redo(self):
+        """Re-apply the latest undone call; returns False when there is none"""
+        self._finish()
+        if self.position == len(self.entries):
+            return False
+        name, values, _ = self.entries[self.position]
+        op = self.operations[name]
+        result = apply_operation(op, values)
+        self.entries[self.position] = (name, values, self._undo(op, values, result))
+        self.position += 1
+        return True
+
+    def history(self):
+        """``[(name, values), ...]`` for the calls currently applied"""
+        self._finish()
+        return [(name, values) for name, values, _ in self.entries[: self.position]]
+
+    def save(self, path):
+        """Write the applied calls as JSON lines ``["name", value, ...]``"""
+        with open(path, "w") as f:
+            for name, values in self.history():
+                f.write(json.dumps([name, *values]) + "\n")
+
+    @staticmethod
+    def load(path):
+        """``[(name, values), ...]`` from ``save`` output; plain ``name value
+        ...`` lines (with ``#`` comments) are accepted too, their values read
+        as integers where they parse as one"""
+        calls = []
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    name, *values = json.loads(line)
+                else:
+                    line = line.split("#")[0].split()
+                    if not line:
+                        continue
+                    name, values = line[0], [_parse_key(value) for value in line[1:]]
+                calls.append((name, tuple(values)))
+        return calls
+
+    def replay(self, calls):
+        """Apply and record ``(name, values)`` calls in order (e.g. from
+        ``load``); returns their results"""
+        return [self.apply(name, *values) for name, values in calls]
+
+
+class LinkedList(BulkLoadable):
     """Linked List implementation with visualization support"""
 
+    OPERATIONS = (
+        Operation("insert", "insert_at_end", 1, "insert_fast", "pop"),
+        Operation(
+            "insert_front", "insert_at_beginning", 1, "insert_front_fast", "pop_front"
+        ),
+        Operation("delete", "delete_node", 1, "delete_fast"),
+        Operation("pop", "pop", 0, "pop_fast", "insert"),
+        Operation("pop_front", "pop_front", 0, "pop_front_fast", "insert_front"),
+        Operation("search", "search", 1, "search_fast", mutates=False),
+    )
+
     def __init__(self):
         self.head = None
         self.size = 0
 
     def insert_at_beginning(self, data):
         """Insert a node at the beginning of the list"""
-        new_node = Node(data)
-        new_node.next = self.head
-        self.head = new_node
+        self.head = SinglyLinkedNode(data, self.head)
         self.size += 1
-        yield self.to_array(), [0], "Inserted {} at beginning".format(data)
+        yield self.frame(), [0], "Inserted {} at beginning".format(data)
 
     def insert_at_end(self, data):
         """Insert a node at the end of the list"""
-        new_node = Node(data)
+        new_node = SinglyLinkedNode(data)
         if not self.head:
             self.head = new_node
         else:
@@ -37,19 +424,33 @@ class LinkedList:
                 current = current.next
             current.next = new_node
         self.size += 1
-        yield self.to_array(), [self.size - 1], "Inserted {} at end".format(data)
+        yield self.frame(), [self.size - 1], "Inserted {} at end".format(data)
+
+    def _bulk_load(self, values):
+        # Find the tail once, then link every new node straight onto it
+        tail = self.head
+        while tail and tail.next:
+            tail = tail.next
+        for data in values:
+            node = SinglyLinkedNode(data)
+            if tail:
+                tail.next = node
+            else:
+                self.head = node
+            tail = node
+            self.size += 1
 
     def delete_node(self, data):
         """Delete the first occurrence of a node with given data"""
         if not self.head:
-            yield self.to_array(), [], "List is empty"
-            return
+            yield self.frame(), [], "List is empty"
+            return False
 
         if self.head.data == data:
             self.head = self.head.next
             self.size -= 1
-            yield self.to_array(), [0], "Deleted {} from beginning".format(data)
-            return
+            yield self.frame(), [0], "Deleted {} from beginning".format(data)
+            return True
 
         current = self.head
         index = 0
@@ -61,12 +462,33 @@ class LinkedList:
             current.next = current.next.next
             self.size -= 1
             yield (
-                self.to_array(),
+                self.frame(),
                 [index + 1],
                 "Deleted {} from position {}".format(data, index + 1),
             )
-        else:
-            yield self.to_array(), [], "{} not found in list".format(data)
+            return True
+        yield self.frame(), [], "{} not found in list".format(data)
+        return False
+
+    def pop_front(self):
+        """Remove the first node"""
+        if not self.head:
+            yield self.frame(), [], "List is empty"
+            return
+        data = self.pop_front_fast()
+        yield self.frame(), [], "Removed {} from beginning".format(data)
+        return data
+
+    def pop(self):
+        """Remove the last node, walking to the one before it"""
+        if not self.head:
+            yield self.frame(), [], "List is empty"
+            return
+        for index in range(self.size - 1):
+            yield self.frame(), [index], "Walking to the end"
+        data = self.pop_fast()
+        yield self.frame(), [], "Removed {} from end".format(data)
+        return data
 
     def search(self, data):
         """Search for a node with given data"""
@@ -74,20 +496,74 @@ class LinkedList:
         index = 0
         while current:
             yield (
-                self.to_array(),
+                self.frame(),
                 [index],
                 "Searching for {} at position {}".format(data, index),
             )
             if current.data == data:
                 yield (
-                    self.to_array(),
+                    self.frame(),
                     [index],
                     "Found {} at position {}".format(data, index),
                 )
                 return
             current = current.next
             index += 1
-        yield self.to_array(), [], "{} not found in list".format(data)
+        yield self.frame(), [], "{} not found in list".format(data)
+
+    # -- fast paths ---------------------------------------------------------
+
+    def insert_front_fast(self, data):
+        self.head = SinglyLinkedNode(data, self.head)
+        self.size += 1
+
+    def insert_fast(self, data):
+        """Append ``data``; O(n), as the list keeps no tail pointer"""
+        self._bulk_load((data,))
+
+    def delete_fast(self, data):
+        """Unlink the first node holding ``data``; False if there is none"""
+        previous, current = None, self.head
+        while current and current.data != data:
+            previous, current = current, current.next
+        if current is None:
+            return False
+        if previous is None:
+            self.head = current.next
+        else:
+            previous.next = current.next
+        self.size -= 1
+        return True
+
+    def pop_front_fast(self):
+        """Remove and return the first value; None when the list is empty"""
+        node = self.head
+        if node is None:
+            return None
+        self.head = node.next
+        self.size -= 1
+        return node.data
+
+    def pop_fast(self):
+        """Remove and return the last value; None when the list is empty"""
+        if self.head is None or self.head.next is None:
+            return self.pop_front_fast()
+        current = self.head
+        while current.next.next:
+            current = current.next
+        data = current.next.data
+        current.next = None
+        self.size -= 1
+        return data
+
+    def search_fast(self, data):
+        """Position of the first node holding ``data``, or -1"""
+        current, index = self.head, 0
+        while current:
+            if current.data == data:
+                return index
+            current, index = current.next, index + 1
+        return -1
 
     def to_array(self):
         """Convert linked list to array for visualization"""
@@ -99,28 +575,71 @@ class LinkedList:
         return result
 
 
-class Stack:
-    """Stack implementation with visualization support"""
+class Stack(BulkLoadable):
+    """Stack implementation with visualization support
 
-    def __init__(self):
+    ``max_size=None`` makes the stack unbounded. Two auxiliary stacks hold the
+    running minimum and maximum so ``min()`` and ``max()`` are O(1); they are
+    dropped if unorderable items are pushed.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "push", 1, "push_fast", "delete"),
+        Operation("delete", "pop", 0, "pop_fast", "insert"),
+        Operation("search", "peek", 0, mutates=False),
+        Operation("push_many", "push_many", 1, "push_many_fast"),
+        Operation("pop_many", "pop_many", 1, "pop_many_fast"),
+    )
+
+    def __init__(self, max_size=None):
         self.items = []
-        self.max_size = 10
+        self.max_size = max_size
+        self._mins = []
+        self._maxs = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def _room(self):
+        if self.max_size is None:
+            return float("inf")
+        return self.max_size - len(self.items)
+
+    def _track(self, item):
+        if self._mins is None:
+            return
+        try:
+            if not self._mins or item <= self._mins[-1]:
+                self._mins.append(item)
+            if not self._maxs or item >= self._maxs[-1]:
+                self._maxs.append(item)
+        except TypeError:
+            self._mins = self._maxs = None
+
+    def _untrack(self, item):
+        if self._mins is None:
+            return
+        if item is self._mins[-1] or item == self._mins[-1]:
+            self._mins.pop()
+        if item is self._maxs[-1] or item == self._maxs[-1]:
+            self._maxs.pop()
 
     def push(self, item):
         """Push an item onto the stack"""
-        if len(self.items) >= self.max_size:
+        if not self.push_fast(item):
             yield self.items, [], "Stack is full"
-            return
-        self.items.append(item)
+            return False
         yield self.items, [len(self.items) - 1], "Pushed {} onto stack".format(item)
+        return True
 
     def pop(self):
         """Pop an item from the stack"""
         if not self.items:
             yield self.items, [], "Stack is empty"
             return
-        item = self.items.pop()
+        item = self.pop_fast()
         yield self.items, [], "Popped {} from stack".format(item)
+        return item
 
     def peek(self):
         """Peek at the top item without removing it"""
@@ -129,59 +648,212 @@ class Stack:
             return
         yield self.items, [len(self.items) - 1], "Peeked at {}".format(self.items[-1])
 
+    def push_many(self, items):
+        """Push several items as one step; nothing is pushed if they don't fit"""
+        items = list(items)
+        start = len(self.items)
+        if not self.push_many_fast(items):
+            yield self.items, [], "Stack is full ({} more won't fit)".format(len(items))
+            return
+        pushed = range(start, len(self.items))
+        yield self.items, list(pushed), "Pushed {} items".format(len(pushed))
+
+    def pop_many(self, count):
+        """Pop up to ``count`` items as one step"""
+        if not self.items:
+            yield self.items, [], "Stack is empty"
+            return
+        popped = self.pop_many_fast(count)
+        yield self.items, [], "Popped {} items".format(len(popped))
+
+    # -- fast paths ---------------------------------------------------------
+
+    def push_fast(self, item):
+        if self._room() < 1:
+            return False
+        self.items.append(item)
+        self._track(item)
+        return True
+
+    def pop_fast(self):
+        """Remove and return the top item; None when the stack is empty, as
+        ``pop`` returns"""
+        if not self.items:
+            return None
+        item = self.items.pop()
+        self._untrack(item)
+        return item
+
+    def push_many_fast(self, items):
+        items = list(items)
+        if self._room() < len(items):
+            return False
+        self.items.extend(items)
+        for item in items:
+            self._track(item)
+        return True
+
+    def pop_many_fast(self, count):
+        """Remove and return up to ``count`` items, top of the stack first"""
+        count = min(count, len(self.items))
+        popped = self.items[len(self.items) - count :]
+        del self.items[len(self.items) - count :]
+        popped.reverse()
+        for item in popped:
+            self._untrack(item)
+        return popped
+
+    def _bulk_load(self, values):
+        if not self.push_many_fast(values):
+            raise ValueError("values exceed the stack's max_size")
+
+    def min(self):
+        """Smallest item on the stack in O(1)"""
+        return self._extreme(self._mins, "min")
+
+    def max(self):
+        """Largest item on the stack in O(1)"""
+        return self._extreme(self._maxs, "max")
+
+    def _extreme(self, tracked, name):
+        if not self.items:
+            raise IndexError("{}() on empty stack".format(name))
+        if tracked is None:
+            raise TypeError("stack holds items that cannot be ordered")
+        return tracked[-1]
+
     def to_array(self):
         """Return a shallow copy for visualization"""
         return self.items.copy()
 
 
-class Queue:
-    """Queue implementation with visualization support"""
+class Queue(BulkLoadable):
+    """Queue implementation with visualization support
+
+    Items live in a ``deque``, so both ends are O(1). ``pop_back`` and
+    ``push_front`` exist only as fast paths, as the inverses an
+    ``OperationLog`` uses to undo an enqueue or a dequeue.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "enqueue", 1, "enqueue_fast", "pop_back"),
+        Operation("delete", "dequeue", 0, "dequeue_fast", "push_front"),
+        Operation("search", "peek", 0, "peek_fast", mutates=False),
+        Operation("pop_back", None, 0, "pop_back_fast", "insert"),
+        Operation("push_front", None, 1, "push_front_fast", "delete"),
+    )
 
     def __init__(self):
-        self.items = []
+        self.items = deque()
         self.max_size = 10
 
     def enqueue(self, item):
         """Add an item to the queue"""
-        if len(self.items) >= self.max_size:
-            yield self.items, [], "Queue is full"
-            return
-        self.items.append(item)
-        yield self.items, [len(self.items) - 1], "Enqueued {}".format(item)
+        if not self.enqueue_fast(item):
+            yield self.frame(), [], "Queue is full"
+            return False
+        yield self.frame(), [len(self.items) - 1], "Enqueued {}".format(item)
+        return True
 
     def dequeue(self):
         """Remove and return the first item from the queue"""
         if not self.items:
-            yield self.items, [], "Queue is empty"
+            yield self.frame(), [], "Queue is empty"
             return
-        item = self.items.pop(0)
-        yield self.items, [], "Dequeued {}".format(item)
+        item = self.dequeue_fast()
+        yield self.frame(), [], "Dequeued {}".format(item)
+        return item
 
     def peek(self):
         """Peek at the first item without removing it"""
         if not self.items:
-            yield self.items, [], "Queue is empty"
+            yield self.frame(), [], "Queue is empty"
             return
-        yield self.items, [0], "Peeked at {}".format(self.items[0])
+        yield self.frame(), [0], "Peeked at {}".format(self.items[0])
+        return self.items[0]
+
+    # -- fast paths ---------------------------------------------------------
+
+    def enqueue_fast(self, item):
+        """Append ``item``; False when the queue is full"""
+        if len(self.items) >= self.max_size:
+            return False
+        self.items.append(item)
+        return True
+
+    def dequeue_fast(self):
+        """Remove and return the first item; None when the queue is empty"""
+        return self.items.popleft() if self.items else None
+
+    def peek_fast(self):
+        return self.items[0] if self.items else None
+
+    def pop_back_fast(self):
+        """Remove and return the newest item (undoes an enqueue)"""
+        return self.items.pop() if self.items else None
+
+    def push_front_fast(self, item):
+        """Put ``item`` back at the front (undoes a dequeue)"""
+        if len(self.items) >= self.max_size:
+            return False
+        self.items.appendleft(item)
+        return True
+
+    def _bulk_load(self, values):
+        values = list(values)
+        if len(self.items) + len(values) > self.max_size:
+            raise ValueError("values exceed the queue's max_size")
+        self.items.extend(values)
 
     def to_array(self):
         """Return a shallow copy for visualization"""
-        return self.items.copy()
+        return list(self.items)
 
 
-class BinaryTree:
-    """Binary Tree implementation with visualization support"""
+class BinaryTree(BulkLoadable):
+    """Binary Tree implementation with visualization support
 
-    def __init__(self):
+    With ``order_statistics=True`` every node also tracks its subtree size,
+    which makes positional ``select`` (the k-th node in order) O(log n).
+    """
+
+    OPERATIONS = (
+        Operation("insert", "insert", 1, "insert_fast", "pop"),
+        Operation("pop", "pop", 0, "pop_fast", "insert"),
+        Operation("traverse", "inorder_traversal", 0, mutates=False),
+        Operation("select", "select", 1, "select_fast", mutates=False),
+    )
+
+    def __init__(self, order_statistics=False):
         self.root = None
         self.size = 0
+        self.order_statistics = order_statistics
+        self._node = SizedTreeNode if order_statistics else TreeNode
+
+    def _count_path(self, position, delta=1):
+        """Add ``delta`` to the sizes above heap position ``position``"""
+        if not self.order_statistics:
+            return
+        node = self.root
+        for bit in bin(position + 1)[3:]:
+            node.size += delta
+            node = node.right if bit == "1" else node.left
+
+    def _parent_of(self, position):
+        """The node above heap position ``position`` (> 0), and whether
+        ``position`` is its right child"""
+        path = bin(position + 1)[3:]
+        node = self.root
+        for bit in path[:-1]:
+            node = node.right if bit == "1" else node.left
+        return node, path[-1] == "1"
 
     def insert(self, data):
         """Insert a node into the binary tree"""
         if not self.root:
-            self.root = Node(data)
+            self.root = self._node(data)
             self.size += 1
-            yield self.to_array(), [0], "Inserted {} as root".format(data)
+            yield self.frame(), [0], "Inserted {} as root".format(data)
             return
 
         queue = [self.root]
@@ -189,15 +861,17 @@ class BinaryTree:
         while queue:
             current = queue.pop(0)
             if not current.left:
-                current.left = Node(data)
+                current.left = self._node(data)
+                self._count_path(self.size)
                 self.size += 1
-                yield self.to_array(), [index], "Inserted {} as left child".format(data)
+                yield self.frame(), [index], "Inserted {} as left child".format(data)
                 return
             if not current.right:
-                current.right = Node(data)
+                current.right = self._node(data)
+                self._count_path(self.size)
                 self.size += 1
                 yield (
-                    self.to_array(),
+                    self.frame(),
                     [index],
                     "Inserted {} as right child".format(data),
                 )
@@ -206,17 +880,149 @@ class BinaryTree:
             queue.append(current.right)
             index += 1
 
+    def pop(self):
+        """Remove the last node in level order, the one insert added last"""
+        if not self.root:
+            yield self.frame(), [], "Tree is empty"
+            return
+        yield self.frame(), [self.size - 1], "Removing the last node"
+        data = self.pop_fast()
+        yield self.frame(), [], "Removed {}".format(data)
+        return data
+
     def inorder_traversal(self):
         """Perform inorder traversal"""
 
         def inorder_helper(node, index):
             if node:
                 yield from inorder_helper(node.left, 2 * index + 1)
-                yield self.to_array(), [index], "Visited {}".format(node.data)
+                yield self.frame(), [index], "Visited {}".format(node.data)
                 yield from inorder_helper(node.right, 2 * index + 2)
 
         yield from inorder_helper(self.root, 0)
 
+    # -- fast paths ---------------------------------------------------------
+
+    def insert_fast(self, data):
+        """Add ``data`` at the next level-order position in O(log n)"""
+        node = self._node(data)
+        if not self.root:
+            self.root = node
+        else:
+            parent, right = self._parent_of(self.size)
+            if right:
+                parent.right = node
+            else:
+                parent.left = node
+            self._count_path(self.size)
+        self.size += 1
+
+    def pop_fast(self):
+        """Remove the last node in level order and return its data; None
+        when the tree is empty"""
+        if not self.root:
+            return None
+        self.size -= 1
+        if not self.size:
+            data, self.root = self.root.data, None
+            return data
+        self._count_path(self.size, -1)
+        parent, right = self._parent_of(self.size)
+        if right:
+            node, parent.right = parent.right, None
+        else:
+            node, parent.left = parent.left, None
+        return node.data
+
+    def _bulk_load(self, values):
+        # The tree is always complete, so node i's parent is node (i - 1) // 2
+        nodes = []
+        queue = [self.root] if self.root else []
+        for current in queue:
+            nodes.append(current)
+            queue.extend(child for child in (current.left, current.right) if child)
+        for data in values:
+            node = self._node(data)
+            if nodes:
+                parent = nodes[(len(nodes) - 1) // 2]
+                if len(nodes) % 2:
+                    parent.left = node
+                else:
+                    parent.right = node
+            else:
+                self.root = node
+            nodes.append(node)
+            self.size += 1
+        if self.order_statistics:
+            for i in reversed(range(len(nodes))):
+                node = nodes[i]
+                node.size = 1 + sum(
+                    child.size for child in (node.left, node.right) if child
+                )
+
+    def select(self, k):
+        """Find the k-th node (0-based) of the inorder sequence"""
+        if not self.order_statistics:
+            yield self.frame(), [], "Order statistics are disabled"
+            return
+        if not 0 <= k < self.size:
+            yield self.frame(), [], "{} is out of range".format(k)
+            return
+        trace = []
+        node = self._select(k, trace)
+        yield from trace
+        frame, highlight, _ = trace[-1]
+        yield frame, highlight, "Inorder #{} is {}".format(k, node.data)
+
+    def _select(self, k, trace=None):
+        # Selecting changes nothing, so every step shares one frame
+        frame = self.frame() if trace is not None else None
+        node, index = self.root, 0
+        while True:
+            left = node.left.size if node.left else 0
+            if trace is not None:
+                trace.append(
+                    (
+                        frame,
+                        [index],
+                        "{} nodes on the left of {}, looking for #{}".format(
+                            left, node.data, k
+                        ),
+                    )
+                )
+            if k < left:
+                node, index = node.left, 2 * index + 1
+            elif k == left:
+                return node
+            else:
+                k -= left + 1
+                node, index = node.right, 2 * index + 2
+
+    def select_fast(self, k):
+        if not self.order_statistics:
+            raise ValueError("create the tree with order_statistics=True")
+        if not 0 <= k < self.size:
+            raise IndexError("tree index out of range")
+        return self._select(k).data
+
+    def frame(self):
+        """Heap-layout values, with subtree sizes under order statistics"""
+        return Frame(data=self.to_array(), sizes=self.size_array() or None)
+
+    def size_array(self):
+        """Subtree sizes aligned with ``to_array``"""
+        if not self.root or not self.order_statistics:
+            return []
+        result = []
+        queue = [self.root]
+        for current in queue:
+            result.append(current.size if current else None)
+            if current:
+                queue.extend((current.left, current.right))
+        while result and result[-1] is None:
+            result.pop()
+        return result
+
     def to_array(self):
         """Convert binary tree to array representation"""
         if not self.root:
@@ -245,47 +1051,221 @@ class BinaryTree:
 # -----------------------------------------------------------------------------
 
 
-class ArrayStructure:
-    """Simple dynamic array wrapper for visualization support"""
+class ArrayStructure(BulkLoadable):
+    """Dynamic array of machine integers for visualization support.
 
-    def __init__(self):
-        self.items = []
+    Values live in a typed ``array`` (8-byte signed ints by default) rather
+    than a list of boxed ints. ``is_sorted`` is maintained on every update so
+    searches can switch from a linear scan to binary search.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "insert", 1, "insert_fast", "pop"),
+        Operation("pop", "delete", 0, "pop_fast", "insert"),
+        Operation("insert_at", "insert_at", 2, "insert_at_fast"),
+        Operation("delete", "delete", 1),
+        Operation("delete_slice", "delete_slice", 2, "delete_slice_fast"),
+        Operation("search", "search", 1, "search_fast", mutates=False),
+        Operation("binary_search", "binary_search", 1, mutates=False),
+        Operation("exponential_search", "exponential_search", 1, mutates=False),
+    )
+
+    def __init__(self, values=(), typecode="q"):
+        self.items = array(typecode)
+        self.is_sorted = True
+        self.extend_fast(values)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _view(self):
+        """Zero-copy NumPy view; drop it before the array is resized"""
+        return np.frombuffer(self.items, dtype=self.items.typecode)
+
+    def _check_order(self, index):
+        """Keep ``is_sorted`` valid after writing ``items[index]``"""
+        if self.is_sorted:
+            items = self.items
+            self.is_sorted = (index == 0 or items[index - 1] <= items[index]) and (
+                index == len(items) - 1 or items[index] <= items[index + 1]
+            )
 
     # For uniformity with other structures, operations are generators that yield
-    # (state, highlight_indices, message)
+    # (state, highlight_indices, message). Steps yield the live array rather
+    # than a copy; the visualizer reads the structure itself when drawing.
     def insert(self, value):
-        self.items.append(value)
-        yield self.to_array(), [len(self.items) - 1], f"Appended {value}"
+        self.insert_fast(value)
+        yield self.items, [len(self.items) - 1], f"Appended {value}"
+
+    def insert_at(self, index, value):
+        if not 0 <= index <= len(self.items):
+            yield self.items, [], f"Index {index} out of range"
+            return
+        self.insert_at_fast(index, value)
+        yield self.items, [index], f"Inserted {value} at index {index}"
+
+    def extend(self, values):
+        start = len(self.items)
+        self.extend_fast(values)
+        added = range(start, len(self.items))
+        yield self.items, list(added), f"Appended {len(added)} values"
 
     def delete(self, value=None):
         if not self.items:
             yield self.items, [], "Array is empty"
             return
         if value is None:
-            removed = self.items.pop()
-            yield self.to_array(), [], f"Popped {removed} from end"
-        else:
-            try:
-                idx = self.items.index(value)
-                self.items.pop(idx)
-                yield self.to_array(), [idx], f"Removed {value} at index {idx}"
-            except ValueError:
-                yield self.to_array(), [], f"{value} not found"
+            removed = self.pop_fast()
+            yield self.items, [], f"Popped {removed} from end"
+            return removed
+        idx = self.search_fast(value)
+        if idx < 0:
+            yield self.items, [], f"{value} not found"
+            return
+        del self.items[idx]
+        yield self.items, [idx], f"Removed {value} at index {idx}"
+
+    def delete_slice(self, start, stop):
+        removed = len(self.items)
+        self.delete_slice_fast(start, stop)
+        removed -= len(self.items)
+        yield self.items, [], f"Removed {removed} values from [{start}:{stop}]"
 
     def search(self, value):
+        if self.is_sorted:
+            yield from self.binary_search(value)
+            return
         for idx, item in enumerate(self.items):
-            yield self.to_array(), [idx], f"Checking index {idx}"
+            yield self.items, [idx], f"Checking index {idx}"
             if item == value:
-                yield self.to_array(), [idx], f"Found {value} at index {idx}"
+                yield self.items, [idx], f"Found {value} at index {idx}"
                 return
-        yield self.to_array(), [], f"{value} not found"
+        yield self.items, [], f"{value} not found"
+
+    def binary_search(self, value, lo=0, hi=None):
+        """Halve [lo, hi) until one candidate is left; requires sorted data"""
+        items = self.items
+        if hi is None:
+            hi = len(items)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            yield items, [lo, mid, hi - 1], f"Range [{lo}, {hi}), checking index {mid}"
+            if items[mid] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(items) and items[lo] == value:
+            yield items, [lo], f"Found {value} at index {lo}"
+        else:
+            yield items, [], f"{value} not found"
+
+    def exponential_search(self, value):
+        """Double a probe index to bracket ``value``, then binary search"""
+        items = self.items
+        if not self.is_sorted:
+            yield from self.search(value)
+            return
+        bound = 1
+        while bound < len(items) and items[bound - 1] < value:
+            yield items, [bound - 1], f"{items[bound - 1]} < {value}, doubling bound"
+            bound *= 2
+        yield from self.binary_search(value, bound // 2, min(bound, len(items)))
+
+    # -- fast paths ---------------------------------------------------------
+
+    def insert_fast(self, value):
+        self.items.append(value)
+        self._check_order(len(self.items) - 1)
+
+    def insert_at_fast(self, index, value):
+        if not 0 <= index <= len(self.items):
+            raise IndexError("array index out of range")
+        self.items.insert(index, value)
+        self._check_order(index)
+
+    def pop_fast(self):
+        """Remove and return the last value; None when the array is empty"""
+        if not self.items:
+            return None
+        return self.items.pop()
+
+    def extend_fast(self, values):
+        """Append many values; NumPy arrays are copied in one block"""
+        start = len(self.items)
+        if isinstance(values, np.ndarray):
+            values = values.astype(self.items.typecode, copy=False)
+            self.items.frombytes(values.tobytes())
+        else:
+            self.items.extend(values)
+        if self.is_sorted and len(self.items) > start:
+            view = self._view()[max(0, start - 1) :]
+            self.is_sorted = bool((view[1:] >= view[:-1]).all())
+            del view
+
+    def _bulk_load(self, values):
+        self.extend_fast(values)
+
+    def delete_slice_fast(self, start, stop):
+        # Removing a slice never breaks the ordering of what is left
+        del self.items[start:stop]
+
+    def sort_fast(self):
+        """Sort in place through the NumPy view and mark the array sorted"""
+        view = self._view()
+        view.sort(kind="stable")
+        del view
+        self.is_sorted = True
+
+    def search_fast(self, value):
+        """Index of the first occurrence of ``value``, or -1"""
+        if self.is_sorted:
+            idx = bisect.bisect_left(self.items, value)
+            return idx if idx < len(self.items) and self.items[idx] == value else -1
+        try:
+            return self.items.index(value)
+        except ValueError:
+            return -1
+
+    def search_many(self, values):
+        """Vectorized ``search_fast`` for many keys; returns an index array.
+
+        Sorted data is searched in place with ``np.searchsorted``; otherwise a
+        stable argsort is built once per call so each key still finds its
+        first occurrence.
+        """
+        keys = np.asarray(values, dtype=self.items.typecode)
+        view = self._view()
+        if self.is_sorted:
+            order, ordered = None, view
+        else:
+            order = np.argsort(view, kind="stable")
+            ordered = view[order]
+        pos = np.searchsorted(ordered, keys)
+        found = pos < len(ordered)
+        found[found] = ordered[pos[found]] == keys[found]
+        if order is not None:
+            pos[found] = order[pos[found]]
+        del view, ordered
+        return np.where(found, pos, -1)
 
     def to_array(self):
-        return self.items.copy()
+        return self.items.tolist()
+
+
+class BinaryHeap(BulkLoadable):
+    """Min Binary Heap with visualization support
 
+    Undoing an insert removes the value and undoing a delete inserts it back,
+    so an ``OperationLog`` restores the same values, though not necessarily
+    in the same array order.
+    """
 
-class BinaryHeap:
-    """Min Binary Heap with visualization support"""
+    OPERATIONS = (
+        Operation("insert", "insert", 1, "insert_fast", "remove"),
+        Operation("delete", "delete", 0, "delete_fast", "insert"),
+        Operation("remove", "remove", 1, "remove_fast", "insert"),
+        Operation("search", "search", 1, "search_fast", mutates=False),
+    )
 
     def __init__(self):
         self.heap = []  # using list representation
@@ -299,12 +1279,12 @@ class BinaryHeap:
     def insert(self, value):
         self.heap.append(value)
         idx = len(self.heap) - 1
-        yield self.to_array(), [idx], f"Inserted {value}"
+        yield self.frame(), [idx], f"Inserted {value}"
         # Bubble up
         while idx > 0 and self.heap[idx] < self.heap[self._parent(idx)]:
             p = self._parent(idx)
             self._swap(idx, p)
-            yield self.to_array(), [idx, p], "Heapify up"
+            yield self.frame(), [idx, p], "Heapify up"
             idx = p
 
     def delete(self):
@@ -313,7 +1293,7 @@ class BinaryHeap:
             return
         self._swap(0, -1)
         removed = self.heap.pop()
-        yield self.to_array(), [0], f"Removed root {removed}"
+        yield self.frame(), [0], f"Removed root {removed}"
         # Heapify down
         idx = 0
         n = len(self.heap)
@@ -326,38 +1306,4446 @@ class BinaryHeap:
                 smallest = right
             if smallest != idx:
                 self._swap(idx, smallest)
-                yield self.to_array(), [idx, smallest], "Heapify down"
+                yield self.frame(), [idx, smallest], "Heapify down"
                 idx = smallest
             else:
                 break
+        return removed
+
+    def remove(self, value):
+        """Remove one occurrence of ``value`` and restore the heap order"""
+        for idx, item in enumerate(self.heap):
+            yield self.frame(), [idx], f"Checking index {idx}"
+            if item == value:
+                break
+        else:
+            yield self.frame(), [], f"{value} not found"
+            return False
+        self.remove_fast(value)
+        yield self.frame(), [], f"Removed {value}"
+        return True
+
+    def _sift_up(self, idx):
+        heap = self.heap
+        while idx:
+            parent = (idx - 1) // 2
+            if not heap[idx] < heap[parent]:
+                return
+            heap[idx], heap[parent] = heap[parent], heap[idx]
+            idx = parent
+
+    def _sift_down(self, idx):
+        heap = self.heap
+        n = len(heap)
+        while True:
+            left = 2 * idx + 1
+            if left >= n:
+                return
+            child = left
+            if left + 1 < n and heap[left + 1] < heap[left]:
+                child = left + 1
+            if heap[idx] <= heap[child]:
+                return
+            heap[idx], heap[child] = heap[child], heap[idx]
+            idx = child
+
+    def _bulk_load(self, values):
+        # Floyd's heapify: sift down every internal node, O(n) in total
+        self.heap.extend(values)
+        for idx in reversed(range(len(self.heap) // 2)):
+            self._sift_down(idx)
 
     def search(self, value):
         for idx, item in enumerate(self.heap):
-            yield self.to_array(), [idx], f"Checking index {idx}"
+            yield self.frame(), [idx], f"Checking index {idx}"
             if item == value:
-                yield self.to_array(), [idx], f"Found {value} at index {idx}"
+                yield self.frame(), [idx], f"Found {value} at index {idx}"
                 return
-        yield self.to_array(), [], f"{value} not found"
+        yield self.frame(), [], f"{value} not found"
+
+    # -- fast paths ---------------------------------------------------------
+
+    def insert_fast(self, value):
+        self.heap.append(value)
+        self._sift_up(len(self.heap) - 1)
+
+    def delete_fast(self):
+        """Remove and return the minimum; None when the heap is empty"""
+        if not self.heap:
+            return None
+        self._swap(0, -1)
+        removed = self.heap.pop()
+        self._sift_down(0)
+        return removed
+
+    def remove_fast(self, value):
+        """Remove one occurrence of ``value``; False if it is absent"""
+        try:
+            idx = self.heap.index(value)
+        except ValueError:
+            return False
+        self._swap(idx, -1)
+        self.heap.pop()
+        if idx < len(self.heap):
+            self._sift_down(idx)
+            self._sift_up(idx)
+        return True
+
+    def search_fast(self, value):
+        """Index of one occurrence of ``value``, or -1"""
+        try:
+            return self.heap.index(value)
+        except ValueError:
+            return -1
 
     def to_array(self):
         return self.heap.copy()
 
 
-# Data structure generators for visualization
-DATA_STRUCTURES = {
-    "Linked List": LinkedList,
-    "Stack": Stack,
-    "Queue": Queue,
-    "Binary Tree": BinaryTree,
-    "Array": ArrayStructure,
+# -----------------------------------------------------------------------------
+# Self-balancing Binary Search Trees (AVL and Red-Black)
+# -----------------------------------------------------------------------------
+
+
+class AVLNode:
+    """Compact node for AVL trees"""
+
+    __slots__ = ("data", "left", "right", "parent", "height", "size")
+
+    def __init__(self, data, parent=None):
+        self.data = data
+        self.left = None
+        self.right = None
+        self.parent = parent
+        self.height = 1
+        self.size = 1
+
+
+class RBNode:
+    """Compact node for red-black trees"""
+
+    __slots__ = ("data", "left", "right", "parent", "red", "size")
+
+    def __init__(self, data, parent=None):
+        self.data = data
+        self.left = None
+        self.right = None
+        self.parent = parent
+        self.red = True
+        self.size = 1
+
+
+class BalancedTree(BulkLoadable):
+    """Shared binary search tree logic for the self-balancing trees.
+
+    Mutating operations are written once against an optional ``trace`` list.
+    The generator methods pass a list and replay the recorded
+    (state, highlight_indices, message) steps, while the ``*_fast`` methods
+    pass ``None`` and skip all snapshotting.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "insert", 1, "insert_fast", "delete"),
+        Operation("delete", "delete", 1, "delete_fast", "insert"),
+        Operation("search", "search", 1, "search_fast", mutates=False),
+        Operation("predecessor", "predecessor", 1, "predecessor_fast", mutates=False),
+        Operation("successor", "successor", 1, "successor_fast", mutates=False),
+        Operation("range_query", "range_query", 2, "range_query_fast", mutates=False),
+        Operation("select", "select", 1, "select_fast", mutates=False),
+        Operation("rank", "rank", 1, "rank_fast", mutates=False),
+        Operation("traverse", "inorder_traversal", 0, mutates=False),
+    )
+
+    node_class = None
+
+    def __init__(self, order_statistics=False):
+        self.root = None
+        self.size = 0
+        # Keep subtree sizes for rank/select; costs an O(log n) walk per update
+        self.order_statistics = order_statistics
+
+    # -- tracing helpers ------------------------------------------------------
+
+    def _positions(self):
+        """Map each node to its index in the array returned by ``to_array``"""
+        positions = {}
+        stack = [(self.root, 0)] if self.root else []
+        while stack:
+            node, idx = stack.pop()
+            positions[node] = idx
+            if node.left:
+                stack.append((node.left, 2 * idx + 1))
+            if node.right:
+                stack.append((node.right, 2 * idx + 2))
+        return positions
+
+    def _frame(self, positions):
+        """Frame listing each node once as ``(heap index, key)``, so a tall
+        tree does not cost an array of 2^height slots"""
+        order = sorted(positions.items(), key=lambda item: item[1])
+        return Frame(
+            data=[node.data for node, _ in order],
+            nodes=[(idx, node.data) for node, idx in order],
+            sizes=(
+                {idx: node.size for node, idx in order}
+                if self.order_statistics
+                else None
+            ),
+        )
+
+    def frame(self):
+        return self._frame(self._positions())
+
+    def _snapshot(self, nodes, message):
+        """A step showing the tree as it is now, highlighting ``nodes``"""
+        positions = self._positions()
+        highlight = [positions[node] for node in nodes if node in positions]
+        return self._frame(positions), highlight, message
+
+    def _step(self, trace, nodes, message):
+        if trace is not None:
+            trace.append(self._snapshot(nodes, message))
+
+    # -- rotations ------------------------------------------------------------
+
+    def _replace_child(self, parent, old, new):
+        if new:
+            new.parent = parent
+        if parent is None:
+            self.root = new
+        elif parent.left is old:
+            parent.left = new
+        else:
+            parent.right = new
+
+    def _after_rotate(self, lower, upper):
+        """Hook for subclasses to refresh per-node metadata after a rotation"""
+
+    @staticmethod
+    def _resize(node):
+        node.size = (
+            1
+            + (node.left.size if node.left else 0)
+            + (node.right.size if node.right else 0)
+        )
+
+    def _count_ancestors(self, node, delta):
+        """Add ``delta`` to the size of ``node`` and every ancestor"""
+        while node:
+            node.size += delta
+            node = node.parent
+
+    def _rotate_left(self, node, trace):
+        pivot = node.right
+        node.right = pivot.left
+        if pivot.left:
+            pivot.left.parent = node
+        self._replace_child(node.parent, node, pivot)
+        pivot.left = node
+        node.parent = pivot
+        if self.order_statistics:
+            # The rotated subtree keeps its total, so ancestors are unchanged
+            self._resize(node)
+            self._resize(pivot)
+        self._after_rotate(node, pivot)
+        self._step(trace, [pivot, node], "Rotated left at {}".format(node.data))
+        return pivot
+
+    def _rotate_right(self, node, trace):
+        pivot = node.left
+        node.left = pivot.right
+        if pivot.right:
+            pivot.right.parent = node
+        self._replace_child(node.parent, node, pivot)
+        pivot.right = node
+        node.parent = pivot
+        if self.order_statistics:
+            self._resize(node)
+            self._resize(pivot)
+        self._after_rotate(node, pivot)
+        self._step(trace, [pivot, node], "Rotated right at {}".format(node.data))
+        return pivot
+
+    # -- core operations ------------------------------------------------------
+
+    def _find(self, key, trace=None):
+        current = self.root
+        while current:
+            if trace is not None:
+                self._step(
+                    trace, [current], "Comparing {} with {}".format(key, current.data)
+                )
+            if key == current.data:
+                return current
+            current = current.left if key < current.data else current.right
+        return None
+
+    def _insert(self, key, trace=None):
+        parent = None
+        current = self.root
+        while current:
+            if key == current.data:
+                self._step(trace, [current], "{} is already in the tree".format(key))
+                return False
+            if trace is not None:
+                self._step(
+                    trace, [current], "Comparing {} with {}".format(key, current.data)
+                )
+            parent = current
+            current = current.left if key < current.data else current.right
+
+        node = self.node_class(key, parent)
+        if parent is None:
+            self.root = node
+        elif key < parent.data:
+            parent.left = node
+        else:
+            parent.right = node
+        self.size += 1
+        if self.order_statistics:
+            self._count_ancestors(parent, 1)
+        self._step(trace, [node], "Inserted {}".format(key))
+        self._rebalance_after_insert(node, trace)
+        return True
+
+    def _delete(self, key, trace=None):
+        node = self._find(key, trace)
+        if node is None:
+            self._step(trace, [], "{} not found in tree".format(key))
+            return False
+        if node.left and node.right:
+            # Replace the value with its in-order successor, then unlink that
+            successor = node.right
+            while successor.left:
+                successor = successor.left
+            self._step(
+                trace,
+                [node, successor],
+                "Replacing {} with successor {}".format(node.data, successor.data),
+            )
+            node.data = successor.data
+            node = successor
+        self.size -= 1
+        if self.order_statistics:
+            self._count_ancestors(node.parent, -1)
+        self._remove(node, trace)
+        self._step(trace, [], "Deleted {}".format(key))
+        return True
+
+    def _neighbour(self, key, before, trace=None):
+        """Closest key strictly below (``before``) or above ``key``"""
+        best = None
+        current = self.root
+        while current:
+            if trace is not None:
+                self._step(
+                    trace, [current], "Comparing {} with {}".format(key, current.data)
+                )
+            if (current.data < key) if before else (current.data > key):
+                best = current
+                current = current.right if before else current.left
+            else:
+                current = current.left if before else current.right
+        return best
+
+    def _range(self, low, high, trace=None):
+        result = []
+
+        def visit(node):
+            if node is None:
+                return
+            if low < node.data:
+                visit(node.left)
+            if low <= node.data <= high:
+                self._step(trace, [node], "{} is in range".format(node.data))
+                result.append(node.data)
+            if node.data < high:
+                visit(node.right)
+
+        visit(self.root)
+        return result
+
+    def _bulk_load(self, values):
+        if self.root:
+            for key in values:
+                self._insert(key)
+            return
+        keys = sorted(set(values))
+        # Depth of the first level that may be only partly filled
+        partial = (len(keys) + 1).bit_length() - 1
+
+        def build(lo, hi, parent, depth):
+            """Balanced subtree over keys[lo:hi]; returns (node, height)"""
+            if lo >= hi:
+                return None, 0
+            mid = (lo + hi) // 2
+            node = self.node_class(keys[mid], parent)
+            node.size = hi - lo
+            node.left, left_height = build(lo, mid, node, depth + 1)
+            node.right, right_height = build(mid + 1, hi, node, depth + 1)
+            height = 1 + max(left_height, right_height)
+            self._init_built(node, height, depth == partial)
+            return node, height
+
+        self.root, _ = build(0, len(keys), None, 0)
+        self.size = len(keys)
+
+    def _init_built(self, node, height, bottom):
+        """Set balance metadata on a bulk-built node; ``bottom`` marks the
+        partly filled last level"""
+
+    def _rebalance_after_insert(self, node, trace):
+        raise NotImplementedError
+
+    def _remove(self, node, trace):
+        """Unlink ``node`` (which has at most one child) and rebalance"""
+        raise NotImplementedError
+
+    # -- visualization operations --------------------------------------------
+
+    def insert(self, key):
+        """Insert a key, animating the search path and any rotations"""
+        trace = []
+        inserted = self._insert(key, trace)
+        yield from trace
+        return inserted
+
+    def delete(self, key):
+        """Delete a key, animating the search path and any rotations"""
+        trace = []
+        deleted = self._delete(key, trace)
+        yield from trace
+        return deleted
+
+    def search(self, key):
+        """Search for a key in O(log n)"""
+        trace = []
+        node = self._find(key, trace)
+        yield from trace
+        if node:
+            yield self._snapshot([node], "Found {}".format(key))
+        else:
+            yield self._snapshot([], "{} not found in tree".format(key))
+
+    def predecessor(self, key):
+        """Find the largest key smaller than ``key``"""
+        yield from self._neighbour_steps(key, True)
+
+    def successor(self, key):
+        """Find the smallest key larger than ``key``"""
+        yield from self._neighbour_steps(key, False)
+
+    def _neighbour_steps(self, key, before):
+        trace = []
+        node = self._neighbour(key, before, trace)
+        yield from trace
+        label = "Predecessor" if before else "Successor"
+        if node:
+            yield self._snapshot([node], "{} of {} is {}".format(label, key, node.data))
+        else:
+            yield self._snapshot([], "{} has no {}".format(key, label.lower()))
+
+    def range_query(self, low, high):
+        """Visit every key in [low, high] in sorted order"""
+        trace = []
+        found = self._range(low, high, trace)
+        yield from trace
+        yield self._snapshot([], "Keys in [{}, {}]: {}".format(low, high, found))
+
+    def select(self, k):
+        """Find the k-th smallest key (0-based) by descending on subtree sizes"""
+        if not self.order_statistics:
+            yield self._snapshot([], "Order statistics are disabled")
+            return
+        if not 0 <= k < self.size:
+            yield self._snapshot([], "{} is out of range".format(k))
+            return
+        trace = []
+        node = self._select(k, trace)
+        yield from trace
+        yield self._snapshot([node], "#{} smallest is {}".format(k, node.data))
+
+    def rank(self, key):
+        """Count the keys smaller than ``key``"""
+        if not self.order_statistics:
+            yield self._snapshot([], "Order statistics are disabled")
+            return
+        trace = []
+        index = self._rank(key, trace)
+        yield from trace
+        yield self._snapshot([], "{} keys are smaller than {}".format(index, key))
+
+    def _select(self, k, trace=None):
+        node = self.root
+        while True:
+            left = node.left.size if node.left else 0
+            if trace is not None:
+                self._step(
+                    trace,
+                    [node],
+                    "{} keys left of {}, looking for #{}".format(left, node.data, k),
+                )
+            if k < left:
+                node = node.left
+            elif k == left:
+                return node
+            else:
+                k -= left + 1
+                node = node.right
+
+    def _rank(self, key, trace=None):
+        rank = 0
+        node = self.root
+        while node:
+            if trace is not None:
+                self._step(
+                    trace,
+                    [node],
+                    "Comparing {} with {} ({} smaller so far)".format(
+                        key, node.data, rank
+                    ),
+                )
+            if key <= node.data:
+                node = node.left
+            else:
+                rank += 1 + (node.left.size if node.left else 0)
+                node = node.right
+        return rank
+
+    def inorder_traversal(self):
+        """Perform inorder traversal"""
+        positions = self._positions()
+        frame = self._frame(positions)
+        stack = []
+        current = self.root
+        while stack or current:
+            while current:
+                stack.append(current)
+                current = current.left
+            current = stack.pop()
+            yield frame, [positions[current]], "Visited {}".format(current.data)
+            current = current.right
+
+    # -- fast paths -------------------------------------------------------------
+
+    def insert_fast(self, key):
+        """Insert without recording steps; returns False for duplicates"""
+        return self._insert(key)
+
+    def delete_fast(self, key):
+        """Delete without recording steps; returns False if missing"""
+        return self._delete(key)
+
+    def search_fast(self, key):
+        return self._find(key) is not None
+
+    def predecessor_fast(self, key):
+        node = self._neighbour(key, True)
+        return node.data if node else None
+
+    def successor_fast(self, key):
+        node = self._neighbour(key, False)
+        return node.data if node else None
+
+    def range_query_fast(self, low, high):
+        return self._range(low, high)
+
+    def _require_sizes(self):
+        if not self.order_statistics:
+            raise ValueError("create the tree with order_statistics=True")
+
+    def select_fast(self, k):
+        """k-th smallest key (0-based) in O(log n)"""
+        self._require_sizes()
+        if not 0 <= k < self.size:
+            raise IndexError("tree index out of range")
+        return self._select(k).data
+
+    def rank_fast(self, key):
+        """Number of keys smaller than ``key`` in O(log n)"""
+        self._require_sizes()
+        return self._rank(key)
+
+    def size_array(self):
+        """Subtree sizes aligned with ``to_array``"""
+        result = [None] * len(self.to_array())
+        for node, idx in self._positions().items():
+            result[idx] = node.size
+        return result
+
+    def height(self):
+        """Number of levels in the tree"""
+
+        def depth(node):
+            return 1 + max(depth(node.left), depth(node.right)) if node else 0
+
+        return depth(self.root)
+
+    def to_array(self):
+        """Array layout where the children of index i sit at 2i+1 and 2i+2"""
+        positions = self._positions()
+        if not positions:
+            return []
+        result = [None] * (max(positions.values()) + 1)
+        for node, idx in positions.items():
+            result[idx] = node.data
+        return result
+
+
+class AVLTree(BalancedTree):
+    """AVL tree: subtree heights differ by at most one at every node"""
+
+    node_class = AVLNode
+
+    @staticmethod
+    def _height(node):
+        return node.height if node else 0
+
+    def _update(self, node):
+        node.height = 1 + max(self._height(node.left), self._height(node.right))
+
+    def _after_rotate(self, lower, upper):
+        self._update(lower)
+        self._update(upper)
+
+    def _init_built(self, node, height, bottom):
+        node.height = height
+
+    def _rebalance_from(self, node, trace):
+        while node:
+            old_height = node.height
+            self._update(node)
+            balance = self._height(node.left) - self._height(node.right)
+            if balance > 1:
+                if self._height(node.left.left) < self._height(node.left.right):
+                    self._rotate_left(node.left, trace)
+                node = self._rotate_right(node, trace)
+            elif balance < -1:
+                if self._height(node.right.right) < self._height(node.right.left):
+                    self._rotate_right(node.right, trace)
+                node = self._rotate_left(node, trace)
+            elif node.height == old_height:
+                # Balanced and unchanged, so no ancestor can be affected
+                break
+            node = node.parent
+
+    def _rebalance_after_insert(self, node, trace):
+        self._rebalance_from(node.parent, trace)
+
+    def _remove(self, node, trace):
+        parent = node.parent
+        self._replace_child(parent, node, node.left or node.right)
+        self._rebalance_from(parent, trace)
+
+
+class RedBlackTree(BalancedTree):
+    """Red-black tree: no red node has a red child and every root-to-leaf path
+    crosses the same number of black nodes"""
+
+    node_class = RBNode
+
+    @staticmethod
+    def _is_red(node):
+        return node is not None and node.red
+
+    def _init_built(self, node, height, bottom):
+        # Levels above the last are full, so colouring only that level red
+        # gives every path the same black height
+        node.red = bottom
+
+    def _rebalance_after_insert(self, node, trace):
+        while self._is_red(node.parent):
+            parent = node.parent
+            grandparent = parent.parent
+            parent_is_left = parent is grandparent.left
+            uncle = grandparent.right if parent_is_left else grandparent.left
+            if self._is_red(uncle):
+                parent.red = uncle.red = False
+                grandparent.red = True
+                self._step(
+                    trace,
+                    [grandparent, parent, uncle],
+                    "Recolored around {}".format(grandparent.data),
+                )
+                node = grandparent
+                continue
+            if parent_is_left:
+                if node is parent.right:
+                    node = parent
+                    self._rotate_left(node, trace)
+                    parent = node.parent
+                parent.red = False
+                grandparent.red = True
+                self._rotate_right(grandparent, trace)
+            else:
+                if node is parent.left:
+                    node = parent
+                    self._rotate_right(node, trace)
+                    parent = node.parent
+                parent.red = False
+                grandparent.red = True
+                self._rotate_left(grandparent, trace)
+        self.root.red = False
+
+    def _remove(self, node, trace):
+        child = node.left or node.right
+        parent = node.parent
+        self._replace_child(parent, node, child)
+        if node.red:
+            return
+        if self._is_red(child):
+            child.red = False
+            return
+        self._fix_double_black(child, parent, trace)
+
+    def _fix_double_black(self, node, parent, trace):
+        while node is not self.root and not self._is_red(node):
+            if node is parent.left:
+                sibling = parent.right
+                if sibling.red:
+                    sibling.red = False
+                    parent.red = True
+                    self._rotate_left(parent, trace)
+                    sibling = parent.right
+                if not self._is_red(sibling.left) and not self._is_red(sibling.right):
+                    sibling.red = True
+                    node, parent = parent, parent.parent
+                    continue
+                if not self._is_red(sibling.right):
+                    sibling.left.red = False
+                    sibling.red = True
+                    self._rotate_right(sibling, trace)
+                    sibling = parent.right
+                sibling.red = parent.red
+                parent.red = False
+                sibling.right.red = False
+                self._rotate_left(parent, trace)
+            else:
+                sibling = parent.left
+                if sibling.red:
+                    sibling.red = False
+                    parent.red = True
+                    self._rotate_right(parent, trace)
+                    sibling = parent.left
+                if not self._is_red(sibling.left) and not self._is_red(sibling.right):
+                    sibling.red = True
+                    node, parent = parent, parent.parent
+                    continue
+                if not self._is_red(sibling.left):
+                    sibling.right.red = False
+                    sibling.red = True
+                    self._rotate_left(sibling, trace)
+                    sibling = parent.left
+                sibling.red = parent.red
+                parent.red = False
+                sibling.left.red = False
+                self._rotate_right(parent, trace)
+            node = self.root
+        if node:
+            node.red = False
+
+    def _frame(self, positions):
+        frame = super()._frame(positions)
+        frame.colors = {
+            idx: "red" if node.red else "black" for node, idx in positions.items()
+        }
+        return frame
+
+    def color_array(self):
+        """Node colours aligned with ``to_array``"""
+        result = [None] * len(self.to_array())
+        for node, idx in self._positions().items():
+            result[idx] = "red" if node.red else "black"
+        return result
+
+
+# -----------------------------------------------------------------------------
+# Open-addressing Hash Table
+# -----------------------------------------------------------------------------
+
+
+class _Marker:
+    """Named sentinel for hash table slots"""
+
+    __slots__ = ("label",)
+
+    def __init__(self, label):
+        self.label = label
+
+    def __repr__(self):
+        return self.label
+
+
+_EMPTY = _Marker("<empty>")
+TOMBSTONE = _Marker("×")
+
+
+def _spread_hash(key):
+    """``hash(key)`` with every bit folded into the low ones the mask keeps.
+
+    Python ints hash to themselves, so masking the raw hash would put
+    sequential keys in one contiguous run of slots, a single cluster for
+    linear probing. A xor-shift, a multiply by an odd 64-bit constant and
+    another xor-shift (half of MurmurHash3's finalizer) spread them over the
+    table like random keys.
+    """
+    h = hash(key) & 0xFFFFFFFFFFFFFFFF
+    h = ((h ^ (h >> 33)) * 0xFF51AFD7ED558CCD) & 0xFFFFFFFFFFFFFFFF
+    return h ^ (h >> 33)
+
+
+class _Slots:
+    """One backing table of an open-addressing hash table"""
+
+    __slots__ = ("keys", "values", "hashes", "mask", "used", "tombstones")
+
+    def __init__(self, capacity):
+        self.keys = [_EMPTY] * capacity
+        self.values = [None] * capacity
+        self.hashes = [0] * capacity
+        self.mask = capacity - 1
+        self.used = 0
+        self.tombstones = 0
+
+
+class HashTable(BulkLoadable):
+    """Open-addressing hash map with linear or Robin Hood probing.
+
+    Linear probing marks deleted slots with tombstones; Robin Hood probing
+    keeps probe distances short by letting "poorer" keys steal slots and uses
+    backward-shift deletion instead. Growing the table is incremental: the old
+    table is kept alongside the new one and a few buckets migrate on every
+    operation, so no single call pays for a full rehash. Pass
+    ``migrate_batch=None`` to rehash everything at once instead.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "insert", 1, "insert_fast", "delete"),
+        Operation("delete", "delete", 1, "delete_fast", "insert"),
+        Operation("search", "search", 1, "search_fast", mutates=False),
+    )
+
+    PROBING = ("linear", "robin_hood")
+
+    def __init__(self, capacity=8, probing="linear", max_load=0.75, migrate_batch=4):
+        if probing not in self.PROBING:
+            raise ValueError("probing must be one of {}".format(self.PROBING))
+        if not 0 < max_load < 1:
+            raise ValueError("max_load must be between 0 and 1")
+        size = 4
+        while size < capacity:
+            size *= 2
+        self.probing = probing
+        self.max_load = max_load
+        self.migrate_batch = migrate_batch
+        self.size = 0
+        self._table = _Slots(size)
+        self._old = None  # table being migrated away from
+        self._migrate_pos = 0
+
+    @property
+    def capacity(self):
+        return len(self._table.keys)
+
+    @property
+    def load_factor(self):
+        """Occupied plus tombstoned slots over capacity of the live table"""
+        table = self._table
+        return (table.used + table.tombstones) / len(table.keys)
+
+    @property
+    def resizing(self):
+        return self._old is not None
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return self.search_fast(key)
+
+    # -- tracing helpers ------------------------------------------------------
+
+    def _step(self, trace, highlight, message):
+        if trace is not None:
+            trace.append((self.frame(), highlight, message))
+
+    # -- probing --------------------------------------------------------------
+
+    def _find(self, table, key, h, trace=None):
+        """Index of ``key`` in ``table`` or -1"""
+        mask = table.mask
+        keys = table.keys
+        hashes = table.hashes
+        robin_hood = self.probing == "robin_hood"
+        live = table is self._table
+        i = h & mask
+        dist = 0
+        while dist <= mask:
+            current = keys[i]
+            if trace is not None:
+                self._step(
+                    trace,
+                    [i] if live else [],
+                    "Probing {}slot {} for {}".format("" if live else "old ", i, key),
+                )
+            if current is _EMPTY:
+                return -1
+            if current is not TOMBSTONE:
+                if hashes[i] == h and (current is key or current == key):
+                    return i
+                # A richer resident means the key would have been placed earlier
+                if robin_hood and (i - hashes[i]) & mask < dist:
+                    return -1
+            i = (i + 1) & mask
+            dist += 1
+        return -1
+
+    def _place(self, table, key, value, h, trace=None):
+        """Store a key known to be absent from ``table``"""
+        mask = table.mask
+        keys = table.keys
+        robin_hood = self.probing == "robin_hood"
+        i = h & mask
+        dist = 0
+        while True:
+            current = keys[i]
+            if current is _EMPTY or current is TOMBSTONE:
+                if current is TOMBSTONE:
+                    table.tombstones -= 1
+                keys[i] = key
+                table.values[i] = value
+                table.hashes[i] = h
+                table.used += 1
+                if trace is not None:
+                    self._step(trace, [i], "Stored {} in slot {}".format(key, i))
+                return
+            if robin_hood:
+                resident_dist = (i - table.hashes[i]) & mask
+                if resident_dist < dist:
+                    if trace is not None:
+                        self._step(
+                            trace,
+                            [i],
+                            "{} (distance {}) takes slot {} from {} (distance {})".format(
+                                key, dist, i, current, resident_dist
+                            ),
+                        )
+                    keys[i], key = key, current
+                    table.values[i], value = value, table.values[i]
+                    table.hashes[i], h = h, table.hashes[i]
+                    dist = resident_dist
+            elif trace is not None:
+                self._step(trace, [i], "Slot {} is taken by {}".format(i, current))
+            i = (i + 1) & mask
+            dist += 1
+
+    def _remove(self, table, i):
+        keys = table.keys
+        table.used -= 1
+        if self.probing == "linear" or table is not self._table:
+            keys[i] = TOMBSTONE
+            table.values[i] = None
+            table.tombstones += 1
+            return
+        # Backward-shift deletion keeps Robin Hood tables tombstone-free
+        mask = table.mask
+        hashes = table.hashes
+        values = table.values
+        nxt = (i + 1) & mask
+        while keys[nxt] is not _EMPTY and (nxt - hashes[nxt]) & mask:
+            keys[i], values[i], hashes[i] = keys[nxt], values[nxt], hashes[nxt]
+            i = nxt
+            nxt = (i + 1) & mask
+        keys[i] = _EMPTY
+        values[i] = None
+
+    # -- resizing -------------------------------------------------------------
+
+    def _maybe_resize(self, trace=None):
+        if self.load_factor <= self.max_load:
+            return
+        if self._old is not None:
+            # Still migrating from the previous resize; finish it first
+            self._migrate(trace, len(self._old.keys))
+        table = self._table
+        capacity = len(table.keys)
+        # Only grow if live keys (not tombstones) are what fills the table
+        new_capacity = (
+            capacity * 2 if table.used > capacity * self.max_load / 2 else capacity
+        )
+        self._old = table
+        self._table = _Slots(new_capacity)
+        self._migrate_pos = 0
+        self._step(
+            trace,
+            [],
+            "Load factor {:.2f} exceeds {:.2f}: rehashing into {} slots".format(
+                (table.used + table.tombstones) / capacity,
+                self.max_load,
+                new_capacity,
+            ),
+        )
+        if self.migrate_batch is None:
+            self._migrate(trace, capacity)
+
+    def _migrate(self, trace=None, batch=None):
+        """Move the next ``batch`` buckets of the old table into the live one"""
+        old = self._old
+        if old is None:
+            return
+        batch = batch or self.migrate_batch or len(old.keys)
+        start = self._migrate_pos
+        end = min(start + batch, len(old.keys))
+        for i in range(start, end):
+            key = old.keys[i]
+            if key is not _EMPTY and key is not TOMBSTONE:
+                self._place(self._table, key, old.values[i], old.hashes[i])
+                # Leave a tombstone so unmigrated probe chains stay intact
+                old.keys[i] = TOMBSTONE
+                old.values[i] = None
+        self._migrate_pos = end
+        if end == len(old.keys):
+            self._old = None
+            self._step(trace, [], "Rehash complete ({} slots)".format(self.capacity))
+        elif trace is not None:
+            self._step(
+                trace,
+                [],
+                "Migrated old buckets {}-{} of {}".format(
+                    start, end - 1, len(old.keys)
+                ),
+            )
+
+    # -- core operations ------------------------------------------------------
+
+    def _insert(self, key, value=None, trace=None):
+        self._migrate(trace)
+        h = _spread_hash(key)
+        table = self._table
+        i = self._find(table, key, h, trace)
+        if i >= 0:
+            table.values[i] = value
+            self._step(trace, [i], "Updated {}".format(key))
+            return False
+        is_new = True
+        if self._old is not None:
+            j = self._find(self._old, key, h, trace)
+            if j >= 0:
+                # Move the key across early instead of updating it in place
+                self._remove(self._old, j)
+                is_new = False
+        self._place(table, key, value, h, trace)
+        if is_new:
+            self.size += 1
+        self._maybe_resize(trace)
+        return is_new
+
+    def _delete(self, key, trace=None):
+        self._migrate(trace)
+        h = _spread_hash(key)
+        for table in (self._table, self._old):
+            if table is None:
+                continue
+            i = self._find(table, key, h, trace)
+            if i >= 0:
+                self._remove(table, i)
+                self.size -= 1
+                self._step(
+                    trace,
+                    [i] if table is self._table else [],
+                    "Deleted {} (load factor {:.2f})".format(key, self.load_factor),
+                )
+                return True
+        self._step(trace, [], "{} not found".format(key))
+        return False
+
+    def _lookup(self, key, trace=None):
+        """Return (table, index) for ``key`` or (None, -1)"""
+        self._migrate(trace)
+        h = _spread_hash(key)
+        for table in (self._table, self._old):
+            if table is None:
+                continue
+            i = self._find(table, key, h, trace)
+            if i >= 0:
+                return table, i
+        return None, -1
+
+    # -- visualization operations --------------------------------------------
+
+    def insert(self, key, value=None):
+        """Insert or update a key, animating the probe sequence"""
+        trace = []
+        inserted = self._insert(key, value, trace)
+        self._step(
+            trace,
+            [],
+            "Load factor {:.2f} ({} keys, {} slots)".format(
+                self.load_factor, self.size, self.capacity
+            ),
+        )
+        yield from trace
+        return inserted
+
+    def delete(self, key):
+        """Delete a key, animating the probe sequence"""
+        trace = []
+        deleted = self._delete(key, trace)
+        yield from trace
+        return deleted
+
+    def search(self, key):
+        """Look up a key, animating the probe sequence"""
+        trace = []
+        table, i = self._lookup(key, trace)
+        yield from trace
+        if table is None:
+            yield self.frame(), [], "{} not found".format(key)
+        else:
+            yield (
+                self.frame(),
+                [i] if table is self._table else [],
+                "Found {} in slot {}".format(key, i),
+            )
+
+    # -- fast paths -------------------------------------------------------------
+
+    def insert_fast(self, key, value=None):
+        """Insert or update; returns True if the key was new"""
+        return self._insert(key, value)
+
+    def delete_fast(self, key):
+        return self._delete(key)
+
+    def search_fast(self, key):
+        return self._lookup(key)[0] is not None
+
+    def get(self, key, default=None):
+        table, i = self._lookup(key)
+        return default if table is None else table.values[i]
+
+    def _bulk_load(self, keys):
+        keys = list(keys)
+        if not self.size and self._old is None:
+            # Size the table up front so loading never triggers a resize
+            capacity = len(self._table.keys)
+            while len(keys) >= capacity * self.max_load:
+                capacity *= 2
+            self._table = _Slots(capacity)
+        for key in keys:
+            self._insert(key, None)
+
+    def frame(self):
+        """Slots plus the load and rehash progress shown above them"""
+        return Frame(
+            data=self.to_array(),
+            load_factor=self.load_factor,
+            max_load=self.max_load,
+            capacity=self.capacity,
+            probing=self.probing,
+            rehash=(self._migrate_pos, len(self._old.keys)) if self.resizing else None,
+        )
+
+    def to_array(self):
+        """Keys of the live table, with None for empty slots"""
+        return [None if key is _EMPTY else key for key in self._table.keys]
+
+
+# -----------------------------------------------------------------------------
+# Skip List
+# -----------------------------------------------------------------------------
+
+
+class SkipNode:
+    """Skip list tower: one forward link and link width per level"""
+
+    __slots__ = ("data", "value", "forward", "width")
+
+    def __init__(self, data, value, height):
+        self.data = data
+        self.value = value
+        self.forward = [None] * height
+        self.width = [1] * height
+
+
+class SkipList(BulkLoadable):
+    """Indexable skip list: an ordered map with expected O(log n) operations.
+
+    Every link also records how many bottom-level nodes it skips, which makes
+    rank and positional lookups logarithmic as well. Tower heights come from a
+    private ``random.Random`` so a given ``seed`` always builds the same list.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "insert", 1, "insert_fast", "delete"),
+        Operation("delete", "delete", 1, "delete_fast", "insert"),
+        Operation("search", "search", 1, "search_fast", mutates=False),
+        Operation("rank", "rank", 1, "rank_fast", mutates=False),
+        Operation("range_query", "range_query", 2, "range_query_fast", mutates=False),
+    )
+
+    def __init__(self, seed=None, max_level=32, p=0.5):
+        self.rng = random.Random(seed)
+        self.max_level = max_level
+        self.p = p
+        self.head = SkipNode(None, None, max_level)
+        self.level = 1  # number of levels currently in use
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        node = self.head.forward[0]
+        while node:
+            yield node.data
+            node = node.forward[0]
+
+    def items(self):
+        node = self.head.forward[0]
+        while node:
+            yield node.data, node.value
+            node = node.forward[0]
+
+    def _random_level(self):
+        height = 1
+        while height < self.max_level and self.rng.random() < self.p:
+            height += 1
+        return height
+
+    def _step(self, trace, highlight, message):
+        if trace is not None:
+            trace.append((self.frame(), highlight, message))
+
+    def _descend(self, key, trace=None):
+        """Last node before ``key`` on every level, plus each node's position"""
+        chain = [self.head] * self.level
+        positions = [0] * self.level
+        node = self.head
+        pos = 0  # head is position 0, the i-th key is position i + 1
+        for level in reversed(range(self.level)):
+            nxt = node.forward[level]
+            while nxt and nxt.data < key:
+                pos += node.width[level]
+                node = nxt
+                if trace is not None:
+                    self._step(
+                        trace,
+                        [pos - 1],
+                        "Level {}: {} < {}, move right".format(level, node.data, key),
+                    )
+                nxt = node.forward[level]
+            if trace is not None and level:
+                self._step(
+                    trace,
+                    [pos - 1] if pos else [],
+                    "Level {}: next is {}, drop down".format(
+                        level, "end" if nxt is None else nxt.data
+                    ),
+                )
+            chain[level] = node
+            positions[level] = pos
+        return chain, positions
+
+    def _insert(self, key, value=None, trace=None):
+        chain, positions = self._descend(key, trace)
+        candidate = chain[0].forward[0]
+        if candidate and candidate.data == key:
+            candidate.value = value
+            self._step(trace, [positions[0]], "Updated {}".format(key))
+            return False
+
+        height = self._random_level()
+        if height > self.level:
+            for level in range(self.level, height):
+                chain.append(self.head)
+                positions.append(0)
+                self.head.forward[level] = None
+                self.head.width[level] = self.size + 1
+            self.level = height
+
+        pos = positions[0]
+        node = SkipNode(key, value, height)
+        for level in range(height):
+            prev = chain[level]
+            node.forward[level] = prev.forward[level]
+            prev.forward[level] = node
+            node.width[level] = positions[level] + prev.width[level] - pos
+            prev.width[level] = pos + 1 - positions[level]
+        for level in range(height, self.level):
+            chain[level].width[level] += 1
+        self.size += 1
+        self._step(
+            trace, [pos], "Inserted {} with a tower of height {}".format(key, height)
+        )
+        return True
+
+    def _delete(self, key, trace=None):
+        chain, positions = self._descend(key, trace)
+        target = chain[0].forward[0]
+        if target is None or target.data != key:
+            self._step(trace, [], "{} not found".format(key))
+            return False
+        for level in range(self.level):
+            prev = chain[level]
+            if prev.forward[level] is target:
+                prev.width[level] += target.width[level] - 1
+                prev.forward[level] = target.forward[level]
+            else:
+                prev.width[level] -= 1
+        while self.level > 1 and self.head.forward[self.level - 1] is None:
+            self.level -= 1
+        self.size -= 1
+        self._step(trace, [], "Deleted {}".format(key))
+        return True
+
+    def _find(self, key, trace=None):
+        """Return (node, index) of ``key`` or (None, rank of ``key``)"""
+        if trace is not None:
+            chain, positions = self._descend(key, trace)
+            node, pos = chain[0], positions[0]
+        else:
+            # Same walk as _descend without recording the chain
+            node = self.head
+            pos = 0
+            for level in reversed(range(self.level)):
+                nxt = node.forward[level]
+                while nxt and nxt.data < key:
+                    pos += node.width[level]
+                    node = nxt
+                    nxt = node.forward[level]
+        candidate = node.forward[0]
+        if candidate and candidate.data == key:
+            return candidate, pos
+        return None, pos
+
+    def _range(self, low, high, trace=None):
+        chain, positions = self._descend(low, trace)
+        node = chain[0].forward[0]
+        index = positions[0]
+        result = []
+        while node and node.data <= high:
+            self._step(trace, [index], "{} is in range".format(node.data))
+            result.append(node.data)
+            node = node.forward[0]
+            index += 1
+        return result
+
+    # -- visualization operations --------------------------------------------
+
+    def insert(self, key, value=None):
+        """Insert or update a key, animating the search path"""
+        trace = []
+        inserted = self._insert(key, value, trace)
+        yield from trace
+        return inserted
+
+    def delete(self, key):
+        """Delete a key, animating the search path"""
+        trace = []
+        deleted = self._delete(key, trace)
+        yield from trace
+        return deleted
+
+    def search(self, key):
+        """Search from the top lane down, highlighting the path taken"""
+        trace = []
+        node, index = self._find(key, trace)
+        yield from trace
+        if node:
+            yield self.frame(), [index], "Found {} at index {}".format(key, index)
+        else:
+            yield self.frame(), [], "{} not found".format(key)
+
+    def rank(self, key):
+        """Count the keys smaller than ``key``"""
+        trace = []
+        _, index = self._find(key, trace)
+        yield from trace
+        yield self.frame(), [], "{} keys are smaller than {}".format(index, key)
+
+    def range_query(self, low, high):
+        """Visit every key in [low, high] in sorted order"""
+        trace = []
+        found = self._range(low, high, trace)
+        yield from trace
+        yield self.frame(), [], "Keys in [{}, {}]: {}".format(low, high, found)
+
+    # -- fast paths -------------------------------------------------------------
+
+    def insert_fast(self, key, value=None):
+        return self._insert(key, value)
+
+    def delete_fast(self, key):
+        return self._delete(key)
+
+    def search_fast(self, key):
+        return self._find(key)[0] is not None
+
+    def get(self, key, default=None):
+        node, _ = self._find(key)
+        return node.value if node else default
+
+    def _bulk_load(self, keys):
+        if self.size:
+            for key in keys:
+                self._insert(key)
+            return
+        # Link sorted keys left to right, remembering the last node per level
+        last = [self.head] * self.max_level
+        last_pos = [0] * self.max_level
+        for pos, key in enumerate(sorted(set(keys)), 1):
+            height = self._random_level()
+            node = SkipNode(key, None, height)
+            for level in range(height):
+                last[level].forward[level] = node
+                last[level].width[level] = pos - last_pos[level]
+                last[level] = node
+                last_pos[level] = pos
+            self.level = max(self.level, height)
+            self.size = pos
+        for level in range(self.level):
+            last[level].width[level] = self.size + 1 - last_pos[level]
+
+    def rank_fast(self, key):
+        return self._find(key)[1]
+
+    def select_fast(self, index):
+        """Key at ``index`` in sorted order, in expected O(log n)"""
+        if not 0 <= index < self.size:
+            raise IndexError("skip list index out of range")
+        node = self.head
+        pos = 0
+        for level in reversed(range(self.level)):
+            while node.forward[level] and pos + node.width[level] <= index + 1:
+                pos += node.width[level]
+                node = node.forward[level]
+        return node.data
+
+    def range_query_fast(self, low, high):
+        return self._range(low, high)
+
+    def lanes(self):
+        """Bottom-level indices of the nodes present on each level"""
+        index = {}
+        node = self.head.forward[0]
+        while node:
+            index[node] = len(index)
+            node = node.forward[0]
+        lanes = []
+        for level in range(self.level):
+            lane = []
+            node = self.head.forward[level]
+            while node:
+                lane.append(index[node])
+                node = node.forward[level]
+            lanes.append(lane)
+        return lanes
+
+    def frame(self):
+        return Frame(data=self.to_array(), lanes=self.lanes())
+
+    def to_array(self):
+        return list(self)
+
+
+# -----------------------------------------------------------------------------
+# Disk-backed B+ Tree
+# -----------------------------------------------------------------------------
+
+
+class _BPage:
+    """Decoded copy of one B+ tree page"""
+
+    __slots__ = ("page_id", "leaf", "keys", "pointers", "next_leaf")
+
+    def __init__(self, page_id, leaf, keys=None, pointers=None, next_leaf=-1):
+        self.page_id = page_id
+        self.leaf = leaf
+        self.keys = keys if keys is not None else []
+        # Values for leaves, child page ids for internal pages
+        self.pointers = pointers if pointers is not None else []
+        self.next_leaf = next_leaf
+
+
+class BPlusTree(BulkLoadable):
+    """B+ tree of int64 keys and values stored in fixed-size pages of an
+    mmap'd file.
+
+    Page 0 holds the file header; every other page is one node. Internal
+    pages store separator keys and child page ids, leaves store keys, values
+    and a link to the next leaf so range scans never climb back up the tree.
+    With ``path=None`` the tree lives in an anonymous temporary file. Deletes
+    are lazy: keys are removed from their leaf but underfull pages are not
+    merged.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "insert", 1, "insert_fast", "delete"),
+        Operation("delete", "delete", 1, "delete_fast", "insert"),
+        Operation("search", "search", 1, "search_fast", mutates=False),
+        Operation("range_query", "range_query", 2, "range_query_fast", mutates=False),
+    )
+
+    MAGIC = b"DSABPTRE"
+    FILE_HEADER = struct.Struct("<8sIIqqqq")  # magic, page/key sizes, root, counts
+    PAGE_HEADER = struct.Struct("<BHq")  # leaf flag, key count, next leaf
+    PAGE_HEADER_SIZE = 16
+
+    def __init__(self, path=None, page_size=4096, fanout=None):
+        self.path = path
+        if path is not None and os.path.exists(path) and os.path.getsize(path):
+            self._file = open(path, "r+b")
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+            self._read_header(page_size)
+            return
+
+        capacity = self.keys_per_page(page_size)
+        max_keys = capacity if fanout is None else fanout - 1
+        if not 2 <= max_keys <= capacity:
+            raise ValueError(
+                "fanout must be between 3 and {} for {}-byte pages".format(
+                    capacity + 1, page_size
+                )
+            )
+        self.page_size = page_size
+        self.max_keys = max_keys
+        self._file = tempfile.TemporaryFile() if path is None else open(path, "w+b")
+        self._file.truncate(page_size * 8)
+        self._mm = mmap.mmap(self._file.fileno(), page_size * 8)
+        self.page_count = 1  # the header page
+        self.size = 0
+        self.height = 1
+        self.root = self._allocate()
+        self._write(_BPage(self.root, True))
+        self._write_header()
+
+    @classmethod
+    def keys_per_page(cls, page_size):
+        """Largest key count whose keys and pointers fit in one page"""
+        return (page_size - cls.PAGE_HEADER_SIZE - 8) // 16
+
+    def __len__(self):
+        return self.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def flush(self):
+        self._write_header()
+        self._mm.flush()
+
+    def close(self):
+        if self._mm.closed:
+            return
+        self.flush()
+        self._mm.close()
+        self._file.close()
+
+    # -- page I/O -------------------------------------------------------------
+
+    def _read_header(self, page_size):
+        magic, stored_page_size, max_keys, root, page_count, size, height = (
+            self.FILE_HEADER.unpack_from(self._mm, 0)
+        )
+        if magic != self.MAGIC:
+            raise ValueError("{} is not a B+ tree file".format(self.path))
+        if stored_page_size != page_size:
+            raise ValueError(
+                "{} was written with {}-byte pages".format(self.path, stored_page_size)
+            )
+        self.page_size = stored_page_size
+        self.max_keys = max_keys
+        self.root = root
+        self.page_count = page_count
+        self.size = size
+        self.height = height
+
+    def _write_header(self):
+        self.FILE_HEADER.pack_into(
+            self._mm,
+            0,
+            self.MAGIC,
+            self.page_size,
+            self.max_keys,
+            self.root,
+            self.page_count,
+            self.size,
+            self.height,
+        )
+
+    def _allocate(self):
+        page_id = self.page_count
+        self.page_count += 1
+        needed = self.page_count * self.page_size
+        if needed > len(self._mm):
+            # Grow the file geometrically and remap it
+            new_size = max(needed, len(self._mm) * 2)
+            self._mm.flush()
+            self._mm.close()
+            self._file.truncate(new_size)
+            self._mm = mmap.mmap(self._file.fileno(), new_size)
+        return page_id
+
+    def _read(self, page_id):
+        offset = page_id * self.page_size
+        leaf, count, next_leaf = self.PAGE_HEADER.unpack_from(self._mm, offset)
+        keys_at = offset + self.PAGE_HEADER_SIZE
+        pointers_at = keys_at + 8 * self.max_keys
+        keys = array("q")
+        keys.frombytes(self._mm[keys_at : keys_at + 8 * count])
+        pointers = array("q")
+        n_pointers = count if leaf else count + 1
+        pointers.frombytes(self._mm[pointers_at : pointers_at + 8 * n_pointers])
+        return _BPage(page_id, bool(leaf), keys.tolist(), pointers.tolist(), next_leaf)
+
+    def _write(self, page):
+        offset = page.page_id * self.page_size
+        self.PAGE_HEADER.pack_into(
+            self._mm, offset, page.leaf, len(page.keys), page.next_leaf
+        )
+        keys_at = offset + self.PAGE_HEADER_SIZE
+        pointers_at = keys_at + 8 * self.max_keys
+        keys = array("q", page.keys).tobytes()
+        pointers = array("q", page.pointers).tobytes()
+        self._mm[keys_at : keys_at + len(keys)] = keys
+        self._mm[pointers_at : pointers_at + len(pointers)] = pointers
+
+    # -- tracing helpers ------------------------------------------------------
+
+    def _step(self, trace, page_ids, message):
+        if trace is not None:
+            trace.append((self.frame(), page_ids, message))
+
+    # -- core operations ------------------------------------------------------
+
+    def _find_leaf(self, key, trace=None, path=None):
+        page = self._read(self.root)
+        while not page.leaf:
+            i = bisect.bisect_right(page.keys, key)
+            if trace is not None:
+                self._step(
+                    trace,
+                    [page.page_id],
+                    "Page {}: following child {} for {}".format(page.page_id, i, key),
+                )
+            if path is not None:
+                path.append((page, i))
+            page = self._read(page.pointers[i])
+        return page
+
+    def _insert(self, key, value=0, trace=None):
+        path = []
+        page = self._find_leaf(key, trace, path)
+        i = bisect.bisect_left(page.keys, key)
+        if i < len(page.keys) and page.keys[i] == key:
+            page.pointers[i] = value
+            self._write(page)
+            self._step(trace, [page.page_id], "Updated {}".format(key))
+            return False
+        page.keys.insert(i, key)
+        page.pointers.insert(i, value)
+        self.size += 1
+        leaf_id = page.page_id
+        splits = []
+
+        while len(page.keys) > self.max_keys:
+            mid = len(page.keys) // 2
+            right = _BPage(self._allocate(), page.leaf)
+            if page.leaf:
+                right.keys, page.keys = page.keys[mid:], page.keys[:mid]
+                right.pointers, page.pointers = page.pointers[mid:], page.pointers[:mid]
+                right.next_leaf, page.next_leaf = page.next_leaf, right.page_id
+                separator = right.keys[0]
+            else:
+                separator = page.keys[mid]
+                right.keys, page.keys = page.keys[mid + 1 :], page.keys[:mid]
+                right.pointers = page.pointers[mid + 1 :]
+                page.pointers = page.pointers[: mid + 1]
+            self._write(page)
+            self._write(right)
+
+            if path:
+                parent, idx = path.pop()
+                parent.keys.insert(idx, separator)
+                parent.pointers.insert(idx + 1, right.page_id)
+            else:
+                parent = _BPage(
+                    self._allocate(), False, [separator], [page.page_id, right.page_id]
+                )
+                self.root = parent.page_id
+                self.height += 1
+            splits.append(
+                (
+                    [page.page_id, right.page_id],
+                    "Split page {}, pushing {} up".format(page.page_id, separator),
+                )
+            )
+            page = parent
+
+        self._write(page)
+        self._write_header()
+        # Pages are only consistent on disk once every split has been written
+        for page_ids, message in splits:
+            self._step(trace, page_ids, message)
+        self._step(trace, [leaf_id], "Inserted {}".format(key))
+        return True
+
+    def _delete(self, key, trace=None):
+        page = self._find_leaf(key, trace)
+        i = bisect.bisect_left(page.keys, key)
+        if i == len(page.keys) or page.keys[i] != key:
+            self._step(trace, [page.page_id], "{} not found".format(key))
+            return False
+        del page.keys[i]
+        del page.pointers[i]
+        self._write(page)
+        self.size -= 1
+        self._write_header()
+        self._step(trace, [page.page_id], "Deleted {}".format(key))
+        return True
+
+    def _lookup(self, key, trace=None):
+        """Return (leaf page, index) of ``key`` or (leaf page, -1)"""
+        page = self._find_leaf(key, trace)
+        i = bisect.bisect_left(page.keys, key)
+        if i < len(page.keys) and page.keys[i] == key:
+            return page, i
+        return page, -1
+
+    def _scan(self, low, high, trace=None):
+        """(key, value) pairs in [low, high], following the leaf links"""
+        page = self._find_leaf(low, trace)
+        i = bisect.bisect_left(page.keys, low)
+        while True:
+            if trace is not None:
+                self._step(
+                    trace, [page.page_id], "Scanning leaf {}".format(page.page_id)
+                )
+            while i < len(page.keys):
+                if page.keys[i] > high:
+                    return
+                yield page.keys[i], page.pointers[i]
+                i += 1
+            if page.next_leaf < 0:
+                return
+            page = self._read(page.next_leaf)
+            i = 0
+
+    def load_sorted(self, keys, values=None):
+        """Bulk-build an empty tree bottom-up from strictly increasing keys"""
+        if self.size:
+            raise ValueError("load_sorted requires an empty tree")
+        keys = list(keys)
+        values = list(keys) if values is None else list(values)
+        if len(values) != len(keys):
+            raise ValueError("keys and values must have the same length")
+        if any(a >= b for a, b in zip(keys, keys[1:])):
+            raise ValueError("keys must be strictly increasing")
+        if not keys:
+            return
+
+        # Reuse the file from the first data page onwards
+        self.page_count = 1
+        step = self.max_keys
+        level = []  # (smallest key, page id) of each node on the level
+        previous = None
+        for start in range(0, len(keys), step):
+            page = _BPage(
+                self._allocate(),
+                True,
+                keys[start : start + step],
+                values[start : start + step],
+            )
+            if previous is not None:
+                previous.next_leaf = page.page_id
+                self._write(previous)
+            level.append((page.keys[0], page.page_id))
+            previous = page
+        self._write(previous)
+
+        height = 1
+        fanout = self.max_keys + 1
+        while len(level) > 1:
+            groups = [level[i : i + fanout] for i in range(0, len(level), fanout)]
+            if len(groups[-1]) == 1:
+                # Every internal page needs at least two children
+                groups[-1].insert(0, groups[-2].pop())
+            level = []
+            for group in groups:
+                page = _BPage(
+                    self._allocate(),
+                    False,
+                    [smallest for smallest, _ in group[1:]],
+                    [page_id for _, page_id in group],
+                )
+                self._write(page)
+                level.append((group[0][0], page.page_id))
+            height += 1
+
+        self.root = level[0][1]
+        self.height = height
+        self.size = len(keys)
+        self._write_header()
+
+    # -- visualization operations --------------------------------------------
+
+    def insert(self, key, value=0):
+        """Insert or update a key, animating the descent and page splits"""
+        trace = []
+        inserted = self._insert(key, value, trace)
+        yield from trace
+        return inserted
+
+    def delete(self, key):
+        """Delete a key from its leaf page"""
+        trace = []
+        deleted = self._delete(key, trace)
+        yield from trace
+        return deleted
+
+    def search(self, key):
+        """Descend from the root page to the leaf that holds ``key``"""
+        trace = []
+        page, i = self._lookup(key, trace)
+        yield from trace
+        if i >= 0:
+            yield self.frame(), [page.page_id], "Found {} in leaf {}".format(
+                key, page.page_id
+            )
+        else:
+            yield self.frame(), [], "{} not found".format(key)
+
+    def range_query(self, low, high):
+        """Scan [low, high] along the linked leaves"""
+        trace = []
+        found = [key for key, _ in self._scan(low, high, trace)]
+        yield from trace
+        yield self.frame(), [], "Keys in [{}, {}]: {}".format(low, high, found)
+
+    # -- fast paths -------------------------------------------------------------
+
+    def insert_fast(self, key, value=0):
+        return self._insert(key, value)
+
+    def delete_fast(self, key):
+        return self._delete(key)
+
+    def search_fast(self, key):
+        return self._lookup(key)[1] >= 0
+
+    def get(self, key, default=None):
+        page, i = self._lookup(key)
+        return page.pointers[i] if i >= 0 else default
+
+    def _bulk_load(self, keys):
+        if self.size:
+            for key in keys:
+                self._insert(key)
+        else:
+            keys = sorted(set(keys))
+            self.load_sorted(keys, [0] * len(keys))
+
+    def range_query_fast(self, low, high):
+        return [key for key, _ in self._scan(low, high)]
+
+    def items(self, low=-(2**63), high=2**63 - 1):
+        return self._scan(low, high)
+
+    def pages_by_level(self):
+        """(page id, keys, child page ids) for every page, level by level"""
+        levels = []
+        current = [self.root]
+        while current:
+            pages = [self._read(page_id) for page_id in current]
+            levels.append(
+                [
+                    (page.page_id, page.keys, [] if page.leaf else page.pointers)
+                    for page in pages
+                ]
+            )
+            current = [
+                child for page in pages if not page.leaf for child in page.pointers
+            ]
+        return levels
+
+    def frame(self):
+        """Pages level by level; the keys are read off the leaf level"""
+        levels = self.pages_by_level()
+        return Frame(
+            data=[key for _, keys, _ in levels[-1] for key in keys], levels=levels
+        )
+
+    def to_array(self):
+        return [key for key, _ in self.items()]
+
+
+class SmallPageBPlusTree(BPlusTree):
+    """B+ tree with tiny pages (four keys each) so splits show up on the canvas"""
+
+    SMALL_PAGE_SIZE = 96
+
+    def __init__(self, path=None):
+        super().__init__(path, page_size=self.SMALL_PAGE_SIZE)
+
+
+# -----------------------------------------------------------------------------
+# Disjoint Set (Union-Find)
+# -----------------------------------------------------------------------------
+
+
+class DisjointSet(BulkLoadable):
+    """Union-find over arbitrary hashable labels.
+
+    Each label maps to an index into flat ``parent`` and ``rank`` arrays.
+    Union by rank keeps trees shallow and find compresses every path it
+    walks, giving near-constant amortized operations.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "insert", 1, "insert_fast"),
+        Operation("search", "search", 1, "search_fast", mutates=False),
+        Operation("find", "find", 1, "find_fast", mutates=False),
+        Operation("union", "union", 2, "union_fast"),
+    )
+
+    def __init__(self, elements=()):
+        self.index = {}  # label -> position in the arrays
+        self.labels = []
+        self.parent = array("q")
+        self.rank = array("q")
+        self.count = 0  # number of disjoint sets
+        for element in elements:
+            self.insert_fast(element)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __contains__(self, element):
+        return element in self.index
+
+    def _root(self, i, trace=None):
+        parent = self.parent
+        path = []
+        while parent[i] != i:
+            if trace is not None:
+                trace.append(
+                    (
+                        self.frame(),
+                        [i, parent[i]],
+                        "Jump from {} to its parent {}".format(
+                            self.labels[i], self.labels[parent[i]]
+                        ),
+                    )
+                )
+            path.append(i)
+            i = parent[i]
+        for j in path:
+            parent[j] = i
+        if trace is not None and len(path) > 1:
+            trace.append(
+                (
+                    self.frame(),
+                    path + [i],
+                    "Path compression: {} now point to {}".format(
+                        ", ".join(str(self.labels[j]) for j in path), self.labels[i]
+                    ),
+                )
+            )
+        return i
+
+    def _union(self, a, b, trace=None):
+        ra = self._root(self.index[a], trace)
+        rb = self._root(self.index[b], trace)
+        if ra == rb:
+            if trace is not None:
+                trace.append(
+                    (self.frame(), [ra], "{} and {} are already joined".format(a, b))
+                )
+            return False
+        if self.rank[ra] < self.rank[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        if self.rank[ra] == self.rank[rb]:
+            self.rank[ra] += 1
+        self.count -= 1
+        if trace is not None:
+            trace.append(
+                (
+                    self.frame(),
+                    [rb, ra],
+                    "Linked root {} under root {}".format(
+                        self.labels[rb], self.labels[ra]
+                    ),
+                )
+            )
+        return True
+
+    # -- visualization operations --------------------------------------------
+
+    def insert(self, element):
+        """Add ``element`` as a singleton set"""
+        if element in self.index:
+            yield self.frame(), [self.index[element]], "{} already exists".format(
+                element
+            )
+            return
+        self.insert_fast(element)
+        yield self.frame(), [len(self.labels) - 1], "Made set {{{}}}".format(element)
+
+    def find(self, element):
+        """Follow parent pointers to the representative, compressing the path"""
+        if element not in self.index:
+            yield self.frame(), [], "{} is not in any set".format(element)
+            return
+        trace = []
+        root = self._root(self.index[element], trace)
+        yield from trace
+        yield self.frame(), [root], "Representative of {} is {}".format(
+            element, self.labels[root]
+        )
+
+    def search(self, element):
+        """Alias of ``find`` for the generic Search control"""
+        yield from self.find(element)
+
+    def union(self, a, b):
+        """Merge the sets containing ``a`` and ``b`` (union by rank)"""
+        missing = [x for x in (a, b) if x not in self.index]
+        if missing:
+            yield self.frame(), [], "{} is not in any set".format(missing[0])
+            return
+        trace = []
+        self._union(a, b, trace)
+        yield from trace
+
+    def _bulk_load(self, elements):
+        for element in elements:
+            self.insert_fast(element)
+
+    # -- fast paths -------------------------------------------------------------
+
+    def insert_fast(self, element):
+        if element in self.index:
+            return False
+        i = len(self.labels)
+        self.index[element] = i
+        self.labels.append(element)
+        self.parent.append(i)
+        self.rank.append(0)
+        self.count += 1
+        return True
+
+    def find_fast(self, element):
+        return self.labels[self._root(self.index[element])]
+
+    def search_fast(self, element):
+        return element in self.index
+
+    def union_fast(self, a, b):
+        """Merge two sets; returns False if they were already joined"""
+        return self._union(a, b)
+
+    def connected(self, a, b):
+        return self._root(self.index[a]) == self._root(self.index[b])
+
+    def parent_labels(self):
+        """Label of each element's parent, aligned with ``to_array``"""
+        return [self.labels[p] for p in self.parent]
+
+    def frame(self):
+        return Frame(
+            data=self.to_array(), parents=list(self.parent), ranks=list(self.rank)
+        )
+
+    def to_array(self):
+        return list(self.labels)
+
+
+# -----------------------------------------------------------------------------
+# Persistent (immutable, structurally shared) structures
+# -----------------------------------------------------------------------------
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+
+
+class PersistentVector:
+    """Immutable vector stored as a 32-way trie of tuples.
+
+    ``append``, ``set`` and ``pop`` return a new vector that copies only the
+    O(log32 n) nodes on the path to the changed slot; everything else is
+    shared with the original.
+    """
+
+    __slots__ = ("size", "shift", "root")
+
+    def __init__(self, size=0, shift=0, root=()):
+        self.size = size
+        self.shift = shift  # bits consumed above the leaves
+        self.root = root
+
+    @classmethod
+    def from_iterable(cls, values):
+        vector = cls()
+        for value in values:
+            vector = vector.append(value)
+        return vector
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        def walk(node, shift):
+            if shift:
+                for child in node:
+                    yield from walk(child, shift - _BITS)
+            else:
+                yield from node
+
+        return walk(self.root, self.shift) if self.size else iter(())
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("vector index out of range")
+        node = self.root
+        for shift in range(self.shift, 0, -_BITS):
+            node = node[(index >> shift) & _MASK]
+        return node[index & _MASK]
+
+    def append(self, value):
+        if not self.size:
+            return PersistentVector(1, 0, (value,))
+        root, shift = self.root, self.shift
+        if self.size == 1 << (shift + _BITS):
+            # Root is full: grow the trie by one level
+            root, shift = (root,), shift + _BITS
+        return PersistentVector(
+            self.size + 1, shift, self._push(root, shift, self.size, value)
+        )
+
+    def _push(self, node, shift, index, value):
+        if not shift:
+            return node + (value,)
+        i = (index >> shift) & _MASK
+        if i < len(node):
+            child = self._push(node[i], shift - _BITS, index, value)
+            return node[:i] + (child,) + node[i + 1 :]
+        # Start a fresh path down to a new leaf
+        for _ in range(shift // _BITS):
+            value = (value,)
+        return node + (value,)
+
+    def set(self, index, value):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("vector index out of range")
+
+        def assign(node, shift):
+            i = (index >> shift) & _MASK
+            child = value if not shift else assign(node[i], shift - _BITS)
+            return node[:i] + (child,) + node[i + 1 :]
+
+        return PersistentVector(self.size, self.shift, assign(self.root, self.shift))
+
+    def pop(self):
+        """Vector without its last element"""
+        if not self.size:
+            raise IndexError("pop from empty vector")
+        if self.size == 1:
+            return PersistentVector()
+
+        def trim(node, shift):
+            if not shift:
+                return node[:-1]
+            child = trim(node[-1], shift - _BITS)
+            return node[:-1] + (child,) if child else node[:-1]
+
+        root, shift = trim(self.root, self.shift), self.shift
+        if shift and len(root) == 1:
+            root, shift = root[0], shift - _BITS
+        return PersistentVector(self.size - 1, shift, root)
+
+
+class PersistentStructure(BulkLoadable):
+    """Keeps every version of an immutable structure for undo and time travel.
+
+    ``versions[i]`` is the state after the i-th change. Versions share all
+    unchanged parts, so each one costs only what its operation touched.
+    Changing an older version discards the versions after it, as in an editor.
+    """
+
+    OPERATIONS = (
+        Operation("undo", None, 0, "undo", "redo"),
+        Operation("redo", None, 0, "redo", "undo"),
+    )
+
+    def __init__(self, empty):
+        self.versions = [empty]
+        self.current = 0
+
+    @property
+    def version(self):
+        return self.versions[self.current]
+
+    def _commit(self, version):
+        del self.versions[self.current + 1 :]
+        self.versions.append(version)
+        self.current += 1
+
+    def undo(self):
+        """Step back one version; returns False at the oldest"""
+        return self.checkout(self.current - 1)
+
+    def redo(self):
+        """Step forward one version; returns False at the newest"""
+        return self.checkout(self.current + 1)
+
+    def checkout(self, index):
+        """Make ``versions[index]`` current in O(1)"""
+        if not 0 <= index < len(self.versions):
+            return False
+        self.current = index
+        return True
+
+
+class PersistentList(PersistentStructure):
+    """List with full version history, backed by ``PersistentVector``"""
+
+    OPERATIONS = PersistentStructure.OPERATIONS + (
+        Operation("insert", "insert", 1, "append_fast", "pop"),
+        Operation("pop", "delete", 0, "pop_fast", "insert"),
+        Operation("delete", "delete", 1),
+        Operation("search", "search", 1, mutates=False),
+    )
+
+    def __init__(self):
+        super().__init__(PersistentVector())
+
+    def __len__(self):
+        return len(self.version)
+
+    def __getitem__(self, index):
+        return self.version[index]
+
+    def insert(self, value):
+        """Append ``value`` as a new version"""
+        self.append_fast(value)
+        yield self.frame(), [len(self) - 1], f"Appended {value}"
+
+    def delete(self, value=None):
+        """Remove the last item, or the first occurrence of ``value``"""
+        if not len(self):
+            yield self.frame(), [], "List is empty"
+            return
+        if value is None:
+            removed = self.pop_fast()
+            yield self.frame(), [], f"Popped {removed} from end"
+            return removed
+        idx = self._index(value)
+        if idx < 0:
+            yield self.frame(), [], f"{value} not found"
+            return
+        self.remove_at_fast(idx)
+        yield self.frame(), [idx], f"Removed {value} at index {idx}"
+
+    def search(self, value):
+        for idx, item in enumerate(self.version):
+            yield self.frame(), [idx], f"Checking index {idx}"
+            if item == value:
+                yield self.frame(), [idx], f"Found {value} at index {idx}"
+                return
+        yield self.frame(), [], f"{value} not found"
+
+    def _index(self, value):
+        for idx, item in enumerate(self.version):
+            if item == value:
+                return idx
+        return -1
+
+    def _bulk_load(self, values):
+        vector = self.version
+        for value in values:
+            vector = vector.append(value)
+        self._commit(vector)
+
+    # -- fast paths ---------------------------------------------------------
+
+    def append_fast(self, value):
+        self._commit(self.version.append(value))
+
+    def set_fast(self, index, value):
+        self._commit(self.version.set(index, value))
+
+    def pop_fast(self):
+        """Remove and return the last item; None when the list is empty"""
+        if not len(self):
+            return None
+        removed = self.version[-1]
+        self._commit(self.version.pop())
+        return removed
+
+    def remove_at_fast(self, index):
+        """Remove ``items[index]``; only the suffix after it is rebuilt"""
+        vector = self.version
+        tail = [vector[i] for i in range(index + 1, len(vector))]
+        for _ in range(len(vector) - index):
+            vector = vector.pop()
+        for value in tail:
+            vector = vector.append(value)
+        self._commit(vector)
+
+    def to_array(self):
+        return list(self.version)
+
+
+class PersistentStack(PersistentStructure):
+    """Stack with full version history.
+
+    Each version is a ``(size, cell)`` pair where ``cell`` is a ``(top,
+    rest)`` cons cell, so push and pop are O(1) in time and memory and all
+    versions share their common bottom.
+    """
+
+    OPERATIONS = PersistentStructure.OPERATIONS + (
+        Operation("insert", "push", 1, "push_fast", "delete"),
+        Operation("delete", "pop", 0, "pop_fast", "insert"),
+        Operation("search", "peek", 0, mutates=False),
+    )
+
+    def __init__(self):
+        super().__init__((0, None))
+
+    def __len__(self):
+        return self.version[0]
+
+    def push(self, item):
+        """Push an item as a new version"""
+        self.push_fast(item)
+        yield self.frame(), [len(self) - 1], "Pushed {} onto stack".format(item)
+
+    def pop(self):
+        """Pop an item as a new version"""
+        if not len(self):
+            yield self.frame(), [], "Stack is empty"
+            return
+        item = self.pop_fast()
+        yield self.frame(), [], "Popped {} from stack".format(item)
+        return item
+
+    def peek(self):
+        if not len(self):
+            yield self.frame(), [], "Stack is empty"
+            return
+        yield self.frame(), [len(self) - 1], "Peeked at {}".format(self.version[1][0])
+
+    def _bulk_load(self, values):
+        size, cell = self.version
+        for value in values:
+            size, cell = size + 1, (value, cell)
+        self._commit((size, cell))
+
+    # -- fast paths ---------------------------------------------------------
+
+    def push_fast(self, item):
+        size, cell = self.version
+        self._commit((size + 1, (item, cell)))
+
+    def pop_fast(self):
+        """Remove and return the top item; None when the stack is empty"""
+        size, cell = self.version
+        if cell is None:
+            return None
+        self._commit((size - 1, cell[1]))
+        return cell[0]
+
+    def to_array(self):
+        """Bottom of the stack first, matching ``Stack.to_array``"""
+        result = []
+        cell = self.version[1]
+        while cell is not None:
+            result.append(cell[0])
+            cell = cell[1]
+        result.reverse()
+        return result
+
+
+class PersistentQueue(PersistentStructure):
+    """Queue with full version history.
+
+    Each version is ``(size, front, rear)`` where both ends are cons lists.
+    Enqueue conses onto ``rear``; dequeue takes from ``front`` and reverses
+    ``rear`` into it when it runs dry. That reversal is amortized O(1) along
+    a single history, though replaying it from an old version repeats it.
+    """
+
+    OPERATIONS = PersistentStructure.OPERATIONS + (
+        Operation("insert", "enqueue", 1, "enqueue_fast"),
+        Operation("delete", "dequeue", 0, "dequeue_fast"),
+        Operation("search", "peek", 0, mutates=False),
+    )
+
+    def __init__(self):
+        super().__init__((0, None, None))
+
+    def __len__(self):
+        return self.version[0]
+
+    def enqueue(self, item):
+        """Add an item as a new version"""
+        self.enqueue_fast(item)
+        yield self.frame(), [len(self) - 1], "Enqueued {}".format(item)
+
+    def dequeue(self):
+        """Remove the first item as a new version"""
+        if not len(self):
+            yield self.frame(), [], "Queue is empty"
+            return
+        item = self.dequeue_fast()
+        yield self.frame(), [], "Dequeued {}".format(item)
+        return item
+
+    def peek(self):
+        if not len(self):
+            yield self.frame(), [], "Queue is empty"
+            return
+        yield self.frame(), [0], "Peeked at {}".format(self._front()[0])
+
+    def _front(self):
+        """Front cons list, reversing the rear into it if needed"""
+        size, front, rear = self.version
+        if front is None:
+            while rear is not None:
+                front, rear = (rear[0], front), rear[1]
+        return front
+
+    def _bulk_load(self, values):
+        size, front, rear = self.version
+        for value in values:
+            size, rear = size + 1, (value, rear)
+        self._commit((size, front, rear))
+
+    # -- fast paths ---------------------------------------------------------
+
+    def enqueue_fast(self, item):
+        size, front, rear = self.version
+        self._commit((size + 1, front, (item, rear)))
+
+    def dequeue_fast(self):
+        """Remove and return the first item; None when the queue is empty"""
+        size, _, rear = self.version
+        if not size:
+            return None
+        front = self._front()
+        if self.version[1] is None:
+            rear = None  # moved into front
+        self._commit((size - 1, front[1], rear))
+        return front[0]
+
+    def to_array(self):
+        size, front, rear = self.version
+        result = []
+        while front is not None:
+            result.append(front[0])
+            front = front[1]
+        back = []
+        while rear is not None:
+            back.append(rear[0])
+            rear = rear[1]
+        back.reverse()
+        return result + back
+
+
+class PersistentHeap(PersistentStructure):
+    """Min-heap with full version history.
+
+    Uses the same array layout as ``BinaryHeap`` but stores it in a
+    ``PersistentVector``; each sift writes O(log n) slots and each write
+    copies one O(log32 n) trie path.
+    """
+
+    OPERATIONS = PersistentStructure.OPERATIONS + (
+        Operation("insert", "insert", 1, "insert_fast"),
+        Operation("delete", "delete", 0, "delete_fast"),
+        Operation("search", "search", 1, mutates=False),
+    )
+
+    def __init__(self):
+        super().__init__(PersistentVector())
+
+    def __len__(self):
+        return len(self.version)
+
+    def insert(self, value):
+        """Insert a value, animating the sift up, as one new version"""
+        trace = []
+        self._insert(value, trace)
+        yield from trace
+
+    def delete(self):
+        """Remove the minimum, animating the sift down, as one new version"""
+        trace = []
+        removed = self._delete(trace)
+        yield from trace
+        return removed
+
+    def search(self, value):
+        for idx, item in enumerate(self.version):
+            yield self.frame(), [idx], f"Checking index {idx}"
+            if item == value:
+                yield self.frame(), [idx], f"Found {value} at index {idx}"
+                return
+        yield self.frame(), [], f"{value} not found"
+
+    def _step(self, heap, trace, highlight, message):
+        if trace is not None:
+            trace.append((Frame(data=list(heap)), highlight, message))
+
+    def _insert(self, value, trace=None):
+        heap = self.version.append(value)
+        idx = len(heap) - 1
+        self._step(heap, trace, [idx], f"Inserted {value}")
+        while idx:
+            parent = (idx - 1) // 2
+            if not heap[idx] < heap[parent]:
+                break
+            heap = heap.set(idx, heap[parent]).set(parent, value)
+            self._step(heap, trace, [idx, parent], "Heapify up")
+            idx = parent
+        self._commit(heap)
+
+    def _delete(self, trace=None):
+        heap = self.version
+        if not len(heap):
+            self._step(heap, trace, [], "Heap is empty")
+            return None
+        removed = heap[0]
+        last = heap[-1]
+        heap = heap.pop()
+        if len(heap):
+            heap = heap.set(0, last)
+        self._step(heap, trace, [0], f"Removed root {removed}")
+        idx, n = 0, len(heap)
+        while 2 * idx + 1 < n:
+            child = 2 * idx + 1
+            if child + 1 < n and heap[child + 1] < heap[child]:
+                child += 1
+            if not heap[child] < heap[idx]:
+                break
+            parent_value = heap[idx]
+            heap = heap.set(idx, heap[child]).set(child, parent_value)
+            self._step(heap, trace, [idx, child], "Heapify down")
+            idx = child
+        self._commit(heap)
+        return removed
+
+    def _bulk_load(self, values):
+        # Heapify a plain list once, then store it as a single new version
+        items = BinaryHeap.from_iterable(list(self.version) + list(values)).heap
+        self._commit(PersistentVector.from_iterable(items))
+
+    # -- fast paths ---------------------------------------------------------
+
+    def insert_fast(self, value):
+        self._insert(value)
+
+    def delete_fast(self):
+        """Remove and return the minimum; None when the heap is empty"""
+        return self._delete()
+
+    def peek_fast(self):
+        return self.version[0]
+
+    def to_array(self):
+        return list(self.version)
+
+
+# -----------------------------------------------------------------------------
+# Caches (LRU and LFU)
+# -----------------------------------------------------------------------------
+
+
+class CacheNode(DoublyLinkedNode):
+    """Doubly linked cache entry; ``data`` holds the key"""
+
+    __slots__ = ("value", "count")
+
+    def __init__(self, key, value):
+        super().__init__(key)
+        self.value = value
+        self.count = 1  # accesses so far, used by LFU
+
+
+def _sentinel():
+    """Empty circular list: a node whose prev and next point at itself"""
+    sentinel = DoublyLinkedNode(None)
+    sentinel.prev = sentinel.next = sentinel
+    return sentinel
+
+
+def _link_front(sentinel, node):
+    node.prev = sentinel
+    node.next = sentinel.next
+    sentinel.next.prev = node
+    sentinel.next = node
+
+
+def _unlink(node):
+    node.prev.next = node.next
+    node.next.prev = node.prev
+
+
+class Cache(BulkLoadable):
+    """Shared bookkeeping for the fixed-capacity caches.
+
+    Subclasses implement ``_get``, ``_put`` and ``_remove`` against an
+    optional ``trace`` list, like the balanced trees. ``get``/``put`` are the
+    fast paths; ``search``/``insert``/``delete`` animate the same logic.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "insert", 1, "put"),
+        Operation("delete", "delete", 1, "delete_fast"),
+        # A lookup moves the key up the eviction order and counts a hit or a
+        # miss, so logs record it (without an inverse) to replay the same
+        # evictions
+        Operation("search", "search", 1, "get"),
+    )
+
+    def __init__(self, capacity=5):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.map = {}  # key -> CacheNode
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.map)
+
+    def __contains__(self, key):
+        return key in self.map
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _step(self, trace, keys, message):
+        if trace is None:
+            return
+        frame = self.frame()
+        highlight = [frame.data.index(key) for key in keys if key in self.map]
+        trace.append((frame, highlight, message))
+
+    def _lookup(self, key, trace=None):
+        node = self.map.get(key)
+        if node is None:
+            self.misses += 1
+            self._step(trace, [], "Miss: {} is not cached".format(key))
+            return None
+        self.hits += 1
+        self._touch(node, trace)
+        return node
+
+    def _put(self, key, value, trace=None):
+        """Store ``key``; returns the evicted key or None"""
+        node = self.map.get(key)
+        if node is not None:
+            node.value = value
+            self._touch(node, trace)
+            return None
+        evicted = None
+        if len(self.map) >= self.capacity:
+            victim = self._victim()
+            self._step(trace, [victim.data], "Evicting {}".format(victim.data))
+            self._detach(victim)
+            del self.map[victim.data]
+            self.evictions += 1
+            evicted = victim.data
+        node = CacheNode(key, value)
+        self.map[key] = node
+        self._attach(node)
+        self._step(trace, [key], "Cached {}".format(key))
+        return evicted
+
+    def _remove(self, key, trace=None):
+        node = self.map.pop(key, None)
+        if node is None:
+            self._step(trace, [], "{} is not cached".format(key))
+            return False
+        self._detach(node)
+        self._step(trace, [], "Removed {}".format(key))
+        return True
+
+    # -- visualization operations --------------------------------------------
+
+    def insert(self, key, value=None):
+        """Put ``key``, animating any eviction"""
+        trace = []
+        self._put(key, value, trace)
+        yield from trace
+
+    def search(self, key):
+        """Get ``key``, animating the hit or miss"""
+        trace = []
+        self._lookup(key, trace)
+        yield from trace
+
+    def delete(self, key):
+        trace = []
+        self._remove(key, trace)
+        yield from trace
+
+    # -- fast paths -------------------------------------------------------------
+
+    def get(self, key, default=None):
+        node = self._lookup(key)
+        return default if node is None else node.value
+
+    def put(self, key, value=None):
+        """Store ``key``; returns the evicted key or None"""
+        return self._put(key, value)
+
+    def delete_fast(self, key):
+        return self._remove(key)
+
+    def _bulk_load(self, keys):
+        for key in keys:
+            self._put(key, None)
+
+
+class LRUCache(Cache):
+    """Least-recently-used cache: a dict of nodes on one recency list.
+
+    The most recently used entry sits at the front, so every operation is a
+    dict lookup plus O(1) relinking and eviction takes the back node.
+    """
+
+    def __init__(self, capacity=5):
+        super().__init__(capacity)
+        self.order = _sentinel()
+
+    def _touch(self, node, trace):
+        _unlink(node)
+        _link_front(self.order, node)
+        self._step(trace, [node.data], "Hit: moved {} to the front".format(node.data))
+
+    def _victim(self):
+        return self.order.prev
+
+    def _attach(self, node):
+        _link_front(self.order, node)
+
+    def _detach(self, node):
+        _unlink(node)
+
+    def to_array(self):
+        """Keys from most to least recently used"""
+        result = []
+        node = self.order.next
+        while node is not self.order:
+            result.append(node.data)
+            node = node.next
+        return result
+
+
+class LFUCache(Cache):
+    """Least-frequently-used cache with O(1) frequency buckets.
+
+    Each access count has its own recency list, and ``min_count`` tracks the
+    lowest non-empty bucket. Eviction takes the least recent entry of that
+    bucket, so ties between equally used keys fall back to LRU.
+    """
+
+    def __init__(self, capacity=5):
+        super().__init__(capacity)
+        self.buckets = {}  # access count -> sentinel of its recency list
+        self.min_count = 0
+
+    def _bucket(self, count):
+        bucket = self.buckets.get(count)
+        if bucket is None:
+            bucket = self.buckets[count] = _sentinel()
+        return bucket
+
+    def _touch(self, node, trace):
+        self._detach(node)
+        if self.min_count == node.count and node.count not in self.buckets:
+            self.min_count += 1
+        node.count += 1
+        _link_front(self._bucket(node.count), node)
+        self._step(
+            trace,
+            [node.data],
+            "Hit: {} moves to the count-{} bucket".format(node.data, node.count),
+        )
+
+    def _victim(self):
+        return self.buckets[self.min_count].prev
+
+    def _attach(self, node):
+        _link_front(self._bucket(1), node)
+        self.min_count = 1
+
+    def _detach(self, node):
+        _unlink(node)
+        bucket = self.buckets[node.count]
+        if bucket.next is bucket:
+            del self.buckets[node.count]
+
+    def _remove(self, key, trace=None):
+        removed = super()._remove(key, trace)
+        if removed and self.min_count not in self.buckets:
+            # Explicit deletes are rare, so a scan of the counts is fine here
+            self.min_count = min(self.buckets, default=0)
+        return removed
+
+    def bucket_lists(self):
+        """``[(count, keys most recent first)]`` in increasing count"""
+        result = []
+        for count in sorted(self.buckets):
+            keys = []
+            sentinel = self.buckets[count]
+            node = sentinel.next
+            while node is not sentinel:
+                keys.append(node.data)
+                node = node.next
+            result.append((count, keys))
+        return result
+
+    def frame(self):
+        buckets = self.bucket_lists()
+        return Frame(data=[key for _, keys in buckets for key in keys], buckets=buckets)
+
+    def to_array(self):
+        """Keys bucket by bucket from the lowest count; the next victim is the
+        last key of the first bucket"""
+        return [key for _, keys in self.bucket_lists() for key in keys]
+
+
+# -----------------------------------------------------------------------------
+# Probabilistic structures (Bloom filter and count-min sketch)
+#
+# Keys are mixed to 64 bits with the splitmix64 finalizer and probe position i
+# is (h1 + i * h2) mod m (double hashing), so k positions cost two hashes.
+# Scalar and NumPy paths use the same arithmetic and agree bit for bit.
+# -----------------------------------------------------------------------------
+
+_MASK64 = (1 << 64) - 1
+_SEED1 = 0x9E3779B97F4A7C15
+_SEED2 = 0xD1B54A32D192ED03
+
+
+def _mix64(z):
+    z = (z + 0x9E3779B97F4A7C15) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def _mix64_array(z):
+    # uint64 arithmetic wraps, which is exactly the & _MASK64 above
+    z = z + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _key_int(key):
+    """64-bit integer for a key; ints (NumPy's too) map to themselves, others
+    via hash()"""
+    if isinstance(key, np.integer):
+        key = int(key)
+    if isinstance(key, int) and -(1 << 63) <= key <= _MASK64:
+        return key & _MASK64
+    return hash(key) & _MASK64
+
+
+def _key_array(keys):
+    """``_key_int`` of every key as a uint64 array.
+
+    Integer arrays, and lists of ints that all fit int64 (or all fit uint64),
+    are converted directly. Anything else goes key by key through
+    ``_key_int``: letting NumPy pick a dtype would round big ints to float64
+    or turn ``[1, "a"]`` into strings, so a batch would hash other values
+    than the scalar paths.
+    """
+    if isinstance(keys, np.ndarray) and keys.ndim == 1 and keys.dtype.kind in "iub":
+        return keys.astype(np.uint64)
+    keys = list(keys)
+    if keys and {type(key) for key in keys} <= {int, bool}:
+        low, high = min(keys), max(keys)
+        if -(1 << 63) <= low and high < 1 << 63:
+            return np.array(keys, dtype=np.int64).astype(np.uint64)
+        if low >= 0 and high <= _MASK64:
+            return np.array(keys, dtype=np.uint64)
+    return np.fromiter((_key_int(key) for key in keys), np.uint64, len(keys))
+
+
+def _probes(key, count, size):
+    """The ``count`` positions in ``range(size)`` that ``key`` maps to"""
+    z = _key_int(key)
+    h1 = _mix64(z ^ _SEED1)
+    h2 = _mix64(z ^ _SEED2) | 1
+    return [((h1 + i * h2) & _MASK64) % size for i in range(count)]
+
+
+def _probe_matrix(keys, count, size):
+    """``_probes`` for many keys at once: a (len(keys), count) index array"""
+    z = _key_array(keys)
+    h1 = _mix64_array(z ^ np.uint64(_SEED1))
+    h2 = _mix64_array(z ^ np.uint64(_SEED2)) | np.uint64(1)
+    steps = np.arange(count, dtype=np.uint64)
+    positions = h1[:, None] + steps[None, :] * h2[:, None]
+    return (positions % np.uint64(size)).astype(np.int64)
+
+
+class BloomFilter(BulkLoadable):
+    """Approximate set membership in a packed bit array.
+
+    A query answers "definitely absent" or "probably present"; the false
+    positive rate depends only on bits per key and the number of hashes.
+    Items cannot be removed.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "insert", 1, "insert_fast"),
+        Operation("search", "search", 1, "search_fast", mutates=False),
+    )
+
+    def __init__(self, num_bits=64, num_hashes=3):
+        if num_bits < 1 or num_hashes < 1:
+            raise ValueError("num_bits and num_hashes must be positive")
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = np.zeros((num_bits + 7) // 8, dtype=np.uint8)
+        self.count = 0  # insertions, including repeats
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate=0.01):
+        """Optimal size for ``capacity`` keys at the target false positive rate"""
+        num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    def __contains__(self, key):
+        return self.search_fast(key)
+
+    def _bit(self, pos):
+        return (self.bits[pos >> 3] >> (pos & 7)) & 1
+
+    def insert(self, key):
+        """Set the bit at each of the key's hash positions"""
+        for i, pos in enumerate(_probes(key, self.num_hashes, self.num_bits)):
+            already = self._bit(pos)
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+            yield self.frame(), [pos], "h{}({}) = {}: bit {}".format(
+                i, key, pos, "already set" if already else "set"
+            )
+        self.count += 1
+        yield self.frame(), [], "Added {}".format(key)
+
+    def search(self, key):
+        """Check the key's bits, stopping at the first clear one"""
+        for i, pos in enumerate(_probes(key, self.num_hashes, self.num_bits)):
+            if not self._bit(pos):
+                message = "h{}({}) = {} is clear: {} is absent".format(i, key, pos, key)
+                yield self.frame(), [pos], message
+                return
+            yield self.frame(), [pos], "h{}({}) = {} is set".format(i, key, pos)
+        yield self.frame(), [], "{} is probably present".format(key)
+
+    # -- fast paths -------------------------------------------------------------
+
+    def insert_fast(self, key):
+        for pos in _probes(key, self.num_hashes, self.num_bits):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def search_fast(self, key):
+        return all(
+            self._bit(pos) for pos in _probes(key, self.num_hashes, self.num_bits)
+        )
+
+    def insert_many(self, keys):
+        """Add many keys with one vectorized hashing pass"""
+        positions = _probe_matrix(keys, self.num_hashes, self.num_bits).ravel()
+        np.bitwise_or.at(
+            self.bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8)
+        )
+        self.count += len(positions) // self.num_hashes
+
+    def contains_many(self, keys):
+        """Boolean array: which keys are probably present"""
+        positions = _probe_matrix(keys, self.num_hashes, self.num_bits)
+        return ((self.bits[positions >> 3] >> (positions & 7)) & 1).all(axis=1)
+
+    def _bulk_load(self, keys):
+        self.insert_many(list(keys))
+
+    def fill_ratio(self):
+        return int(np.unpackbits(self.bits).sum()) / self.num_bits
+
+    def expected_fpr(self):
+        """Theoretical false positive rate after ``count`` insertions"""
+        k, m = self.num_hashes, self.num_bits
+        return (1 - math.exp(-k * self.count / m)) ** k
+
+    def to_array(self):
+        """One 0/1 entry per bit"""
+        return np.unpackbits(self.bits, bitorder="little")[: self.num_bits].tolist()
+
+
+class CountMinSketch(BulkLoadable):
+    """Approximate frequency counts in a ``depth`` x ``width`` counter grid.
+
+    Each row adds the key's count to one cell and the estimate is the
+    minimum over the rows, so it never underestimates; with
+    ``width = e / epsilon`` and ``depth = ln(1 / delta)`` it overestimates by
+    more than ``epsilon * total`` with probability at most ``delta``.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "insert", 1, "insert_fast"),
+        Operation("search", "search", 1, "estimate", mutates=False),
+    )
+
+    def __init__(self, width=16, depth=4):
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be positive")
+        self.width = width
+        self.depth = depth
+        self.counters = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    @classmethod
+    def for_error(cls, epsilon=0.001, delta=0.01):
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)))
+
+    def _cells(self, key):
+        return _probes(key, self.depth, self.width)
+
+    def insert(self, key, count=1):
+        """Add ``count`` to the key's cell in every row"""
+        for row, col in enumerate(self._cells(key)):
+            self.counters[row, col] += count
+            message = "Row {}: cell {} += {}".format(row, col, count)
+            yield self.frame(), [row * self.width + col], message
+        self.total += count
+        yield self.frame(), [], "Added {} x{}".format(key, count)
+
+    def search(self, key):
+        """Read the key's cell in every row; the estimate is the minimum"""
+        flat = []
+        for row, col in enumerate(self._cells(key)):
+            flat.append(row * self.width + col)
+            message = "Row {}: cell {} = {}".format(row, col, self.counters[row, col])
+            yield self.frame(), [flat[-1]], message
+        message = "Estimated count of {}: {}".format(key, self.estimate(key))
+        yield self.frame(), flat, message
+
+    # -- fast paths -------------------------------------------------------------
+
+    def insert_fast(self, key, count=1):
+        for row, col in enumerate(self._cells(key)):
+            self.counters[row, col] += count
+        self.total += count
+
+    def estimate(self, key):
+        return int(
+            min(self.counters[row, col] for row, col in enumerate(self._cells(key)))
+        )
+
+    def insert_many(self, keys, counts=None):
+        """Add many keys (optionally with per-key counts) in one pass"""
+        cols = _probe_matrix(keys, self.depth, self.width)
+        flat = (cols + np.arange(self.depth) * self.width).ravel()
+        counts = np.ones(len(cols), dtype=np.int64) if counts is None else counts
+        counts = np.asarray(counts, dtype=np.int64)
+        np.add.at(self.counters.reshape(-1), flat, np.repeat(counts, self.depth))
+        self.total += int(counts.sum())
+
+    def estimate_many(self, keys):
+        cols = _probe_matrix(keys, self.depth, self.width)
+        return self.counters[np.arange(self.depth), cols].min(axis=1)
+
+    def _bulk_load(self, keys):
+        self.insert_many(list(keys))
+
+    def to_array(self):
+        """Counters row by row; cell (row, col) is at ``row * width + col``"""
+        return self.counters.ravel().tolist()
+
+
+# -----------------------------------------------------------------------------
+# Range-query trees (Fenwick and segment tree)
+# -----------------------------------------------------------------------------
+
+
+class FenwickTree(BulkLoadable):
+    """Binary indexed tree over a list of numbers: O(log n) point updates and
+    prefix sums.
+
+    Slot ``i`` (0-based) holds the sum of the ``i + 1 & -(i + 1)`` values
+    ending at ``i``; ``to_array`` shows those partial sums.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "insert", 1),
+        Operation("search", "search", 1, mutates=False),
+        Operation("update", "update", 2, "update_fast"),
+        Operation("prefix_sum", "prefix_sum", 1, "prefix_sum_fast", mutates=False),
+        Operation("range_sum", "range_sum", 2, "range_sum_fast", mutates=False),
+    )
+
+    def __init__(self, values=()):
+        self.values = []
+        self.tree = []
+        self._array = None  # NumPy copy of tree for batch queries
+        self._bulk_load(values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def _bulk_load(self, values):
+        # O(n) build: push each slot's partial sum into its parent once
+        self.values.extend(values)
+        tree = self.tree = list(self.values)
+        n = len(tree)
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent - 1] += tree[i - 1]
+        self._array = None
+
+    def _prefix(self, index, trace=None):
+        """Sum of values[0..index] inclusive"""
+        total = 0
+        i = min(index, len(self.tree) - 1) + 1
+        while i > 0:
+            total += self.tree[i - 1]
+            if trace is not None:
+                trace.append(
+                    (
+                        self.frame(),
+                        [i - 1],
+                        "Add slot {} ({} values) -> {}".format(i - 1, i & -i, total),
+                    )
+                )
+            i -= i & -i
+        return total
+
+    def _add(self, index, delta, trace=None):
+        if not 0 <= index < len(self.values):
+            raise IndexError("Fenwick tree index out of range")
+        self.values[index] += delta
+        i = index + 1
+        while i <= len(self.tree):
+            self.tree[i - 1] += delta
+            if trace is not None:
+                trace.append(
+                    (self.frame(), [i - 1], "Slot {} += {}".format(i - 1, delta))
+                )
+            i += i & -i
+        self._array = None
+
+    # -- visualization operations --------------------------------------------
+
+    def insert(self, value):
+        """Append a value; its slot sums the slots it now covers"""
+        i = len(self.tree) + 1
+        covered = self._prefix(i - 2) - self._prefix(i - (i & -i) - 1)
+        self.values.append(value)
+        self.tree.append(value + covered)
+        self._array = None
+        yield self.frame(), [i - 1], "Appended {} (slot covers {} values)".format(
+            value, i & -i
+        )
+
+    def update(self, index, delta):
+        """Add ``delta`` to values[index], touching O(log n) slots"""
+        if not 0 <= index < len(self.values):
+            yield self.frame(), [], "Index {} out of range".format(index)
+            return
+        trace = []
+        self._add(index, delta, trace)
+        yield from trace
+
+    def prefix_sum(self, index):
+        """Sum of values[0..index], reading O(log n) slots"""
+        trace = []
+        total = self._prefix(index, trace)
+        yield from trace
+        yield self.frame(), [], "Sum of values[0..{}] = {}".format(index, total)
+
+    def range_sum(self, lo, hi):
+        trace = []
+        total = self._prefix(hi, trace) - self._prefix(lo - 1, trace)
+        yield from trace
+        yield self.frame(), [], "Sum of values[{}..{}] = {}".format(lo, hi, total)
+
+    def search(self, index):
+        """Prefix sum up to ``index`` for the generic Search control"""
+        yield from self.prefix_sum(index)
+
+    # -- fast paths -------------------------------------------------------------
+
+    def update_fast(self, index, delta):
+        self._add(index, delta)
+
+    def set_fast(self, index, value):
+        if not 0 <= index < len(self.values):
+            raise IndexError("Fenwick tree index out of range")
+        self._add(index, value - self.values[index])
+
+    def prefix_sum_fast(self, index):
+        return self._prefix(index)
+
+    def range_sum_fast(self, lo, hi):
+        return self._prefix(hi) - self._prefix(lo - 1)
+
+    def prefix_sum_many(self, indices):
+        """Vectorized prefix sums: one NumPy pass per bit of the index"""
+        if self._array is None:
+            self._array = np.asarray(self.tree)
+        i = np.clip(np.asarray(indices, dtype=np.int64), -1, len(self.tree) - 1) + 1
+        total = np.zeros(len(i), dtype=self._array.dtype)
+        while i.any():
+            live = i > 0
+            total[live] += self._array[i[live] - 1]
+            i &= i - 1  # clear the lowest set bit
+        return total
+
+    def range_sum_many(self, los, his):
+        return self.prefix_sum_many(his) - self.prefix_sum_many(
+            np.asarray(los, dtype=np.int64) - 1
+        )
+
+    def to_array(self):
+        return list(self.tree)
+
+
+class SegmentTree(BulkLoadable):
+    """Segment tree for sum, min or max with lazy range additions.
+
+    Nodes use the heap layout (children of ``i`` at ``2i + 1`` and
+    ``2i + 2``), so ``to_array`` can be drawn like a binary heap. A range add
+    stops at fully covered nodes and leaves a pending delta that is pushed
+    to the children only when a later operation goes below them.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "insert", 1),
+        Operation("search", "search", 1, mutates=False),
+        Operation("query", "query", 2, "query_fast", mutates=False),
+        Operation("update", "update", 2, "update_fast"),
+        Operation("range_add", "range_add", 3, "range_add_fast"),
+    )
+
+    OPS = {"sum": (sum, 0), "min": (min, math.inf), "max": (max, -math.inf)}
+
+    def __init__(self, values=(), op="sum"):
+        if op not in self.OPS:
+            raise ValueError("op must be one of {}".format(tuple(self.OPS)))
+        self.op = op
+        self.combine, self.identity = self.OPS[op]
+        self.n = 0
+        self.tree = []
+        self.lazy = []
+        self._bulk_load(values)
+
+    def __len__(self):
+        return self.n
+
+    def _bulk_load(self, values):
+        # Rebuild from the current leaves, so earlier updates and pending
+        # range adds survive
+        self.values = self.leaves() + list(values)
+        self.n = len(self.values)
+        self.tree = [None] * (4 * self.n)
+        self.lazy = [0] * (4 * self.n)
+        if self.n:
+            self._build(0, 0, self.n - 1)
+
+    def _build(self, node, lo, hi):
+        if lo == hi:
+            self.tree[node] = self.values[lo]
+            return
+        mid = (lo + hi) // 2
+        self._build(2 * node + 1, lo, mid)
+        self._build(2 * node + 2, mid + 1, hi)
+        self.tree[node] = self.combine(
+            (self.tree[2 * node + 1], self.tree[2 * node + 2])
+        )
+
+    def _step(self, trace, nodes, message):
+        if trace is not None:
+            trace.append((self.frame(), nodes, message))
+
+    def _apply(self, node, lo, hi, delta):
+        self.tree[node] += delta * (hi - lo + 1) if self.op == "sum" else delta
+        if lo != hi:
+            self.lazy[node] += delta
+
+    def _push(self, node, lo, mid, hi):
+        delta = self.lazy[node]
+        if delta:
+            self._apply(2 * node + 1, lo, mid, delta)
+            self._apply(2 * node + 2, mid + 1, hi, delta)
+            self.lazy[node] = 0
+
+    def _query(self, node, lo, hi, qlo, qhi, trace=None):
+        if qhi < lo or hi < qlo:
+            return self.identity
+        if qlo <= lo and hi <= qhi:
+            if trace is not None:
+                self._step(
+                    trace,
+                    [node],
+                    "[{}..{}] is covered: {} = {}".format(
+                        lo, hi, self.op, self.tree[node]
+                    ),
+                )
+            return self.tree[node]
+        if trace is not None:
+            self._step(trace, [node], "[{}..{}] overlaps, split".format(lo, hi))
+        mid = (lo + hi) // 2
+        self._push(node, lo, mid, hi)
+        return self.combine(
+            (
+                self._query(2 * node + 1, lo, mid, qlo, qhi, trace),
+                self._query(2 * node + 2, mid + 1, hi, qlo, qhi, trace),
+            )
+        )
+
+    def _range_add(self, node, lo, hi, qlo, qhi, delta, trace=None):
+        if qhi < lo or hi < qlo:
+            return
+        if qlo <= lo and hi <= qhi:
+            self._apply(node, lo, hi, delta)
+            self._step(
+                trace, [node], "[{}..{}] += {} (lazy below)".format(lo, hi, delta)
+            )
+            return
+        mid = (lo + hi) // 2
+        self._push(node, lo, mid, hi)
+        self._range_add(2 * node + 1, lo, mid, qlo, qhi, delta, trace)
+        self._range_add(2 * node + 2, mid + 1, hi, qlo, qhi, delta, trace)
+        self.tree[node] = self.combine(
+            (self.tree[2 * node + 1], self.tree[2 * node + 2])
+        )
+        self._step(trace, [node], "Recomputed [{}..{}]".format(lo, hi))
+
+    def _assign(self, node, lo, hi, index, value, trace=None):
+        if lo == hi:
+            self.tree[node] = value
+        else:
+            mid = (lo + hi) // 2
+            self._push(node, lo, mid, hi)
+            if index <= mid:
+                self._assign(2 * node + 1, lo, mid, index, value, trace)
+            else:
+                self._assign(2 * node + 2, mid + 1, hi, index, value, trace)
+            self.tree[node] = self.combine(
+                (self.tree[2 * node + 1], self.tree[2 * node + 2])
+            )
+        self._step(trace, [node], "Recomputed [{}..{}]".format(lo, hi))
+
+    def _clamp(self, lo, hi):
+        return max(lo, 0), min(hi, self.n - 1)
+
+    # -- visualization operations --------------------------------------------
+
+    def insert(self, value):
+        """Append a value and rebuild in O(n)"""
+        self._bulk_load([value])
+        yield self.frame(), [], "Appended {} and rebuilt".format(value)
+
+    def query(self, lo, hi):
+        """Aggregate of values[lo..hi], visiting O(log n) nodes"""
+        lo, hi = self._clamp(lo, hi)
+        if not self.n or lo > hi:
+            yield self.frame(), [], "Empty range"
+            return
+        trace = []
+        result = self._query(0, 0, self.n - 1, lo, hi, trace)
+        yield from trace
+        yield self.frame(), [], "{} of values[{}..{}] = {}".format(
+            self.op, lo, hi, result
+        )
+
+    def search(self, index):
+        """Query values[0..index] for the generic Search control"""
+        yield from self.query(0, index)
+
+    def update(self, index, value):
+        """Set values[index], recomputing the nodes above it"""
+        if not 0 <= index < self.n:
+            yield self.frame(), [], "Index {} out of range".format(index)
+            return
+        trace = []
+        self._assign(0, 0, self.n - 1, index, value, trace)
+        yield from trace
+
+    def range_add(self, lo, hi, delta):
+        """Add ``delta`` to values[lo..hi] lazily"""
+        lo, hi = self._clamp(lo, hi)
+        if not self.n or lo > hi:
+            yield self.frame(), [], "Empty range"
+            return
+        trace = []
+        self._range_add(0, 0, self.n - 1, lo, hi, delta, trace)
+        yield from trace
+
+    # -- fast paths -------------------------------------------------------------
+
+    def query_fast(self, lo, hi):
+        lo, hi = self._clamp(lo, hi)
+        if lo > hi:
+            return self.identity
+        return self._query(0, 0, self.n - 1, lo, hi)
+
+    def update_fast(self, index, value):
+        if not 0 <= index < self.n:
+            raise IndexError("segment tree index out of range")
+        self._assign(0, 0, self.n - 1, index, value)
+
+    def range_add_fast(self, lo, hi, delta):
+        lo, hi = self._clamp(lo, hi)
+        if lo <= hi:
+            self._range_add(0, 0, self.n - 1, lo, hi, delta)
+
+    def leaves(self):
+        """Current values with every pending delta applied, in O(n)"""
+        result = [None] * self.n
+
+        def walk(node, lo, hi, pending):
+            if lo == hi:
+                result[lo] = self.tree[node] + pending
+                return
+            pending += self.lazy[node]
+            mid = (lo + hi) // 2
+            walk(2 * node + 1, lo, mid, pending)
+            walk(2 * node + 2, mid + 1, hi, pending)
+
+        if self.n:
+            walk(0, 0, self.n - 1, 0)
+        return result
+
+    def query_many(self, los, his):
+        """Vectorized ``query_fast`` over inclusive ranges.
+
+        Materializes the leaves once, then answers sums from a prefix-sum
+        array and min/max from a sparse table, so q queries cost
+        O(n log n + q) rather than O(q log n) Python calls.
+        """
+        if not self.n:
+            return np.full(len(los), self.identity)
+        leaves = np.asarray(self.leaves())
+        los = np.maximum(np.asarray(los, dtype=np.int64), 0)
+        his = np.minimum(np.asarray(his, dtype=np.int64), self.n - 1)
+        empty = los > his  # answered with the identity, like query_fast
+        if empty.any():
+            los = np.minimum(los, self.n - 1)
+            his = np.maximum(his, los)
+            result = self._query_ranges(leaves, los, his)
+            return np.where(empty, self.identity, result)
+        return self._query_ranges(leaves, los, his)
+
+    def _query_ranges(self, leaves, los, his):
+        """``query_many`` for clamped, non-empty ranges"""
+        if self.op == "sum":
+            prefix = np.concatenate(([0], np.cumsum(leaves)))
+            return prefix[his + 1] - prefix[los]
+        reduce = np.minimum if self.op == "min" else np.maximum
+        table = [leaves]
+        while 2 ** len(table) <= self.n:
+            half = 2 ** (len(table) - 1)
+            table.append(reduce(table[-1][:-half], table[-1][half:]))
+        level = np.log2(his - los + 1).astype(np.int64)
+        span = 2**level
+        left = np.empty(len(los), dtype=leaves.dtype)
+        right = np.empty(len(los), dtype=leaves.dtype)
+        for k in np.unique(level).tolist():
+            rows = level == k
+            left[rows] = table[k][los[rows]]
+            right[rows] = table[k][his[rows] - span[rows] + 1]
+        return reduce(left, right)
+
+    def to_array(self):
+        """Node aggregates in heap layout, None where no node exists"""
+        last = max(
+            (i for i, value in enumerate(self.tree) if value is not None), default=-1
+        )
+        return self.tree[: last + 1]
+
+
+# -----------------------------------------------------------------------------
+# Rope (treap of array chunks)
+# -----------------------------------------------------------------------------
+
+
+class RopeNode:
+    """Treap node owning one chunk of the sequence"""
+
+    __slots__ = ("chunk", "priority", "size", "left", "right")
+
+    def __init__(self, chunk, priority):
+        self.chunk = chunk
+        self.priority = priority
+        self.size = len(chunk)  # elements in this subtree
+        self.left = None
+        self.right = None
+
+
+class Rope(BulkLoadable):
+    """Sequence of machine integers split into typed-array chunks.
+
+    Chunks hang off a treap ordered by position (an implicit treap), so
+    inserting or deleting at any index touches one chunk of at most
+    ``chunk_size`` values plus an O(log n) expected path, instead of
+    shifting the whole tail like ``ArrayStructure.insert_at``.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "insert", 1, "insert_fast", "pop"),
+        Operation("pop", "delete", 0, "pop_fast", "insert"),
+        Operation("insert_at", "insert_at", 2, "insert_at_fast"),
+        Operation("delete", "delete", 1),
+        Operation("delete_slice", "delete_slice", 2, "delete_slice_fast"),
+        Operation("search", "search", 1, "search_fast", mutates=False),
+    )
+
+    def __init__(self, values=(), chunk_size=256, typecode="q", seed=None):
+        if chunk_size < 2:
+            raise ValueError("chunk_size must be at least 2")
+        self.chunk_size = chunk_size
+        self.typecode = typecode
+        self.rng = random.Random(seed)
+        self.root = None
+        self._bulk_load(values)
+
+    def __len__(self):
+        return self.root.size if self.root else 0
+
+    def __iter__(self):
+        for chunk in self._chunks():
+            yield from chunk
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("rope index out of range")
+        path, offset = self._locate(index)
+        return path[-1].chunk[offset]
+
+    # -- treap helpers --------------------------------------------------------
+
+    @staticmethod
+    def _size(node):
+        return node.size if node else 0
+
+    def _update(self, node):
+        node.size = self._size(node.left) + len(node.chunk) + self._size(node.right)
+
+    def _node(self, chunk):
+        return RopeNode(chunk, self.rng.random())
+
+    def _merge(self, left, right):
+        """Concatenate two treaps (every position of ``left`` comes first)"""
+        if left is None or right is None:
+            return left or right
+        if left.priority > right.priority:
+            left.right = self._merge(left.right, right)
+            self._update(left)
+            return left
+        right.left = self._merge(left, right.left)
+        self._update(right)
+        return right
+
+    def _split(self, node, k):
+        """Split into the first ``k`` values and the rest, cutting a chunk if
+        the boundary falls inside one"""
+        if node is None:
+            return None, None
+        left_size = self._size(node.left)
+        if k <= left_size:
+            left, node.left = self._split(node.left, k)
+            self._update(node)
+            return left, node
+        end = left_size + len(node.chunk)
+        if k >= end:
+            node.right, right = self._split(node.right, k - end)
+            self._update(node)
+            return node, right
+        cut = k - left_size
+        tail = self._node(node.chunk[cut:])
+        del node.chunk[cut:]
+        right = self._merge(tail, node.right)
+        node.right = None
+        self._update(node)
+        return node, right
+
+    def _locate(self, index, inserting=False):
+        """Path from the root to the chunk holding ``index``, and the offset
+        in that chunk; when ``inserting``, a chunk may also end at ``index``"""
+        path = []
+        node = self.root
+        while node:
+            path.append(node)
+            left_size = self._size(node.left)
+            end = left_size + len(node.chunk)
+            if index < left_size:
+                node = node.left
+            elif index < end or (inserting and index == end):
+                return path, index - left_size
+            else:
+                index -= end
+                node = node.right
+        raise IndexError("rope index out of range")
+
+    def _chunks(self):
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.chunk
+            node = node.right
+
+    def _chunk_start(self, index):
+        """Position of the first value in the chunk holding ``index``"""
+        start = 0
+        for chunk in self._chunks():
+            if index < start + len(chunk):
+                return start, len(chunk)
+            start += len(chunk)
+        return start, 0
+
+    # -- visualization operations --------------------------------------------
+
+    def insert(self, value):
+        self.insert_fast(value)
+        yield self.frame(), [len(self) - 1], f"Appended {value}"
+
+    def insert_at(self, index, value):
+        if not 0 <= index <= len(self):
+            yield self.frame(), [], f"Index {index} out of range"
+            return
+        chunks = sum(1 for _ in self._chunks())
+        self.insert_at_fast(index, value)
+        start, length = self._chunk_start(index)
+        message = f"Inserted {value} at index {index}"
+        if sum(1 for _ in self._chunks()) > chunks:
+            message += " and split a full chunk"
+        yield self.frame(), list(range(start, start + length)), message
+
+    def delete(self, value=None):
+        if not len(self):
+            yield self.frame(), [], "Rope is empty"
+            return
+        index = len(self) - 1 if value is None else self.search_fast(value)
+        if index < 0:
+            yield self.frame(), [], f"{value} not found"
+            return
+        removed = self.delete_at_fast(index)
+        yield self.frame(), [], f"Removed {removed} at index {index}"
+        return removed
+
+    def delete_slice(self, start, stop):
+        removed = len(self)
+        self.delete_slice_fast(start, stop)
+        removed -= len(self)
+        yield self.frame(), [], f"Removed {removed} values from [{start}:{stop}]"
+
+    def search(self, value):
+        """Linear scan, one chunk per step"""
+        start = 0
+        for chunk in self._chunks():
+            span = list(range(start, start + len(chunk)))
+            yield self.frame(), span, f"Scanning chunk at {start}"
+            if value in chunk:
+                idx = start + chunk.index(value)
+                yield self.frame(), [idx], f"Found {value} at index {idx}"
+                return
+            start += len(chunk)
+        yield self.frame(), [], f"{value} not found"
+
+    # -- fast paths -------------------------------------------------------------
+
+    def insert_fast(self, value):
+        self.insert_at_fast(len(self), value)
+
+    def insert_at_fast(self, index, value):
+        if not 0 <= index <= len(self):
+            raise IndexError("rope index out of range")
+        if self.root is None:
+            self.root = self._node(array(self.typecode, [value]))
+            return
+        path, offset = self._locate(index, inserting=True)
+        node = path[-1]
+        node.chunk.insert(offset, value)
+        for ancestor in path:
+            ancestor.size += 1
+        if len(node.chunk) > self.chunk_size:
+            # Move the upper half of the chunk into a new node right after it
+            half = len(node.chunk) // 2
+            start = index - offset
+            left, right = self._split(self.root, start + half)
+            self.root = self._merge(left, right)
+
+    def delete_at_fast(self, index):
+        """Remove and return the value at ``index``"""
+        if index < 0:
+            index += len(self)
+        path, offset = self._locate(index)
+        node = path[-1]
+        value = node.chunk.pop(offset)
+        for ancestor in path:
+            ancestor.size -= 1
+        if not node.chunk:
+            child = self._merge(node.left, node.right)
+            if len(path) == 1:
+                self.root = child
+            elif path[-2].left is node:
+                path[-2].left = child
+            else:
+                path[-2].right = child
+        return value
+
+    def pop_fast(self):
+        """Remove and return the last value; None when the rope is empty"""
+        if not len(self):
+            return None
+        return self.delete_at_fast(len(self) - 1)
+
+    def delete_slice_fast(self, start, stop):
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return
+        left, rest = self._split(self.root, start)
+        _, right = self._split(rest, stop - start)
+        self.root = self._merge(left, right)
+
+    def extend_fast(self, values):
+        self._bulk_load(values)
+
+    def search_fast(self, value):
+        """Index of the first occurrence of ``value``, or -1"""
+        start = 0
+        for chunk in self._chunks():
+            if value in chunk:
+                return start + chunk.index(value)
+            start += len(chunk)
+        return -1
+
+    def _bulk_load(self, values):
+        # Cut into full chunks and link them into a treap with a stack
+        # (Cartesian tree build), O(n) overall
+        values = array(self.typecode, values)
+        stack = []
+        for start in range(0, len(values), self.chunk_size):
+            node = self._node(values[start : start + self.chunk_size])
+            last = None
+            while stack and stack[-1].priority < node.priority:
+                last = stack.pop()
+                self._update(last)
+            node.left = last
+            if stack:
+                stack[-1].right = node
+            stack.append(node)
+        for node in reversed(stack):
+            self._update(node)
+        self.root = self._merge(self.root, stack[0] if stack else None)
+
+    def chunks(self):
+        """The chunks in order, as lists"""
+        return [chunk.tolist() for chunk in self._chunks()]
+
+    def frame(self):
+        chunks = self.chunks()
+        return Frame(data=[value for chunk in chunks for value in chunk], chunks=chunks)
+
+    def to_array(self):
+        return list(self)
+
+
+class SmallChunkRope(Rope):
+    """Rope with 4-value chunks so splits and boundaries show in the visualizer"""
+
+    def __init__(self, values=(), seed=None):
+        super().__init__(values, chunk_size=4, seed=seed)
+
+
+# -----------------------------------------------------------------------------
+# Concurrent Stacks and Queues (in-process work queues for thread pools)
+# -----------------------------------------------------------------------------
+
+
+class ConcurrentStack(Stack):
+    """``Stack`` that any number of threads may push to and pop from.
+
+    A stack has one point of contention, its top, so a lock around each fast
+    path is as fine-grained as it gets; the step generators go through the
+    fast paths and inherit it. ``pop_fast`` returns None when empty rather
+    than waiting.
+    """
+
+    def __init__(self, max_size=None):
+        super().__init__(max_size)
+        self._lock = threading.Lock()
+
+    def push_fast(self, item):
+        with self._lock:
+            return super().push_fast(item)
+
+    def pop_fast(self):
+        with self._lock:
+            return super().pop_fast()
+
+    def push_many_fast(self, items):
+        items = list(items)
+        with self._lock:
+            return super().push_many_fast(items)
+
+    def pop_many_fast(self, count):
+        with self._lock:
+            return super().pop_many_fast(count)
+
+    def _extreme(self, tracked, name):
+        with self._lock:
+            return super()._extreme(tracked, name)
+
+
+class TwoLockQueue(BulkLoadable):
+    """Unbounded FIFO queue with separate head and tail locks.
+
+    The Michael & Scott two-lock queue: a linked list that always starts with
+    a dummy node, so producers (tail lock) and consumers (head lock) only
+    ever wait for their own kind, never for each other. ``dequeue_fast`` and
+    ``peek_fast`` return None when empty, like ``ConcurrentStack.pop_fast``.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "enqueue", 1, "enqueue_fast"),
+        Operation("delete", "dequeue", 0, "dequeue_fast"),
+        Operation("search", "peek", 0, "peek_fast", mutates=False),
+    )
+
+    def __init__(self):
+        self.head = self.tail = SinglyLinkedNode(None)
+        self._head_lock = threading.Lock()
+        self._tail_lock = threading.Lock()
+        self._enqueued = 0  # written under the tail lock
+        self._dequeued = 0  # written under the head lock
+
+    def __len__(self):
+        # The two counters are read without locks, so this is a snapshot
+        return max(0, self._enqueued - self._dequeued)
+
+    def enqueue(self, item):
+        """Add an item at the tail"""
+        self.enqueue_fast(item)
+        yield self.frame(), [len(self) - 1], "Enqueued {}".format(item)
+
+    def dequeue(self):
+        """Remove and return the item at the head"""
+        item = self.dequeue_fast()
+        if item is None:
+            yield [], [], "Queue is empty"
+            return
+        yield self.frame(), [], "Dequeued {}".format(item)
+        return item
+
+    def peek(self):
+        """Peek at the head item without removing it"""
+        item = self.peek_fast()
+        if item is None:
+            yield [], [], "Queue is empty"
+            return
+        yield self.frame(), [0], "Peeked at {}".format(item)
+        return item
+
+    # -- fast paths ---------------------------------------------------------
+
+    def enqueue_fast(self, item):
+        node = SinglyLinkedNode(item)
+        with self._tail_lock:
+            self.tail.next = node
+            self.tail = node
+            self._enqueued += 1
+
+    def dequeue_fast(self):
+        """Remove and return the head item; None when the queue is empty"""
+        with self._head_lock:
+            first = self.head.next
+            if first is None:
+                return None
+            # The first node becomes the new dummy
+            item, first.data = first.data, None
+            self.head = first
+            self._dequeued += 1
+        return item
+
+    def peek_fast(self):
+        with self._head_lock:
+            first = self.head.next
+            return None if first is None else first.data
+
+    def _bulk_load(self, values):
+        # Link the new nodes first, then publish them under the tail lock
+        dummy = tail = SinglyLinkedNode(None)
+        count = 0
+        for value in values:
+            tail.next = SinglyLinkedNode(value)
+            tail = tail.next
+            count += 1
+        if not count:
+            return
+        with self._tail_lock:
+            self.tail.next = dummy.next
+            self.tail = tail
+            self._enqueued += count
+
+    def to_array(self):
+        items = []
+        node = self.head.next
+        while node:
+            items.append(node.data)
+            node = node.next
+        return items
+
+
+class BlockingQueue(BulkLoadable):
+    """Bounded FIFO queue for producer and consumer threads.
+
+    ``put`` waits while the queue is full and ``get`` while it is empty, on
+    two condition variables over one lock, so producers only wake consumers
+    and consumers only wake producers. ``put`` and ``get`` behave like
+    ``queue.Queue`` (``block``, ``timeout``, ``queue.Full`` / ``queue.Empty``);
+    the fast paths never wait and report a full or empty queue the way
+    ``Stack`` does: ``enqueue_fast`` returns False when full, ``dequeue_fast``
+    and ``peek_fast`` return None when empty. ``max_size=None`` makes the
+    queue unbounded.
+    """
+
+    OPERATIONS = (
+        Operation("insert", "enqueue", 1, "enqueue_fast"),
+        Operation("delete", "dequeue", 0, "dequeue_fast"),
+        Operation("search", "peek", 0, "peek_fast", mutates=False),
+    )
+
+    def __init__(self, max_size=10):
+        self.items = deque()
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _has_room(self):
+        return self.max_size is None or len(self.items) < self.max_size
+
+    def put(self, item, block=True, timeout=None):
+        """Add ``item``, waiting up to ``timeout`` seconds for room"""
+        with self._not_full:
+            if block:
+                room = self._not_full.wait_for(self._has_room, timeout)
+            else:
+                room = self._has_room()
+            if not room:
+                raise Full
+            self.items.append(item)
+            self._not_empty.notify()
+
+    def get(self, block=True, timeout=None):
+        """Remove and return the oldest item, waiting up to ``timeout``
+        seconds for one"""
+        with self._not_empty:
+            if block:
+                ready = self._not_empty.wait_for(lambda: self.items, timeout)
+            else:
+                ready = self.items
+            if not ready:
+                raise Empty
+            item = self.items.popleft()
+            self._not_full.notify()
+            return item
+
+    def enqueue(self, item):
+        """Add an item to the queue"""
+        if not self.enqueue_fast(item):
+            yield list(self.items), [], "Queue is full"
+            return False
+        yield list(self.items), [len(self.items) - 1], "Enqueued {}".format(item)
+        return True
+
+    def dequeue(self):
+        """Remove and return the first item from the queue"""
+        item = self.dequeue_fast()
+        if item is None:
+            yield [], [], "Queue is empty"
+            return
+        yield list(self.items), [], "Dequeued {}".format(item)
+        return item
+
+    def peek(self):
+        """Peek at the first item without removing it"""
+        item = self.peek_fast()
+        if item is None:
+            yield [], [], "Queue is empty"
+            return
+        yield self.frame(), [0], "Peeked at {}".format(item)
+        return item
+
+    # -- fast paths ---------------------------------------------------------
+
+    def enqueue_fast(self, item):
+        """Add ``item`` unless the queue is full; returns whether it was"""
+        with self._lock:
+            if not self._has_room():
+                return False
+            self.items.append(item)
+            self._not_empty.notify()
+            return True
+
+    def dequeue_fast(self):
+        """Remove and return the first item; None when the queue is empty"""
+        with self._lock:
+            if not self.items:
+                return None
+            item = self.items.popleft()
+            self._not_full.notify()
+            return item
+
+    def peek_fast(self):
+        with self._lock:
+            return self.items[0] if self.items else None
+
+    def _bulk_load(self, values):
+        values = list(values)
+        with self._lock:
+            if self.max_size is not None and (
+                len(self.items) + len(values) > self.max_size
+            ):
+                raise ValueError("values exceed the queue's max_size")
+            self.items.extend(values)
+            self._not_empty.notify(len(values))
+
+    def to_array(self):
+        with self._lock:
+            return list(self.items)
+
+
+# -----------------------------------------------------------------------------
+# Radix Tree (compressed trie over string keys)
+# -----------------------------------------------------------------------------
+
+
+class RadixNode:
+    """Radix tree node; ``label`` is the text on the edge leading into it"""
+
+    __slots__ = ("label", "children", "terminal", "value")
+
+    def __init__(self, label, terminal=False, value=None):
+        self.label = label
+        self.children = None  # first character -> child, created on demand
+        self.terminal = terminal
+        self.value = value
+
+
+def _common_length(label, key, start):
+    """Length of the common prefix of ``label`` and ``key[start:]``"""
+    if key.startswith(label, start):
+        return len(label)
+    limit = min(len(label), len(key) - start)
+    i = 0
+    while i < limit and label[i] == key[start + i]:
+        i += 1
+    return i
+
+
+class RadixTree(BulkLoadable):
+    """Set (or map) of string keys stored as a compressed trie.
+
+    Chains of single-child nodes are merged into one edge labelled with the
+    whole substring, so a lookup costs O(k) for a key of length k regardless
+    of how many keys are stored, and keys sharing a prefix store it once.
+    Prefix enumeration walks to the prefix and lists the subtree in sorted
+    order; longest-prefix match (as in routing tables) remembers the last
+    key passed on the way down.
+    """
+
+    KEY_TYPE = str
+
+    OPERATIONS = (
+        Operation("insert", "insert", 1, "insert_fast", "delete"),
+        Operation("delete", "delete", 1, "delete_fast", "insert"),
+        Operation("search", "search", 1, "search_fast", mutates=False),
+        Operation(
+            "prefix_search",
+            "prefix_search",
+            1,
+            "prefix_search_fast",
+            mutates=False,
+        ),
+        Operation(
+            "longest_prefix",
+            "longest_prefix",
+            1,
+            "longest_prefix_fast",
+            mutates=False,
+        ),
+    )
+
+    def __init__(self):
+        self.root = RadixNode("")
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _step(self, trace, nodes, message):
+        if trace is not None:
+            trace.append((self.frame(), [id(node) for node in nodes], message))
+
+    @staticmethod
+    def _attach(parent, child):
+        if parent.children is None:
+            parent.children = {}
+        parent.children[child.label[0]] = child
+
+    def _path(self, key, trace=None):
+        """Nodes from the root to the one spelling ``key`` exactly, or None"""
+        node, depth = self.root, 0
+        path = [node]
+        while depth < len(key):
+            child = node.children.get(key[depth]) if node.children else None
+            if child is None or not key.startswith(child.label, depth):
+                self._step(trace, path, "No edge continues {!r}".format(key[depth:]))
+                return None
+            node, depth = child, depth + len(child.label)
+            path.append(node)
+            self._step(trace, path, "Matched {!r}".format(key[:depth]))
+        return path
+
+    def _insert(self, key, value=None, trace=None):
+        node, depth = self.root, 0
+        path = [node]
+        while depth < len(key):
+            child = node.children.get(key[depth]) if node.children else None
+            if child is None:
+                leaf = RadixNode(key[depth:], True, value)
+                self._attach(node, leaf)
+                self.size += 1
+                self._step(trace, path + [leaf], "Added edge {!r}".format(leaf.label))
+                return True
+            common = _common_length(child.label, key, depth)
+            if common < len(child.label):
+                # Split the edge where the key leaves it
+                middle = RadixNode(child.label[:common])
+                child.label = child.label[common:]
+                middle.children = {child.label[0]: child}
+                node.children[middle.label[0]] = middle
+                child = middle
+                self._step(
+                    trace,
+                    path + [middle],
+                    "Split edge at {!r}".format(key[: depth + common]),
+                )
+            node, depth = child, depth + common
+            path.append(node)
+            self._step(trace, path, "Matched {!r}".format(key[:depth]))
+        if node.terminal:
+            node.value = value
+            return False
+        node.terminal, node.value = True, value
+        self.size += 1
+        self._step(trace, path, "Marked {!r} as a key".format(key))
+        return True
+
+    def _delete(self, key, trace=None):
+        path = self._path(key, trace)
+        if path is None or not path[-1].terminal:
+            return False
+        node = path[-1]
+        node.terminal, node.value = False, None
+        self.size -= 1
+        if len(path) == 1:
+            return True  # the empty key lives on the root
+        parent = path[-2]
+        if not node.children:
+            del parent.children[node.label[0]]
+            if not parent.children:
+                parent.children = None
+            if len(path) == 2:
+                return True
+            node, parent = parent, path[-3]
+        # A non-key node with one child is merged back into a single edge
+        if not node.terminal and node.children and len(node.children) == 1:
+            (child,) = node.children.values()
+            child.label = node.label + child.label
+            parent.children[child.label[0]] = child
+        return True
+
+    def _subtree_keys(self, node, prefix, limit=None):
+        """Keys under ``node`` (whose path spells ``prefix``) in sorted order"""
+        keys = []
+        stack = [(node, prefix)]
+        while stack and (limit is None or len(keys) < limit):
+            node, prefix = stack.pop()
+            if node.terminal:
+                keys.append(prefix)
+            if node.children:
+                for first in sorted(node.children, reverse=True):
+                    child = node.children[first]
+                    stack.append((child, prefix + child.label))
+        return keys
+
+    def _prefix_search(self, prefix, limit=None, trace=None):
+        node, depth, text = self.root, 0, ""
+        path = [node]
+        while depth < len(prefix):
+            child = node.children.get(prefix[depth]) if node.children else None
+            if child is not None:
+                common = _common_length(child.label, prefix, depth)
+            if child is None or (
+                common < len(child.label) and depth + common < len(prefix)
+            ):
+                self._step(trace, path, "No key starts with {!r}".format(prefix))
+                return []
+            node, depth, text = child, depth + len(child.label), text + child.label
+            path.append(node)
+            self._step(trace, path, "Followed {!r}".format(child.label))
+        return self._subtree_keys(node, text, limit)
+
+    def _longest_prefix(self, text, trace=None):
+        node, depth, end = self.root, 0, len(text)
+        path = [node]
+        best = 0 if node.terminal else None
+        while depth < end:
+            children = node.children
+            if children is None:
+                break
+            child = children.get(text[depth])
+            if child is None or not text.startswith(child.label, depth):
+                break
+            node, depth = child, depth + len(child.label)
+            if node.terminal:
+                best = depth
+            if trace is not None:
+                path.append(node)
+                message = "{!r} is a key" if node.terminal else "Matched {!r}"
+                self._step(trace, path, message.format(text[:depth]))
+        return None if best is None else text[:best]
+
+    # -- visualization operations --------------------------------------------
+
+    def insert(self, key):
+        """Insert ``key``, splitting an edge if it diverges mid-label"""
+        trace = []
+        inserted = self._insert(key, None, trace)
+        yield from trace
+        if not inserted:
+            yield self.frame(), [], "{!r} is already present".format(key)
+        return inserted
+
+    def delete(self, key):
+        """Remove ``key`` and merge any node left with a single child"""
+        trace = []
+        deleted = self._delete(key, trace)
+        yield from trace
+        yield self.frame(), [], (
+            "Deleted {!r}".format(key) if deleted else "{!r} not found".format(key)
+        )
+        return deleted
+
+    def search(self, key):
+        """Follow the edges spelling ``key``"""
+        trace = []
+        path = self._path(key, trace)
+        yield from trace
+        if path is not None and path[-1].terminal:
+            yield self.frame(), [id(node) for node in path], "Found {!r}".format(key)
+        else:
+            yield self.frame(), [], "{!r} not found".format(key)
+
+    def prefix_search(self, prefix, limit=None):
+        """Walk to ``prefix`` and list every key below it"""
+        trace = []
+        keys = self._prefix_search(prefix, limit, trace)
+        yield from trace
+        yield self.frame(), [], "Keys starting with {!r}: {}".format(prefix, keys)
+
+    def longest_prefix(self, text):
+        """Longest stored key that is a prefix of ``text``"""
+        trace = []
+        key = self._longest_prefix(text, trace)
+        yield from trace
+        yield self.frame(), [], (
+            "Longest prefix of {!r}: {!r}".format(text, key)
+            if key is not None
+            else "No key is a prefix of {!r}".format(text)
+        )
+
+    # -- fast paths -------------------------------------------------------------
+
+    def insert_fast(self, key, value=None):
+        """Add ``key`` (or update its value); returns whether it was new"""
+        return self._insert(key, value)
+
+    def delete_fast(self, key):
+        return self._delete(key)
+
+    def _find(self, key):
+        """Node spelling ``key`` exactly, or None (``_path`` without the
+        bookkeeping, for the fast paths)"""
+        node, depth, end = self.root, 0, len(key)
+        while depth < end:
+            children = node.children
+            if children is None:
+                return None
+            node = children.get(key[depth])
+            if node is None or not key.startswith(node.label, depth):
+                return None
+            depth += len(node.label)
+        return node
+
+    def search_fast(self, key):
+        node = self._find(key)
+        return node is not None and node.terminal
+
+    def get(self, key, default=None):
+        """Value stored with ``key``"""
+        node = self._find(key)
+        if node is None or not node.terminal:
+            return default
+        return node.value
+
+    def prefix_search_fast(self, prefix, limit=None):
+        """Up to ``limit`` keys starting with ``prefix``, in sorted order"""
+        return self._prefix_search(prefix, limit)
+
+    def longest_prefix_fast(self, text):
+        return self._longest_prefix(text)
+
+    def autocomplete(self, prefixes, limit=10):
+        """``{prefix: up to limit completions}`` for a batch of prefixes"""
+        return {prefix: self._prefix_search(prefix, limit) for prefix in prefixes}
+
+    def _bulk_load(self, values):
+        keys = sorted(values)  # linear when the keys already arrive sorted
+        if self.size:
+            for key in keys:
+                self._insert(key)
+            return
+        # Sorted keys only ever branch off the rightmost path, so keep that
+        # path (with the text length at each node) instead of walking from
+        # the root for every key
+        path = [(self.root, 0)]
+        previous = None
+        for key in keys:
+            if key == previous:
+                continue
+            if not key:
+                self.root.terminal = True
+                self.size += 1
+                previous = key
+                continue
+            common = _common_length(previous, key, 0) if previous else 0
+            child = None
+            while path[-1][1] > common:
+                child, _ = path.pop()
+            parent, depth = path[-1]
+            if depth < common:
+                cut = common - depth
+                middle = RadixNode(child.label[:cut])
+                child.label = child.label[cut:]
+                middle.children = {child.label[0]: child}
+                parent.children[middle.label[0]] = middle
+                parent = middle
+                path.append((middle, common))
+            leaf = RadixNode(key[common:], True)
+            self._attach(parent, leaf)
+            path.append((leaf, len(key)))
+            self.size += 1
+            previous = key
+
+    def layout(self):
+        """``(node id, parent id, edge label, is key)`` in sorted preorder"""
+        nodes = []
+        stack = [(self.root, None)]
+        while stack:
+            node, parent = stack.pop()
+            nodes.append((id(node), parent, node.label, node.terminal))
+            if node.children:
+                for first in sorted(node.children, reverse=True):
+                    stack.append((node.children[first], id(node)))
+        return nodes
+
+    def frame(self):
+        return Frame(data=self.to_array(), layout=self.layout())
+
+    def to_array(self):
+        return self._subtree_keys(self.root, "")
+
+
+# Data structure generators for visualization
+DATA_STRUCTURES = {
+    "Linked List": LinkedList,
+    "Stack": Stack,
+    "Queue": Queue,
+    "Binary Tree": BinaryTree,
+    "Array": ArrayStructure,
     "Binary Heap": BinaryHeap,
+    "AVL Tree": AVLTree,
+    "Red-Black Tree": RedBlackTree,
+    "Hash Table": HashTable,
+    "Skip List": SkipList,
+    "B+ Tree": SmallPageBPlusTree,
+    "Disjoint Set": DisjointSet,
+    "Persistent List": PersistentList,
+    "Persistent Stack": PersistentStack,
+    "Persistent Queue": PersistentQueue,
+    "Persistent Heap": PersistentHeap,
+    "LRU Cache": LRUCache,
+    "LFU Cache": LFUCache,
+    "Bloom Filter": BloomFilter,
+    "Count-Min Sketch": CountMinSketch,
+    "Fenwick Tree": FenwickTree,
+    "Segment Tree": SegmentTree,
+    "Rope": SmallChunkRope,
+    "Concurrent Stack": ConcurrentStack,
+    "Two-Lock Queue": TwoLockQueue,
+    "Blocking Queue": BlockingQueue,
+    "Radix Tree": RadixTree,
 }
 
 # Data structure information
 DATA_STRUCTURE_INFO = {
     "Linked List": {
         "description": "A linear data structure where elements are stored in nodes, and each node points to the next node in the sequence.",
-        "operations": ["Insert at beginning", "Insert at end", "Delete", "Search"],
+        "operations": [
+            "Insert at beginning",
+            "Insert at end",
+            "Delete",
+            "Pop (either end)",
+            "Search",
+        ],
         "time_complexity": {
             "insertion": "O(1) at beginning, O(n) at end",
             "deletion": "O(1) at beginning, O(n) at end",
@@ -366,8 +5754,13 @@ DATA_STRUCTURE_INFO = {
     },
     "Stack": {
         "description": "A linear data structure that follows the Last In First Out (LIFO) principle.",
-        "operations": ["Push", "Pop", "Peek"],
-        "time_complexity": {"push": "O(1)", "pop": "O(1)", "peek": "O(1)"},
+        "operations": ["Push", "Pop", "Peek", "Min / Max"],
+        "time_complexity": {
+            "push": "O(1)",
+            "pop": "O(1)",
+            "peek": "O(1)",
+            "min / max": "O(1)",
+        },
     },
     "Queue": {
         "description": "A linear data structure that follows the First In First Out (FIFO) principle.",
@@ -376,25 +5769,233 @@ DATA_STRUCTURE_INFO = {
     },
     "Binary Tree": {
         "description": "A hierarchical data structure where each node has at most two children, referred to as left child and right child.",
-        "operations": ["Insert", "Traverse"],
-        "time_complexity": {"insertion": "O(n)", "traversal": "O(n)"},
+        "operations": ["Insert", "Pop (last node)", "Traverse", "Select"],
+        "time_complexity": {
+            "insertion": "O(log n)",
+            "pop (last node)": "O(log n)",
+            "traversal": "O(n)",
+            "select (inorder position)": "O(log n) with order statistics",
+        },
     },
     "Array": {
-        "description": "A sequence of elements accessible by contiguous indices.",
+        "description": "A sequence of elements accessible by contiguous indices, stored as a typed array of machine integers.",
         "operations": ["Insert", "Delete", "Search"],
         "time_complexity": {
             "insert": "O(1) amortized (append)",
             "delete": "O(n)",
-            "search": "O(n)",
+            "search": "O(n), O(log n) when sorted",
         },
     },
     "Binary Heap": {
         "description": "A complete binary tree that maintains the heap property; here implemented as a min-heap.",
-        "operations": ["Insert", "Delete (root)", "Search"],
+        "operations": ["Insert", "Delete (root)", "Remove (value)", "Search"],
+        "time_complexity": {
+            "insert": "O(log n)",
+            "delete": "O(log n)",
+            "remove (value)": "O(n)",
+            "search": "O(n)",
+        },
+    },
+    "AVL Tree": {
+        "description": "A self-balancing binary search tree where the heights of the two child subtrees of any node differ by at most one; rotations restore balance after updates.",
+        "operations": [
+            "Insert",
+            "Delete",
+            "Search",
+            "Predecessor/Successor",
+            "Range query",
+            "Select/Rank",
+        ],
+        "time_complexity": {
+            "insert": "O(log n)",
+            "delete": "O(log n)",
+            "search": "O(log n)",
+            "predecessor/successor": "O(log n)",
+            "range query": "O(log n + k)",
+            "select/rank": "O(log n) with order statistics",
+        },
+    },
+    "Red-Black Tree": {
+        "description": "A self-balancing binary search tree that colours nodes red or black so that no path from the root is more than twice as long as any other.",
+        "operations": [
+            "Insert",
+            "Delete",
+            "Search",
+            "Predecessor/Successor",
+            "Range query",
+            "Select/Rank",
+        ],
         "time_complexity": {
             "insert": "O(log n)",
             "delete": "O(log n)",
+            "search": "O(log n)",
+            "predecessor/successor": "O(log n)",
+            "range query": "O(log n + k)",
+            "select/rank": "O(log n) with order statistics",
+        },
+    },
+    "Hash Table": {
+        "description": "An open-addressing hash map that stores keys directly in a slot array, probing linearly (or Robin Hood style) on collisions and rehashing incrementally as it grows.",
+        "operations": ["Insert", "Delete", "Search"],
+        "time_complexity": {
+            "insert": "O(1) expected",
+            "delete": "O(1) expected",
+            "search": "O(1) expected",
+            "resize": "O(1) per operation (incremental)",
+        },
+    },
+    "Skip List": {
+        "description": "A sorted linked list with randomly sized express lanes stacked above it, so searches skip ahead on upper levels before dropping down.",
+        "operations": ["Insert", "Delete", "Search", "Rank", "Range scan"],
+        "time_complexity": {
+            "insert": "O(log n) expected",
+            "delete": "O(log n) expected",
+            "search": "O(log n) expected",
+            "rank": "O(log n) expected",
+            "range scan": "O(log n + k) expected",
+        },
+    },
+    "B+ Tree": {
+        "description": "A wide, shallow search tree whose nodes are fixed-size pages of a memory-mapped file; values live in linked leaf pages so range scans stream along the bottom level. Shown here with tiny pages.",
+        "operations": ["Insert", "Delete", "Search", "Range scan", "Bulk load"],
+        "time_complexity": {
+            "insert": "O(log_B n) page reads",
+            "delete": "O(log_B n) page reads",
+            "search": "O(log_B n) page reads",
+            "range scan": "O(log_B n + k/B) page reads",
+            "bulk load": "O(n) from sorted input",
+        },
+    },
+    "Disjoint Set": {
+        "description": "A forest of parent pointers that tracks which elements are connected; union by rank and path compression keep every tree almost flat.",
+        "operations": ["Make set", "Find", "Union (enter two values, e.g. '3 7')"],
+        "time_complexity": {
+            "make set": "O(1)",
+            "find": "O(α(n)) amortized",
+            "union": "O(α(n)) amortized",
+        },
+    },
+    "Persistent List": {
+        "description": "An immutable vector (a 32-way trie) where every change creates a new version sharing all untouched nodes, so the full history stays available for undo and time travel.",
+        "operations": ["Append", "Delete", "Search"],
+        "time_complexity": {
+            "append": "O(log n)",
+            "delete": "O(log n) last, O(n) by value",
+            "search": "O(n)",
+            "new version": "O(log n) memory",
+        },
+    },
+    "Persistent Stack": {
+        "description": "An immutable linked stack; each push or pop creates a version that shares the rest of the stack with its predecessor.",
+        "operations": ["Push", "Pop", "Peek"],
+        "time_complexity": {
+            "push": "O(1)",
+            "pop": "O(1)",
+            "peek": "O(1)",
+            "new version": "O(1) memory",
+        },
+    },
+    "Persistent Queue": {
+        "description": "An immutable queue built from two linked lists; every enqueue and dequeue keeps the previous version intact.",
+        "operations": ["Enqueue", "Dequeue", "Peek"],
+        "time_complexity": {
+            "enqueue": "O(1)",
+            "dequeue": "O(1) amortized",
+            "peek": "O(1) amortized",
+            "new version": "O(1) memory",
+        },
+    },
+    "Persistent Heap": {
+        "description": "A min-heap whose array is a persistent vector, so every insert and delete is a new version that copies only the paths it touched.",
+        "operations": ["Insert", "Delete (root)", "Search"],
+        "time_complexity": {
+            "insert": "O(log² n)",
+            "delete": "O(log² n)",
+            "search": "O(n)",
+            "new version": "O(log² n) memory",
+        },
+    },
+    "LRU Cache": {
+        "description": "A fixed-capacity cache that evicts the least recently used key, using a hash map into a doubly linked recency list.",
+        "operations": ["Put (insert)", "Get (search)", "Delete"],
+        "time_complexity": {"put": "O(1)", "get": "O(1)", "evict": "O(1)"},
+    },
+    "LFU Cache": {
+        "description": "A fixed-capacity cache that evicts the least frequently used key, keeping one recency list per access count so ties fall back to LRU.",
+        "operations": ["Put (insert)", "Get (search)", "Delete"],
+        "time_complexity": {"put": "O(1)", "get": "O(1)", "evict": "O(1)"},
+    },
+    "Bloom Filter": {
+        "description": "A bit array where each key sets k hashed bits; lookups can return false positives but never false negatives.",
+        "operations": ["Insert", "Search"],
+        "time_complexity": {"insert": "O(k)", "search": "O(k)"},
+    },
+    "Count-Min Sketch": {
+        "description": "A grid of counters with one hashed cell per row; the minimum over the rows estimates a key's frequency and never undercounts.",
+        "operations": ["Insert (count)", "Search (estimate)"],
+        "time_complexity": {"insert": "O(depth)", "search": "O(depth)"},
+    },
+    "Fenwick Tree": {
+        "description": "A binary indexed tree whose slot i stores the sum of the lowbit(i) values ending at i, giving prefix sums and point updates in O(log n).",
+        "operations": ["Append (insert)", "Prefix sum (search)"],
+        "time_complexity": {
+            "build": "O(n)",
+            "append": "O(log n)",
+            "update": "O(log n)",
+            "prefix sum": "O(log n)",
+        },
+    },
+    "Segment Tree": {
+        "description": "A binary tree of range aggregates (sum, min or max); range additions are applied lazily and pushed down only when needed.",
+        "operations": ["Append (insert)", "Range query [0..i] (search)"],
+        "time_complexity": {
+            "build": "O(n)",
+            "query": "O(log n)",
+            "point update": "O(log n)",
+            "range add": "O(log n)",
+        },
+    },
+    "Rope": {
+        "description": "A sequence split into typed-array chunks held in an implicit treap (a randomized balanced tree ordered by position), so edits in the middle touch one chunk instead of shifting the whole tail.",
+        "operations": ["Insert at index", "Delete at index", "Delete slice", "Search"],
+        "time_complexity": {
+            "insert at index": "O(log n + chunk) expected",
+            "delete at index": "O(log n + chunk) expected",
+            "delete slice": "O(log n + chunk) expected",
+            "index access": "O(log n) expected",
             "search": "O(n)",
         },
     },
+    "Concurrent Stack": {
+        "description": "A stack that several threads can push to and pop from at once; one lock guards the top, the only place they contend.",
+        "operations": ["Push", "Pop", "Peek", "Min / Max"],
+        "time_complexity": {
+            "push": "O(1)",
+            "pop": "O(1)",
+            "peek": "O(1)",
+            "min / max": "O(1)",
+        },
+    },
+    "Two-Lock Queue": {
+        "description": "A linked FIFO queue (Michael & Scott) with one lock for the head and one for the tail, so producers and consumers never block each other.",
+        "operations": ["Enqueue", "Dequeue", "Peek"],
+        "time_complexity": {"enqueue": "O(1)", "dequeue": "O(1)", "peek": "O(1)"},
+    },
+    "Blocking Queue": {
+        "description": "A bounded FIFO work queue: producers wait while it is full and consumers wait while it is empty, on two condition variables sharing one lock.",
+        "operations": ["Enqueue", "Dequeue", "Peek"],
+        "time_complexity": {"enqueue": "O(1)", "dequeue": "O(1)", "peek": "O(1)"},
+    },
+    "Radix Tree": {
+        "description": "A compressed trie over string keys: chains of single-child nodes are merged into one edge labelled with the whole substring, so shared prefixes are stored once and lookups cost O(key length) however many keys are stored.",
+        "operations": ["Insert", "Delete", "Search", "Prefix search", "Longest prefix"],
+        "time_complexity": {
+            "insert": "O(k) for a key of length k",
+            "delete": "O(k)",
+            "search": "O(k)",
+            "prefix search": "O(k + m) for m matching keys",
+            "longest prefix": "O(k)",
+            "sorted batch insert": "O(n) for n keys of bounded length",
+        },
+    },
 }
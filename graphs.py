@@ -0,0 +1,443 @@
+import heapq
+import math
+from collections import deque
+
+import numpy as np
+
+from algorithms.data_structures import DisjointSet
+from algorithms.sorting import merge_sort
+
+
+class CSRGraph:
+    """Directed, weighted graph in compressed sparse row (CSR) form.
+
+    The out-edges of vertex ``u`` are ``indices[indptr[u]:indptr[u + 1]]``
+    with matching ``weights``; all three are NumPy arrays, so a graph with
+    millions of edges costs three flat buffers instead of one list per vertex.
+    """
+
+    def __init__(self, indptr, indices, weights=None, coords=None):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        if weights is None:
+            weights = np.ones(len(self.indices))
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.num_vertices = len(self.indptr) - 1
+        # Optional (x, y) per vertex, used by grid layouts and A*'s heuristic
+        self.coords = coords
+
+    @classmethod
+    def from_edges(cls, num_vertices, edges, directed=True, coords=None):
+        """Build from (u, v) or (u, v, weight) tuples"""
+        edges = list(edges)
+        if edges and len(edges[0]) == 3:
+            src, dst, weights = (np.array(column) for column in zip(*edges))
+        elif edges:
+            src, dst = (np.array(column) for column in zip(*edges))
+            weights = np.ones(len(src))
+        else:
+            src = dst = np.empty(0, dtype=np.int64)
+            weights = np.empty(0)
+        if not directed:
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+            weights = np.concatenate([weights, weights])
+        return cls.from_arrays(num_vertices, src, dst, weights, coords)
+
+    @classmethod
+    def from_arrays(cls, num_vertices, src, dst, weights=None, coords=None):
+        """Build from parallel source/destination (and weight) arrays"""
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        order = np.argsort(src, kind="stable")
+        indptr = np.zeros(num_vertices + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=num_vertices), out=indptr[1:])
+        weights = None if weights is None else np.asarray(weights)[order]
+        return cls(indptr, dst[order], weights, coords)
+
+    @classmethod
+    def grid(cls, rows, cols, weights=None, directed=True):
+        """Grid graph with edges to the right and down neighbours.
+
+        Directed grids are DAGs, so every algorithm (including topological
+        sort) runs on them. ``weights`` is an optional callable
+        ``(u, v) -> weight``.
+        """
+        edges = []
+        for r in range(rows):
+            for c in range(cols):
+                u = r * cols + c
+                for v in ([u + 1] if c + 1 < cols else []) + (
+                    [u + cols] if r + 1 < rows else []
+                ):
+                    edges.append((u, v, weights(u, v) if weights else 1))
+        coords = [(c, r) for r in range(rows) for c in range(cols)]
+        return cls.from_edges(rows * cols, edges, directed, coords)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def neighbors(self, u):
+        return self.indices[self.indptr[u] : self.indptr[u + 1]]
+
+    def edges(self, u):
+        """(neighbour, weight) pairs for the out-edges of ``u``"""
+        start, end = self.indptr[u], self.indptr[u + 1]
+        return zip(self.indices[start:end].tolist(), self.weights[start:end].tolist())
+
+    def edge_list(self):
+        """Every edge as a (u, v, weight) tuple"""
+        src = np.repeat(np.arange(self.num_vertices), np.diff(self.indptr))
+        return list(zip(src.tolist(), self.indices.tolist(), self.weights.tolist()))
+
+    def in_degrees(self):
+        return np.bincount(self.indices, minlength=self.num_vertices)
+
+
+# -----------------------------------------------------------------------------
+# Step generators
+#
+# Each algorithm takes (graph, source, target) and yields
+# (state, highlight_vertices, message) like the data structure operations.
+# ``state`` holds one label per vertex (distance, visit order, ...) or None.
+# -----------------------------------------------------------------------------
+
+
+def bfs(graph, source=0, target=None):
+    """
+    Breadth-First Search (generator for visualization)
+    Labels each vertex with its hop distance from the source.
+    Time Complexity: O(V + E)
+    """
+    dist = [None] * graph.num_vertices
+    dist[source] = 0
+    queue = deque([source])
+    yield list(dist), [source], "Start at {}".format(source)
+    while queue:
+        u = queue.popleft()
+        yield list(dist), [u], "Visiting {} (distance {})".format(u, dist[u])
+        if u == target:
+            yield list(dist), [u], "Reached target {}".format(target)
+            return
+        for v in graph.neighbors(u).tolist():
+            if dist[v] is None:
+                dist[v] = dist[u] + 1
+                queue.append(v)
+                yield list(dist), [u, v], "Discovered {} from {}".format(v, u)
+
+
+def dfs(graph, source=0, target=None):
+    """
+    Depth-First Search (generator for visualization)
+    Labels each vertex with the order in which it was first visited.
+    Time Complexity: O(V + E)
+    """
+    order = [None] * graph.num_vertices
+    stack = [source]
+    visited = 0
+    while stack:
+        u = stack.pop()
+        if order[u] is not None:
+            continue
+        order[u] = visited
+        visited += 1
+        yield list(order), [u], "Visiting {} (#{})".format(u, order[u])
+        if u == target:
+            yield list(order), [u], "Reached target {}".format(target)
+            return
+        # Push in reverse so the lowest-numbered neighbour is explored first
+        for v in reversed(graph.neighbors(u).tolist()):
+            if order[v] is None:
+                stack.append(v)
+
+
+def dijkstra(graph, source=0, target=None):
+    """
+    Dijkstra's shortest paths (generator for visualization)
+    Labels each vertex with its best known distance; weights must be >= 0.
+    Time Complexity: O((V + E) log V)
+    """
+    dist = [math.inf] * graph.num_vertices
+    dist[source] = 0
+    heap = [(0, source)]
+    done = [False] * graph.num_vertices
+    yield _labels(dist), [source], "Start at {}".format(source)
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = True
+        yield _labels(dist), [u], "Settled {} at distance {:g}".format(u, d)
+        if u == target:
+            yield _labels(dist), [u], "Shortest path to {} is {:g}".format(target, d)
+            return
+        for v, w in graph.edges(u):
+            if d + w < dist[v]:
+                dist[v] = d + w
+                heapq.heappush(heap, (dist[v], v))
+                yield _labels(dist), [u, v], "Relaxed {} -> {} to {:g}".format(
+                    u, v, dist[v]
+                )
+
+
+def astar(graph, source=0, target=None, heuristic=None):
+    """
+    A* search (generator for visualization)
+    Dijkstra guided by an admissible heuristic; defaults to the Manhattan
+    distance between vertex coordinates when the graph has them.
+    Time Complexity: O((V + E) log V) worst case
+    """
+    if target is None:
+        target = graph.num_vertices - 1
+    if heuristic is None:
+        heuristic = manhattan_heuristic(graph, target)
+
+    dist = [math.inf] * graph.num_vertices
+    dist[source] = 0
+    heap = [(heuristic(source), source)]
+    done = [False] * graph.num_vertices
+    yield _labels(dist), [source], "Start at {}, target {}".format(source, target)
+    while heap:
+        f, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = True
+        yield _labels(dist), [u], "Expanding {} (f = {:g})".format(u, f)
+        if u == target:
+            yield _labels(dist), [u], "Shortest path to {} is {:g}".format(
+                target, dist[u]
+            )
+            return
+        for v, w in graph.edges(u):
+            if dist[u] + w < dist[v]:
+                dist[v] = dist[u] + w
+                heapq.heappush(heap, (dist[v] + heuristic(v), v))
+                yield _labels(dist), [u, v], "Relaxed {} -> {} to {:g}".format(
+                    u, v, dist[v]
+                )
+    yield _labels(dist), [], "{} is unreachable".format(target)
+
+
+def manhattan_heuristic(graph, target):
+    """Grid distance to ``target`` from vertex coordinates (zero without them)"""
+    if graph.coords is None:
+        return lambda v: 0
+    tx, ty = graph.coords[target]
+    coords = graph.coords
+    return lambda v: abs(coords[v][0] - tx) + abs(coords[v][1] - ty)
+
+
+def topological_sort(graph, source=0, target=None):
+    """
+    Topological sort using Kahn's algorithm (generator for visualization)
+    Labels each vertex with its position in the order; ``source`` and
+    ``target`` are ignored.
+    Time Complexity: O(V + E)
+    """
+    indegree = graph.in_degrees().tolist()
+    position = [None] * graph.num_vertices
+    ready = deque(v for v in range(graph.num_vertices) if indegree[v] == 0)
+    placed = 0
+    while ready:
+        u = ready.popleft()
+        position[u] = placed
+        placed += 1
+        yield list(position), [u], "Placed {} at position {}".format(u, position[u])
+        for v in graph.neighbors(u).tolist():
+            indegree[v] -= 1
+            if indegree[v] == 0:
+                ready.append(v)
+                yield list(position), [u, v], "{} has no remaining inputs".format(v)
+    if placed < graph.num_vertices:
+        yield list(position), [], "Graph has a cycle; no topological order exists"
+
+
+def kruskal(graph, source=0, target=None):
+    """
+    Kruskal's minimum spanning forest (generator for visualization)
+    Edges are treated as undirected and ordered by weight with merge sort;
+    each vertex is labelled with the representative of its component.
+    ``source`` and ``target`` are ignored.
+    Time Complexity: O(E log E)
+    """
+    edges = _sorted_edges(graph)
+    components = DisjointSet(range(graph.num_vertices))
+
+    def roots():
+        return [components.find_fast(x) for x in range(graph.num_vertices)]
+
+    yield roots(), [], "Sorted {} edges by weight".format(len(edges))
+    total = 0
+    for w, u, v in edges:
+        if components.union_fast(u, v):
+            total += w
+            message = "Added {} - {} (weight {:g})".format(u, v, w)
+        else:
+            message = "Skipped {} - {}: would form a cycle".format(u, v)
+        yield roots(), [u, v], message
+        if components.count == 1:
+            break
+    yield roots(), [], "Spanning forest weight {:g} ({} component(s))".format(
+        total, components.count
+    )
+
+
+def _sorted_edges(graph):
+    """``(weight, u, v)`` triples ordered by the merge sort generator"""
+    edges = [(w, u, v) for u, v, w in graph.edge_list()]
+    for _ in merge_sort(edges):
+        pass
+    return edges
+
+
+def _labels(dist):
+    return [
+        None if d == math.inf else (int(d) if float(d).is_integer() else d)
+        for d in dist
+    ]
+
+
+# -----------------------------------------------------------------------------
+# Headless fast paths
+# -----------------------------------------------------------------------------
+
+
+def bfs_levels(graph, source=0):
+    """Hop distance from ``source`` to every vertex (-1 if unreachable).
+
+    Expands a whole frontier per iteration with NumPy gathers instead of
+    visiting vertices one at a time, so it scales to millions of edges.
+    """
+    indptr, indices = graph.indptr, graph.indices
+    dist = np.full(graph.num_vertices, -1, dtype=np.int64)
+    dist[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    level = 0
+    while frontier.size:
+        starts = indptr[frontier]
+        lengths = indptr[frontier + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            break
+        # Positions of every out-edge of every frontier vertex
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        neighbours = indices[offsets + np.arange(total)]
+        neighbours = np.unique(neighbours[dist[neighbours] < 0])
+        level += 1
+        dist[neighbours] = level
+        frontier = neighbours
+    return dist
+
+
+def kruskal_mst(graph):
+    """Minimum spanning forest as ``(edges, total_weight)``.
+
+    ``edges`` holds ``(u, v, weight)`` triples in the order they were
+    accepted; connectivity checks go through a path-compressed union-find.
+    """
+    components = DisjointSet(range(graph.num_vertices))
+    union = components.union_fast
+    tree = []
+    total = 0
+    for w, u, v in _sorted_edges(graph):
+        if union(u, v):
+            tree.append((u, v, w))
+            total += w
+            if components.count == 1:
+                break
+    return tree, total
+
+
+# -----------------------------------------------------------------------------
+# Layouts (positions in the unit square, no force simulation)
+# -----------------------------------------------------------------------------
+
+
+def grid_layout(graph):
+    """Use vertex coordinates if present, otherwise a square-ish grid"""
+    if graph.coords is not None:
+        points = graph.coords
+    else:
+        cols = max(1, math.ceil(math.sqrt(graph.num_vertices)))
+        points = [(v % cols, v // cols) for v in range(graph.num_vertices)]
+    max_x = max((x for x, _ in points), default=0) or 1
+    max_y = max((y for _, y in points), default=0) or 1
+    return [(x / max_x, y / max_y) for x, y in points]
+
+
+def layered_layout(graph):
+    """Place vertices in rows by BFS depth from the vertices with no in-edges"""
+    indegree = graph.in_degrees()
+    roots = np.flatnonzero(indegree == 0).tolist() or [0]
+    depth = [None] * graph.num_vertices
+    queue = deque(roots)
+    for root in roots:
+        depth[root] = 0
+    while queue:
+        u = queue.popleft()
+        for v in graph.neighbors(u).tolist():
+            if depth[v] is None:
+                depth[v] = depth[u] + 1
+                queue.append(v)
+    last = max((d for d in depth if d is not None), default=0) + 1
+    depth = [last if d is None else d for d in depth]
+
+    layers = {}
+    for v, d in enumerate(depth):
+        layers.setdefault(d, []).append(v)
+    rows = max(layers) or 1
+    positions = [None] * graph.num_vertices
+    for d, members in layers.items():
+        for i, v in enumerate(members):
+            positions[v] = ((i + 1) / (len(members) + 1), d / rows)
+    return positions
+
+
+def sample_graph():
+    """Small weighted grid DAG used by the visualizer"""
+    return CSRGraph.grid(3, 4, weights=lambda u, v: 1 + (u * 7 + v * 3) % 5)
+
+
+# Dictionary of all graph algorithms
+GRAPH_ALGORITHMS = {
+    "BFS": bfs,
+    "DFS": dfs,
+    "Dijkstra": dijkstra,
+    "A*": astar,
+    "Topological Sort": topological_sort,
+    "Kruskal MST": kruskal,
+}
+
+# Algorithm descriptions and complexities
+GRAPH_ALGORITHM_INFO = {
+    "BFS": {
+        "description": "Explores the graph level by level from the source using a FIFO queue, finding fewest-edge paths.",
+        "time_complexity": "O(V + E)",
+        "space_complexity": "O(V)",
+    },
+    "DFS": {
+        "description": "Follows each branch as deep as possible before backtracking, using an explicit stack.",
+        "time_complexity": "O(V + E)",
+        "space_complexity": "O(V)",
+    },
+    "Dijkstra": {
+        "description": "Repeatedly settles the closest unsettled vertex and relaxes its edges, giving shortest paths for non-negative weights.",
+        "time_complexity": "O((V + E) log V)",
+        "space_complexity": "O(V)",
+    },
+    "A*": {
+        "description": "Dijkstra's algorithm guided towards the target by a heuristic estimate of the remaining distance.",
+        "time_complexity": "O((V + E) log V)",
+        "space_complexity": "O(V)",
+    },
+    "Topological Sort": {
+        "description": "Orders the vertices of a directed acyclic graph so every edge points forward, by repeatedly removing vertices with no incoming edges.",
+        "time_complexity": "O(V + E)",
+        "space_complexity": "O(V)",
+    },
+    "Kruskal MST": {
+        "description": "Sorts the edges by weight and keeps each one that joins two different components, tracked with a union-find.",
+        "time_complexity": "O(E log E)",
+        "space_complexity": "O(V + E)",
+    },
+}
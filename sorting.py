@@ -1,50 +1,76 @@
+import heapq
+import operator
 import random
 
+# Every sort takes ``key`` and ``reverse`` like ``sorted``. Keys are computed
+# once per element into a list kept parallel to ``arr`` (decorate-sort-
+# undecorate), so an expensive key is never recomputed per comparison; with
+# no key the values are compared directly and ``keys`` is ``arr`` itself.
+# Only ``<`` is used (``>`` when reversed), and ties never move, so the
+# stable sorts stay stable in both directions.
 
-def bubble_sort(arr):
+
+def _decorate(arr, key, reverse):
+    """``(keys, less)`` where ``less(a, b)`` says key ``a`` sorts first"""
+    keys = arr if key is None else [key(value) for value in arr]
+    return keys, operator.gt if reverse else operator.lt
+
+
+def _swap(arr, keys, i, j):
+    arr[i], arr[j] = arr[j], arr[i]
+    if keys is not arr:
+        keys[i], keys[j] = keys[j], keys[i]
+
+
+def bubble_sort(arr, key=None, reverse=False):
     """
     Bubble Sort algorithm (generator for visualization)
     Yields the array, indices being compared, and whether a swap occurred.
     Time Complexity: O(n^2) worst/average, O(n) best
     """
+    keys, less = _decorate(arr, key, reverse)
     n = len(arr)
     for i in range(n):
         for j in range(0, n - i - 1):
             # Yield current state and highlight comparison (no swap yet)
             yield arr, (j, j + 1), False
-            if arr[j] > arr[j + 1]:
-                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+            if less(keys[j + 1], keys[j]):
+                _swap(arr, keys, j, j + 1)
                 # Yield state after swap
                 yield arr, (j, j + 1), True
 
 
-def insertion_sort(arr):
+def insertion_sort(arr, key=None, reverse=False):
     """
     Insertion Sort algorithm (generator for visualization)
     Time Complexity: O(n^2) worst/average, O(n) best
     """
+    keys, less = _decorate(arr, key, reverse)
     for i in range(1, len(arr)):
-        key = arr[i]
+        value, value_key = arr[i], keys[i]
         j = i - 1
         # Highlight the key element
         yield arr, (i,), False
-        while j >= 0 and arr[j] > key:
+        while j >= 0 and less(value_key, keys[j]):
             # Highlight comparison
             yield arr, (j, j + 1), False
             arr[j + 1] = arr[j]
+            keys[j + 1] = keys[j]
             # Highlight swap
             yield arr, (j, j + 1), True
             j -= 1
-        arr[j + 1] = key
+        arr[j + 1] = value
+        keys[j + 1] = value_key
         # Highlight final placement
         yield arr, (j + 1,), False
 
 
-def selection_sort(arr):
+def selection_sort(arr, key=None, reverse=False):
     """
     Selection Sort algorithm (generator for visualization)
     Time Complexity: O(n^2) worst/average/best
     """
+    keys, less = _decorate(arr, key, reverse)
     n = len(arr)
     for i in range(n):
         min_idx = i
@@ -53,36 +79,37 @@ def selection_sort(arr):
         for j in range(i + 1, n):
             # Highlight comparison
             yield arr, (j, min_idx), False
-            if arr[j] < arr[min_idx]:
+            if less(keys[j], keys[min_idx]):
                 min_idx = j
                 # Highlight new minimum
                 yield arr, (min_idx,), False
         # Swap minimum with current position
         if min_idx != i:
-            arr[i], arr[min_idx] = arr[min_idx], arr[i]
+            _swap(arr, keys, i, min_idx)
             yield arr, (i, min_idx), True
 
 
-def quick_sort(arr):
+def quick_sort(arr, key=None, reverse=False):
     """
     Quick Sort algorithm (generator for visualization)
     Time Complexity: O(n log n) average, O(n^2) worst
     """
+    keys, less = _decorate(arr, key, reverse)
 
     def partition(low, high):
-        pivot = arr[high]
+        pivot = keys[high]
         i = low - 1
         # Highlight pivot
         yield arr, (high,), False
         for j in range(low, high):
             # Highlight comparison
             yield arr, (j, high), False
-            if arr[j] <= pivot:
+            if not less(pivot, keys[j]):
                 i += 1
                 if i != j:
-                    arr[i], arr[j] = arr[j], arr[i]
+                    _swap(arr, keys, i, j)
                     yield arr, (i, j), True
-        arr[i + 1], arr[high] = arr[high], arr[i + 1]
+        _swap(arr, keys, i + 1, high)
         yield arr, (i + 1, high), True
         return i + 1
 
@@ -95,36 +122,40 @@ def quick_sort(arr):
     yield from quick_sort_helper(0, len(arr) - 1)
 
 
-def merge_sort(arr):
+def merge_sort(arr, key=None, reverse=False):
     """
     Merge Sort algorithm (generator for visualization)
     Time Complexity: O(n log n) worst/average/best
     """
+    keys, less = _decorate(arr, key, reverse)
 
     def merge(left, mid, right):
         left_arr = arr[left : mid + 1]
         right_arr = arr[mid + 1 : right + 1]
+        left_keys = keys[left : mid + 1]
+        right_keys = keys[mid + 1 : right + 1]
         i = j = 0
         k = left
 
         while i < len(left_arr) and j < len(right_arr):
             # Highlight comparison
             yield arr, (left + i, mid + 1 + j), False
-            if left_arr[i] <= right_arr[j]:
-                arr[k] = left_arr[i]
+            # Ties take from the left run, which keeps the sort stable
+            if not less(right_keys[j], left_keys[i]):
+                arr[k], keys[k] = left_arr[i], left_keys[i]
                 i += 1
             else:
-                arr[k] = right_arr[j]
+                arr[k], keys[k] = right_arr[j], right_keys[j]
                 j += 1
             k += 1
 
         while i < len(left_arr):
-            arr[k] = left_arr[i]
+            arr[k], keys[k] = left_arr[i], left_keys[i]
             i += 1
             k += 1
 
         while j < len(right_arr):
-            arr[k] = right_arr[j]
+            arr[k], keys[k] = right_arr[j], right_keys[j]
             j += 1
             k += 1
 
@@ -138,6 +169,200 @@ def merge_sort(arr):
     yield from merge_sort_helper(0, len(arr) - 1)
 
 
+# -----------------------------------------------------------------------------
+# Selection (the k-th smallest value or the k smallest, without a full sort)
+# -----------------------------------------------------------------------------
+# The generators take ``k`` (0-based rank) plus ``key`` and ``reverse`` like
+# the sorts and leave ``arr`` partially ordered; their fast paths return the
+# answer without touching the input.
+
+
+def _partition3(arr, keys, less, low, high, pivot):
+    """Three-way partition of ``arr[low:high + 1]`` around key ``pivot``;
+    returns ``(lt, gt)``, the range now holding keys equal to it"""
+    lt, i, gt = low, low, high
+    while i <= gt:
+        yield arr, (i,), False
+        if less(keys[i], pivot):
+            _swap(arr, keys, lt, i)
+            yield arr, (lt, i), True
+            lt += 1
+            i += 1
+        elif less(pivot, keys[i]):
+            _swap(arr, keys, i, gt)
+            yield arr, (i, gt), True
+            gt -= 1
+        else:
+            i += 1
+    return lt, gt
+
+
+def _median_of_medians(keys, positions):
+    """The one of ``positions`` (indices into ``keys``) holding the median of
+    the medians of groups of five, a pivot that always discards at least
+    30% of them"""
+    while len(positions) > 5:
+        medians = []
+        for start in range(0, len(positions), 5):
+            group = sorted(positions[start : start + 5], key=keys.__getitem__)
+            medians.append(group[len(group) // 2])
+        positions = medians
+    return sorted(positions, key=keys.__getitem__)[len(positions) // 2]
+
+
+def _select(arr, k, key, reverse, depth_limit):
+    """Partition ``arr`` in place until ``arr[k]`` holds the value of rank
+    ``k``; switches to median-of-medians pivots after ``depth_limit``
+    rounds (0 means from the start)"""
+    if not 0 <= k < len(arr):
+        raise IndexError("k out of range")
+    keys, less = _decorate(arr, key, reverse)
+    low, high = 0, len(arr) - 1
+    rounds = 0
+    while low < high:
+        if rounds < depth_limit:
+            # Median of three keeps sorted and reversed input linear
+            mid = (low + high) // 2
+            trio = sorted((low, mid, high), key=keys.__getitem__)
+            pivot_index = trio[1]
+        else:
+            pivot_index = _median_of_medians(keys, range(low, high + 1))
+        rounds += 1
+        yield arr, (pivot_index,), False
+        lt, gt = yield from _partition3(arr, keys, less, low, high, keys[pivot_index])
+        if k < lt:
+            high = lt - 1
+        elif k > gt:
+            low = gt + 1
+        else:
+            break
+    yield arr, (k,), False
+    return arr[k]
+
+
+def quickselect(arr, k, key=None, reverse=False):
+    """
+    Quickselect with an introselect fallback (generator for visualization)
+    Partitions only the side holding rank k; after 2 log n rounds without
+    finishing it switches to median-of-medians pivots.
+    Time Complexity: O(n) expected, O(n) worst with the fallback
+    """
+    return (yield from _select(arr, k, key, reverse, 2 * len(arr).bit_length()))
+
+
+def median_of_medians(arr, k, key=None, reverse=False):
+    """
+    Median-of-medians selection (generator for visualization)
+    Every pivot is the median of the medians of groups of five.
+    Time Complexity: O(n) worst case
+    """
+    return (yield from _select(arr, k, key, reverse, 0))
+
+
+def heap_top_k(arr, k, key=None, reverse=False):
+    """
+    Heap-based top-k (generator for visualization)
+    Keeps the k smallest values seen so far in a max-heap in arr[:k], so each
+    later value costs one comparison with the root unless it displaces it;
+    the k values are then heap-sorted in place.
+    Time Complexity: O(n log k)
+    """
+    keys, less = _decorate(arr, key, reverse)
+    k = min(k, len(arr))
+
+    def sift_down(root, size):
+        while True:
+            child = 2 * root + 1
+            if child >= size:
+                return
+            if child + 1 < size and less(keys[child], keys[child + 1]):
+                child += 1
+            yield arr, (root, child), False
+            if not less(keys[root], keys[child]):
+                return
+            _swap(arr, keys, root, child)
+            yield arr, (root, child), True
+            root = child
+
+    for root in range(k // 2 - 1, -1, -1):
+        yield from sift_down(root, k)
+    for i in range(k, len(arr)):
+        yield arr, (0, i), False
+        if less(keys[i], keys[0]):
+            _swap(arr, keys, 0, i)
+            yield arr, (0, i), True
+            yield from sift_down(0, k)
+    for end in range(k - 1, 0, -1):
+        _swap(arr, keys, 0, end)
+        yield arr, (0, end), True
+        yield from sift_down(0, end)
+    return arr[:k]
+
+
+def _select_fast(values, k, key, reverse, depth_limit):
+    # Same pivots as the generators, but each round filters the surviving
+    # keys with a comparison comprehension, and short ranges are finished
+    # with ``sorted``. With a key, the selected key is then matched back to
+    # the values, taking equal keys in input order as ``sorted`` does.
+    values = list(values)
+    if not 0 <= k < len(values):
+        raise IndexError("k out of range")
+    keys = values if key is None else [key(value) for value in values]
+    remaining, rank, rounds = keys, k, 0
+    while len(remaining) > 32:
+        if rounds < depth_limit:
+            trio = remaining[0], remaining[len(remaining) // 2], remaining[-1]
+            pivot = sorted(trio)[1]
+        else:
+            positions = range(len(remaining))
+            pivot = remaining[_median_of_medians(remaining, positions)]
+        rounds += 1
+        if reverse:
+            lows = [item for item in remaining if item > pivot]
+        else:
+            lows = [item for item in remaining if item < pivot]
+        if rank < len(lows):
+            remaining = lows
+            continue
+        if reverse:
+            highs = [item for item in remaining if item < pivot]
+        else:
+            highs = [item for item in remaining if item > pivot]
+        if rank < len(remaining) - len(highs):
+            remaining = [pivot]
+            rank = 0
+            break
+        rank -= len(remaining) - len(highs)
+        remaining = highs
+    target = sorted(remaining, reverse=reverse)[rank]
+    if key is None:
+        return target
+    if reverse:
+        before = [item for item in keys if item > target]
+    else:
+        before = [item for item in keys if item < target]
+    ties = [value for value, item in zip(values, keys) if item == target]
+    return ties[k - len(before)]
+
+
+def quickselect_fast(values, k, key=None, reverse=False):
+    """``sorted(values, key=key, reverse=reverse)[k]`` in O(n) expected"""
+    return _select_fast(values, k, key, reverse, 2 * len(values).bit_length())
+
+
+def median_of_medians_fast(values, k, key=None, reverse=False):
+    """``sorted(values, key=key, reverse=reverse)[k]`` in O(n) worst case"""
+    return _select_fast(values, k, key, reverse, 0)
+
+
+def top_k_fast(values, k, key=None, reverse=False):
+    """``sorted(values, key=key, reverse=reverse)[:k]`` from one pass over
+    any iterable, holding only k values (and their keys) at a time"""
+    if reverse:
+        return heapq.nlargest(k, values, key=key)
+    return heapq.nsmallest(k, values, key=key)
+
+
 # Dictionary of all sorting algorithms
 SORTING_ALGORITHMS = {
     "Bubble Sort": bubble_sort,
@@ -147,6 +372,20 @@ SORTING_ALGORITHMS = {
     "Merge Sort": merge_sort,
 }
 
+# Selection algorithms: (arr, k, key=None, reverse=False) generators that
+# stop at a partial order, and their fast paths
+SELECTION_ALGORITHMS = {
+    "Quickselect": quickselect,
+    "Median of Medians": median_of_medians,
+    "Heap Top-k": heap_top_k,
+}
+
+SELECTION_FAST_PATHS = {
+    "Quickselect": quickselect_fast,
+    "Median of Medians": median_of_medians_fast,
+    "Heap Top-k": top_k_fast,
+}
+
 # Algorithm descriptions and complexities
 ALGORITHM_INFO = {
     "Bubble Sort": {
@@ -184,4 +423,25 @@ ALGORITHM_INFO = {
         "stable": True,
         "in_place": False,
     },
+    "Quickselect": {
+        "description": "Finds the k-th smallest value by partitioning like quick sort but only continuing into the side that holds position k; falls back to median-of-medians pivots (introselect) if the partitions keep coming out lopsided.",
+        "time_complexity": "O(n) expected",
+        "space_complexity": "O(1)",
+        "stable": False,
+        "in_place": True,
+    },
+    "Median of Medians": {
+        "description": "Selection whose pivot is the median of the medians of groups of five, which always discards at least 30% of the range and so guarantees linear time.",
+        "time_complexity": "O(n) worst case",
+        "space_complexity": "O(log n)",
+        "stable": False,
+        "in_place": True,
+    },
+    "Heap Top-k": {
+        "description": "Streams the values past a max-heap of the k smallest seen so far; a value only costs more than one comparison when it displaces the heap's root.",
+        "time_complexity": "O(n log k)",
+        "space_complexity": "O(k)",
+        "stable": False,
+        "in_place": True,
+    },
 }
@@ -1,13 +1,58 @@
 import tkinter as tk
+from tkinter import filedialog
 import ttkbootstrap as ttk
 import random
 import time
 import inspect  # For retrieving source code of algorithms
-import types  # Added to inspect generator types for DS operations
 import math  # Added for math.log2
 from ttkbootstrap.constants import *
-from algorithms.sorting import SORTING_ALGORITHMS, ALGORITHM_INFO
-from algorithms.data_structures import DATA_STRUCTURES, DATA_STRUCTURE_INFO
+from algorithms.sorting import (
+    SORTING_ALGORITHMS,
+    SELECTION_ALGORITHMS,
+    ALGORITHM_INFO,
+)
+from algorithms.data_structures import (
+    DATA_STRUCTURES,
+    DATA_STRUCTURE_INFO,
+    TOMBSTONE,
+    Frame,
+    OperationLog,
+    apply_operation,
+)
+from algorithms.graphs import (
+    CSRGraph,
+    GRAPH_ALGORITHMS,
+    GRAPH_ALGORITHM_INFO,
+    layered_layout,
+    sample_graph,
+)
+
+# Registry operations each button may run, by preference. The first one whose
+# arity matches the number of values typed wins (e.g. "3 7" inserts 7 at
+# index 3 in a sequence, joins two sets, or queries the range 3..7); with one
+# value, an operation taking none (pop, dequeue, peek) is the fallback.
+BUTTON_OPERATIONS = {
+    "insert": ["insert", "insert_at", "update", "union"],
+    "delete": ["delete", "delete_slice", "union"],
+    "search": ["search", "range_query", "range_sum", "query", "union"],
+}
+
+
+# Seed keys for structures with string keys (``KEY_TYPE is str``)
+SAMPLE_WORDS = (
+    "romane",
+    "romanus",
+    "romulus",
+    "rubens",
+    "ruber",
+    "rubicon",
+    "rubicundus",
+    "team",
+    "tea",
+    "test",
+    "toast",
+    "toaster",
+)
 
 
 class ToolTip:
@@ -57,9 +102,12 @@ class DSASimulator:
         self.master.geometry("1200x800")
 
         # State variables
-        self.current_mode = "sorting"  # "sorting" or "data_structures"
+        self.current_mode = "sorting"  # "sorting", "data_structures" or "graphs"
         self.current_algorithm = "Bubble Sort"
         self.current_data_structure = "Linked List"
+        self.current_graph_algorithm = "BFS"
+        self.graph = sample_graph()
+        self.graph_labels = None  # per-vertex labels from the last graph step
         self.data = [12, 8, 14, 19, 2, 7, 1, 3, 17, 4]
         self.data_structure = None
         self.sorting_generator = None
@@ -156,7 +204,7 @@ class DSASimulator:
         mode_combo = ttk.Combobox(
             mode_frame,
             textvariable=self.mode_var,
-            values=["Sorting Algorithms", "Data Structures"],
+            values=["Sorting Algorithms", "Data Structures", "Graph Algorithms"],
             state="readonly",
             width=20,
         )
@@ -174,13 +222,34 @@ class DSASimulator:
         self.algo_combo = ttk.Combobox(
             self.algo_frame,
             textvariable=self.algo_var,
-            values=list(SORTING_ALGORITHMS.keys()),
+            values=list(SORTING_ALGORITHMS) + list(SELECTION_ALGORITHMS),
             state="readonly",
             width=15,
         )
         self.algo_combo.pack(side=tk.LEFT, padx=(5, 0))
         self.algo_combo.bind("<<ComboboxSelected>>", self.on_algorithm_change)
 
+        # Sort order (passed to the sorts as reverse=)
+        self.reverse_var = tk.BooleanVar(value=False)
+        self.reverse_check = ttk.Checkbutton(
+            self.algo_frame,
+            text="Descending",
+            variable=self.reverse_var,
+            bootstyle="round-toggle",
+        )
+        self.reverse_check.pack(side=tk.LEFT, padx=(10, 0))
+        ToolTip(self.reverse_check, "Sort from largest to smallest (stable)")
+
+        # Rank for the selection algorithms (blank: median, or n/3 for top-k)
+        ttk.Label(self.algo_frame, text="k:").pack(side=tk.LEFT, padx=(10, 0))
+        self.k_entry = ttk.Entry(self.algo_frame, width=5)
+        self.k_entry.pack(side=tk.LEFT, padx=(5, 0))
+        ToolTip(
+            self.k_entry,
+            "Rank (0-based) for Quickselect / Median of Medians, count for "
+            "Heap Top-k; blank picks the median (a third of n for top-k)",
+        )
+
         # Control buttons
         button_frame = ttk.Frame(control_frame)
         button_frame.pack(side=tk.RIGHT)
@@ -490,12 +559,24 @@ class DSASimulator:
         mode = self.mode_var.get()
         if mode == "Sorting Algorithms":
             self.current_mode = "sorting"
-            self.algo_combo.configure(values=list(SORTING_ALGORITHMS.keys()))
+            self.algo_combo.configure(
+                values=list(SORTING_ALGORITHMS) + list(SELECTION_ALGORITHMS)
+            )
             self.algo_var.set("Bubble Sort")
+        elif mode == "Graph Algorithms":
+            self.current_mode = "graphs"
+            self.algo_combo.configure(values=list(GRAPH_ALGORITHMS.keys()))
+            self.algo_var.set(self.current_graph_algorithm)
         else:
             self.current_mode = "data_structures"
             self.algo_combo.configure(values=list(DATA_STRUCTURES.keys()))
             self.algo_var.set("Linked List")
+        self.reverse_check.configure(
+            state="normal" if self.current_mode == "sorting" else "disabled"
+        )
+        self.k_entry.configure(
+            state="normal" if self.current_mode == "sorting" else "disabled"
+        )
 
         self.update_info_panel()
         self.update_explanation(
@@ -507,6 +588,8 @@ class DSASimulator:
         """Handle algorithm/data structure change"""
         if self.current_mode == "sorting":
             self.current_algorithm = self.algo_var.get()
+        elif self.current_mode == "graphs":
+            self.current_graph_algorithm = self.algo_var.get()
         else:
             self.current_data_structure = self.algo_var.get()
             self.setup_data_structure()
@@ -525,7 +608,7 @@ class DSASimulator:
         # If actively sorting and not paused, re-schedule with new speed immediately
         if self.sorting and not self.paused and self.after_id:
             self.master.after_cancel(self.after_id)
-            self.after_id = self.master.after(self.animation_speed, self.sorting_step)
+            self.after_id = self.master.after(self.animation_speed, self.current_step)
 
     def on_theme_change(self, event=None):
         """Handle theme change from the theme switcher"""
@@ -547,6 +630,16 @@ Time Complexity: {info["time_complexity"]}
 Space Complexity: {info["space_complexity"]}
 Stable: {"Yes" if info["stable"] else "No"}
 In-Place: {"Yes" if info["in_place"] else "No"}"""
+        elif self.current_mode == "graphs":
+            info = GRAPH_ALGORITHM_INFO[self.current_graph_algorithm]
+            text = f"""Algorithm: {self.current_graph_algorithm}
+
+Description:
+{info["description"]}
+
+Time Complexity: {info["time_complexity"]}
+Space Complexity: {info["space_complexity"]}
+Graph: {self.graph.num_vertices} vertices, {self.graph.num_edges} edges (CSR)"""
         else:
             info = DATA_STRUCTURE_INFO[self.current_data_structure]
             text = f"""Data Structure: {self.current_data_structure}
@@ -566,7 +659,11 @@ Time Complexity:
         # Update example code snippet
         try:
             if self.current_mode == "sorting":
-                obj = SORTING_ALGORITHMS[self.current_algorithm]
+                obj = SORTING_ALGORITHMS.get(self.current_algorithm) or (
+                    SELECTION_ALGORITHMS[self.current_algorithm]
+                )
+            elif self.current_mode == "graphs":
+                obj = GRAPH_ALGORITHMS[self.current_graph_algorithm]
             else:
                 obj = DATA_STRUCTURES[self.current_data_structure]
 
@@ -584,41 +681,67 @@ Time Complexity:
     def setup_data_structure(self):
         """Initialize the current data structure"""
         ds_class = DATA_STRUCTURES[self.current_data_structure]
-        self.data_structure = ds_class()
 
-        # Seed with a few random elements so visualization isn't empty
+        # Seed with a few random elements so visualization isn't empty; the
+        # bulk loader builds the structure in one pass without animation steps
         sample_count = 7  # Increased from 4 for more substantial structures
-        for _ in range(sample_count):
-            val = random.randint(1, 20)
-            # Try the common insertion methods
-            for method_name in ("insert", "push", "enqueue", "insert_at_end"):
-                if hasattr(self.data_structure, method_name):
-                    method = getattr(self.data_structure, method_name)
-                    # Call with generator support but ignore yields here
-                    res = method(val)
-                    if isinstance(res, types.GeneratorType):
-                        list(res)
-                    break
+        values = [random.randint(1, 20) for _ in range(sample_count)]
+        if ds_class.KEY_TYPE is str:
+            values = random.sample(SAMPLE_WORDS, sample_count)
+        if self.current_data_structure in ("Fenwick Tree", "Segment Tree"):
+            # Range-query trees index the array shown in sorting mode
+            values = list(self.data) or values
+        options = {}
+        if self.current_data_structure in ("Binary Tree", "AVL Tree", "Red-Black Tree"):
+            options["order_statistics"] = True
+        self.data_structure = ds_class.from_iterable(values, **options)
+        self.resolve_ds_operations()
+
+        # Join a few of the seeded sets so there are parent pointers to show
+        union = self.ds_operations.get("union")
+        if union:
+            elements = self.data_structure.to_array()
+            for _ in range(len(elements) // 2):
+                apply_operation(union, random.sample(elements, 2))
+
+        # Record user operations from the seeded state on, for undo / redo
+        self.ds_log = OperationLog(self.data_structure)
 
         # Immediately draw the seeded structure
         self.draw_visualization()
 
+    def resolve_ds_operations(self):
+        """Map each button and value count to a bound registry operation once,
+        when the structure is selected"""
+        operations = self.data_structure.operations()
+        self.ds_operations = operations
+        self.ds_dispatch = {}
+        for button, names in BUTTON_OPERATIONS.items():
+            candidates = [operations[name] for name in names if name in operations]
+            for count in (1, 2):
+                match = next((op for op in candidates if op.arity == count), None)
+                if match is None and count == 1:
+                    match = next((op for op in candidates if op.arity == 0), None)
+                if match is not None:
+                    self.ds_dispatch[button, count] = match
+
     def generate_random_data(self):
         """Generate random data for visualization"""
         if self.current_mode == "sorting":
             size = random.randint(5, 15)
             self.data = [random.randint(1, 20) for _ in range(size)]
+        elif self.current_mode == "graphs":
+            self.graph = CSRGraph.grid(3, 4, weights=lambda u, v: random.randint(1, 9))
+            self.graph_labels = None
         else:
             # For data structures, add some random elements
-            if self.data_structure:
+            if self.data_structure and "insert" in self.ds_operations:
                 for _ in range(random.randint(3, 8)):
-                    value = random.randint(1, 20)
-                    if hasattr(self.data_structure, "insert"):
-                        self.data_structure.insert(value)
-                    elif hasattr(self.data_structure, "push"):
-                        self.data_structure.push(value)
-                    elif hasattr(self.data_structure, "enqueue"):
-                        self.data_structure.enqueue(value)
+                    if self.data_structure.KEY_TYPE is str:
+                        key = random.choice(SAMPLE_WORDS)
+                    else:
+                        key = random.randint(1, 20)
+                    self.ds_log.apply("insert", key)
 
         self.draw_visualization()
 
@@ -626,6 +749,13 @@ Time Complexity:
         """Start the visualization"""
         if self.sorting:
             return
+        if (
+            self.current_mode == "sorting"
+            and self.current_algorithm in SELECTION_ALGORITHMS
+        ):
+            self.rank = self.selection_k()
+            if self.rank is None:
+                return
 
         self.sorting = True
         self.paused = False
@@ -645,15 +775,46 @@ Time Complexity:
 
         if self.current_mode == "sorting":
             self.start_sorting_visualization()
+        elif self.current_mode == "graphs":
+            self.start_graph_visualization()
         else:
             self.start_ds_visualization()
 
     def start_sorting_visualization(self):
         """Start sorting algorithm visualization"""
-        algorithm = SORTING_ALGORITHMS[self.current_algorithm]
-        self.sorting_generator = algorithm(self.data.copy())
+        reverse = self.reverse_var.get()
+        if self.current_algorithm in SELECTION_ALGORITHMS:
+            algorithm = SELECTION_ALGORITHMS[self.current_algorithm]
+            k = self.rank
+            self.sorting_generator = algorithm(self.data.copy(), k, reverse=reverse)
+            self.update_explanation(
+                f"{self.current_algorithm} for k = {k}: only the part of the "
+                "array that can hold the answer is ordered"
+            )
+        else:
+            algorithm = SORTING_ALGORITHMS[self.current_algorithm]
+            self.sorting_generator = algorithm(self.data.copy(), reverse=reverse)
         self.sorting_step()
 
+    def selection_k(self):
+        """The k from the entry, or a default for the current algorithm;
+        None (after explaining why) when it is not a valid rank"""
+        text = self.k_entry.get().strip()
+        n = len(self.data)
+        if not text:
+            if self.current_algorithm == "Heap Top-k":
+                return max(1, n // 3)
+            return n // 2
+        try:
+            k = int(text)
+        except ValueError:
+            k = -1
+        limit = n if self.current_algorithm == "Heap Top-k" else n - 1
+        if not 0 <= k <= limit:
+            self.update_explanation(f"k must be a whole number from 0 to {limit}")
+            return None
+        return k
+
     def start_ds_visualization(self):
         """Run an automatic traversal / search to animate the current data structure"""
 
@@ -680,6 +841,21 @@ Time Complexity:
         self.pause_btn.configure(state="normal", text="⏸️ Pause")
         self.ds_step()
 
+    def start_graph_visualization(self):
+        """Animate the selected graph algorithm from the first to the last vertex"""
+        algorithm = GRAPH_ALGORITHMS[self.current_graph_algorithm]
+        target = self.graph.num_vertices - 1
+        self.ds_generator = algorithm(self.graph, 0, target)
+        self.update_explanation(f"{self.current_graph_algorithm} from 0 to {target}")
+        self.ds_step()
+
+    def current_step(self):
+        """Advance whichever animation belongs to the current mode"""
+        if self.current_mode == "sorting":
+            self.sorting_step()
+        else:
+            self.ds_step()
+
     def sorting_step(self):
         """Perform one step of sorting visualization"""
         try:
@@ -808,58 +984,91 @@ Time Complexity:
 
     def ds_operation(self, operation):
         """Perform data structure operation"""
-        if not self.data_structure:
+        if (
+            self.current_mode != "data_structures"
+            or not self.data_structure
+            or self.sorting
+        ):
             return
 
+        key_type = self.data_structure.KEY_TYPE
         try:
-            value = int(self.value_entry.get())
+            values = [key_type(part) for part in self.value_entry.get().split()]
         except ValueError:
             return
+        op = self.ds_dispatch.get((operation, len(values)))
+        if (
+            operation == "search"
+            and len(values) == 1
+            and str(values[0]).endswith("*")
+            and "prefix_search" in self.ds_operations
+        ):
+            # "rub*" lists every key starting with "rub"
+            op = self.ds_operations["prefix_search"]
+            values = [values[0][:-1]]
+        if op is None:
+            if values:
+                self.update_explanation(f"{operation.capitalize()} not supported.")
+            return
 
-        # Reset any previous ds generator
-        self.ds_generator = None
-        message_captured = ""
-
-        # Candidate method names for each generic operation
-        method_candidates = {
-            "insert": [
-                "insert",
-                "insert_at_end",
-                "insert_at_beginning",
-                "push",
-                "enqueue",
-            ],
-            "delete": [
-                "delete",
-                "delete_node",
-                "pop",
-                "dequeue",
-            ],
-            "search": [
-                "search",
-                "peek",  # treat peek as a read/search op
-            ],
-        }
-
-        for method_name in method_candidates.get(operation, []):
-            if hasattr(self.data_structure, method_name):
-                method = getattr(self.data_structure, method_name)
-                res = method(value) if method.__code__.co_argcount == 2 else method()
-                if isinstance(res, types.GeneratorType):
-                    self.ds_generator = res
-                    # Start animation loop
-                    self.sorting = True
-                    self.paused = False
-                    self.pause_btn.configure(state="normal", text="⏸️ Pause")
-                    self.ds_step()
-                else:
-                    # Non-generator immediate update
-                    self.draw_visualization()
-                    self.update_statistics()
-                return
+        values = values[: op.arity]
+        if op.method is None:
+            # Fast-path-only operations (undo / redo) redraw immediately
+            self.ds_log.apply(op.name, *values)
+            self.draw_visualization()
+            self.update_statistics()
+            return
+
+        self.ds_generator = self.ds_log.steps(op.name, *values)
+        self.sorting = True
+        self.paused = False
+        self.pause_btn.configure(state="normal", text="⏸️ Pause")
+        self.ds_step()
+
+    def ds_undo(self, redo=False):
+        """Undo (or redo) the last logged operation by applying its inverse"""
+        if self.current_mode != "data_structures" or self.sorting:
+            return
+        try:
+            done = self.ds_log.redo() if redo else self.ds_log.undo()
+        except ValueError as exc:
+            self.update_explanation(f"{exc}.")
+            return
+        if not done:
+            self.update_explanation(f"Nothing to {'redo' if redo else 'undo'}.")
+            return
+        self.draw_visualization()
+        self.update_statistics()
+        self.update_explanation(
+            f"{'Redid' if redo else 'Undid'} an operation "
+            f"({self.ds_log.position} of {len(self.ds_log.entries)} applied)."
+        )
 
-        # If no matching method found
-        self.update_explanation(f"{operation.capitalize()} not supported.")
+    def update_history_buttons(self):
+        """Grey out Undo / Redo when the log has nothing they can apply,
+        including calls whose operation has no inverse"""
+        if not hasattr(self, "undo_btn"):
+            return
+        idle = not self.sorting and self.data_structure is not None
+        for button, available in (
+            (self.undo_btn, idle and self.ds_log.can_undo()),
+            (self.redo_btn, idle and self.ds_log.can_redo()),
+        ):
+            button.configure(state="normal" if available else "disabled")
+
+    def save_ds_log(self):
+        """Save the logged operations for headless replay (workload.py)"""
+        if self.current_mode != "data_structures" or not self.data_structure:
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".jsonl",
+            filetypes=[("Operation log", "*.jsonl"), ("All files", "*.*")],
+        )
+        if path:
+            self.ds_log.save(path)
+            self.update_explanation(
+                f"Saved {self.ds_log.position} operations to {path}."
+            )
 
     def ds_step(self):
         """Animate data-structure operation generator"""
@@ -869,9 +1078,16 @@ Time Complexity:
         try:
             if self.ds_generator:
                 state, highlight, msg = next(self.ds_generator)
-                # state is already stored inside data structure; draw
-                self.draw_visualization(highlight)
-                self.update_statistics()
+                self.step_count += 1
+                frame = None
+                if self.current_mode == "graphs":
+                    # Graph algorithms keep their labels outside the graph
+                    self.graph_labels = state
+                else:
+                    # Draw the structure as the step saw it, not as it is now
+                    frame = state if isinstance(state, Frame) else Frame(data=state)
+                self.draw_visualization(highlight, frame=frame)
+                self.update_statistics(frame)
                 if msg:
                     self.update_explanation(msg)
 
@@ -899,14 +1115,15 @@ Time Complexity:
 
         # Draw one last time to clear highlights
         self.draw_visualization()
+        self.update_history_buttons()
         self.status_label.config(text="Animation Complete!")
 
         if self.after_id:
             self.master.after_cancel(self.after_id)
             self.after_id = None
 
-    def draw_visualization(self, highlight_indices=None, swapped=False):
-        """Draw the current state visualization"""
+    def draw_visualization(self, highlight_indices=None, swapped=False, frame=None):
+        """Draw the current state visualization, or ``frame`` of a step"""
         self.canvas.delete("all")
 
         # Draw gradient background
@@ -914,8 +1131,10 @@ Time Complexity:
 
         if self.current_mode == "sorting":
             self.draw_sorting_visualization(highlight_indices, swapped)
+        elif self.current_mode == "graphs":
+            self.draw_graph_visualization(highlight_indices)
         else:
-            self.draw_ds_visualization(highlight_indices)
+            self.draw_ds_visualization(highlight_indices, frame)
 
     def draw_gradient_bg(self):
         """Draw a vertical gradient background on the canvas for visual appeal."""
@@ -1023,12 +1242,13 @@ Time Complexity:
                 font=("Segoe UI", 11, "bold"),
             )
 
-    def draw_ds_visualization(self, highlight_indices=None):
+    def draw_ds_visualization(self, highlight_indices=None, frame=None):
         """Draw data structure visualization"""
         if not self.data_structure:
             return
 
-        data = self.data_structure.to_array()
+        frame = frame or self.data_structure.frame()
+        data = frame.data
         if not data:
             return
 
@@ -1038,12 +1258,30 @@ Time Complexity:
         node_color = "#4F8EF7"
         text_color = "white"
 
-        if self.current_data_structure in ("Binary Tree", "Binary Heap"):
+        if self.current_data_structure in (
+            "Binary Tree",
+            "Binary Heap",
+            "Persistent Heap",
+            "Segment Tree",
+            "AVL Tree",
+            "Red-Black Tree",
+        ):
             # Tree layout using array representation indices
             radius = 20
             level_height = 80
 
-            for idx, value in enumerate(data):
+            # Balanced trees list their nodes by heap index instead of
+            # padding the array out to every slot of the bottom level
+            nodes = getattr(frame, "nodes", None)
+            if nodes is None:
+                nodes = [(idx, value) for idx, value in enumerate(data)]
+
+            # Red-black trees colour each node; order-statistic trees label
+            # each node with its subtree size
+            colors = getattr(frame, "colors", None)
+            sizes = getattr(frame, "sizes", None)
+
+            for idx, value in nodes:
                 if value is None:
                     continue
 
@@ -1067,7 +1305,14 @@ Time Complexity:
 
                 # Highlight check
                 is_highlight = highlight_indices and idx in highlight_indices
-                base_color = "#E94F37" if is_highlight else node_color
+                if colors:
+                    base_color = (
+                        "#F7B32B"
+                        if is_highlight
+                        else ("#C0392B" if colors[idx] == "red" else "#2C3E50")
+                    )
+                else:
+                    base_color = "#E94F37" if is_highlight else node_color
                 top_c = _adjust(base_color, 1.2)
                 side_c = _adjust(base_color, 0.6)
 
@@ -1101,6 +1346,23 @@ Time Complexity:
                     outline="",
                 )
 
+                self.canvas.create_text(
+                    x,
+                    y,
+                    text=str(value),
+                    font=("Segoe UI", 10, "bold"),
+                    fill=text_color,
+                )
+                if sizes:
+                    self.canvas.create_text(
+                        x + radius + 4,
+                        y - radius,
+                        text=f"n={sizes[idx]}",
+                        font=("Segoe UI", 8),
+                        fill="#555",
+                        anchor="w",
+                    )
+
                 # Draw edge to parent
                 if idx != 0:
                     parent_idx = (idx - 1) // 2
@@ -1118,6 +1380,413 @@ Time Complexity:
                         fill="#333",
                         width=2,
                     )
+        elif self.current_data_structure == "Hash Table":
+            # Slot grid, wrapped into rows, with load factor and rehash status
+            cell_width = 56
+            cell_height = 40
+            per_row = max(1, (canvas_width - 100) // (cell_width + 14))
+
+            status = "Load factor {:.2f} / {:.2f}  •  {} slots  •  {} probing".format(
+                frame.load_factor, frame.max_load, frame.capacity, frame.probing
+            )
+            if frame.rehash:
+                status += "  •  rehashing {}/{} old buckets".format(*frame.rehash)
+            self.canvas.create_text(
+                50, 25, text=status, anchor=tk.W, font=("Segoe UI", 11, "bold")
+            )
+
+            for idx, value in enumerate(data):
+                row, col = divmod(idx, per_row)
+                x = 50 + col * (cell_width + 14)
+                y = 70 + row * (cell_height + 36)
+
+                is_highlight = highlight_indices and idx in highlight_indices
+                if is_highlight:
+                    fill = "#F7B32B"
+                elif value is None:
+                    fill = ""
+                elif value is TOMBSTONE:
+                    fill = "#9E9E9E"
+                else:
+                    fill = node_color
+
+                self.canvas.create_rectangle(
+                    x,
+                    y,
+                    x + cell_width,
+                    y + cell_height,
+                    fill=fill,
+                    outline="#333",
+                    dash=(3, 2) if value is None else None,
+                )
+                self.canvas.create_text(
+                    x + cell_width // 2,
+                    y - 9,
+                    text=str(idx),
+                    font=("Segoe UI", 8),
+                    fill="#555",
+                )
+                if value is not None:
+                    self.canvas.create_text(
+                        x + cell_width // 2,
+                        y + cell_height // 2,
+                        text=str(value),
+                        font=("Segoe UI", 12, "bold"),
+                        fill=text_color,
+                    )
+        elif self.current_data_structure == "Skip List":
+            # One lane per level, highest level on top, express links as arrows
+            lanes = frame.lanes
+            cell = 40
+            col_gap = 18
+            lane_gap = 56
+            head_x = 40
+            top_y = max(40, canvas_height // 2 - len(lanes) * lane_gap // 2)
+
+            def column_x(col):
+                return head_x + (col + 1) * (cell + col_gap)
+
+            for level in reversed(range(len(lanes))):
+                y = top_y + (len(lanes) - 1 - level) * lane_gap
+                self.canvas.create_rectangle(
+                    head_x, y, head_x + cell, y + cell, fill="#2C3E50", outline=""
+                )
+                self.canvas.create_text(
+                    head_x + cell // 2,
+                    y + cell // 2,
+                    text="L{}".format(level),
+                    font=("Segoe UI", 9, "bold"),
+                    fill=text_color,
+                )
+                prev_right = head_x + cell
+                for col in lanes[level]:
+                    x = column_x(col)
+                    self.canvas.create_line(
+                        prev_right,
+                        y + cell // 2,
+                        x,
+                        y + cell // 2,
+                        fill="#333",
+                        width=2,
+                        arrow=tk.LAST,
+                    )
+                    is_highlight = highlight_indices and col in highlight_indices
+                    self.canvas.create_rectangle(
+                        x,
+                        y,
+                        x + cell,
+                        y + cell,
+                        fill="#F7B32B" if is_highlight else node_color,
+                        outline="",
+                    )
+                    self.canvas.create_text(
+                        x + cell // 2,
+                        y + cell // 2,
+                        text=str(data[col]),
+                        font=("Segoe UI", 11, "bold"),
+                        fill=text_color,
+                    )
+                    prev_right = x + cell
+        elif self.current_data_structure == "B+ Tree":
+            # One row of pages per level; leaves are chained left to right
+            levels = frame.levels
+            key_width = 28
+            page_height = 34
+            level_height = 90
+            centers = {}
+
+            for depth, pages in enumerate(levels):
+                y = 50 + depth * level_height
+                gap = canvas_width // (len(pages) + 1)
+                for pos, (page_id, keys, children) in enumerate(pages):
+                    width = key_width * max(1, len(keys)) + 8
+                    x = gap * (pos + 1) - width // 2
+                    centers[page_id] = (x, y, width)
+                    is_highlight = highlight_indices and page_id in highlight_indices
+                    self.canvas.create_rectangle(
+                        x,
+                        y,
+                        x + width,
+                        y + page_height,
+                        fill="#F7B32B" if is_highlight else node_color,
+                        outline="#333",
+                    )
+                    for k, key in enumerate(keys):
+                        if k:
+                            kx = x + 4 + k * key_width
+                            self.canvas.create_line(
+                                kx, y, kx, y + page_height, fill="#333"
+                            )
+                        self.canvas.create_text(
+                            x + 4 + k * key_width + key_width // 2,
+                            y + page_height // 2,
+                            text=str(key),
+                            font=("Segoe UI", 10, "bold"),
+                            fill=text_color,
+                        )
+
+            # Parent-child edges
+            for pages in levels:
+                for page_id, keys, children in pages:
+                    px, py, pwidth = centers[page_id]
+                    for c, child in enumerate(children):
+                        cx, cy, cwidth = centers[child]
+                        self.canvas.create_line(
+                            px + 4 + c * key_width,
+                            py + page_height,
+                            cx + cwidth // 2,
+                            cy,
+                            fill="#333",
+                            width=2,
+                        )
+
+            # Leaf links used by range scans
+            leaves = levels[-1]
+            for (left_id, _, _), (right_id, _, _) in zip(leaves, leaves[1:]):
+                lx, ly, lwidth = centers[left_id]
+                rx, _, _ = centers[right_id]
+                self.canvas.create_line(
+                    lx + lwidth,
+                    ly + page_height // 2,
+                    rx,
+                    ly + page_height // 2,
+                    fill="#333",
+                    dash=(4, 2),
+                    arrow=tk.LAST,
+                )
+        elif self.current_data_structure == "LFU Cache":
+            # One row per access count; the next victim is the last key of
+            # the lowest row
+            cell = 44
+            row_gap = 60
+            buckets = frame.buckets
+            highlighted = {data[i] for i in highlight_indices or []}
+            top_y = max(30, canvas_height // 2 - len(buckets) * row_gap // 2)
+            for row, (count, keys) in enumerate(buckets):
+                y = top_y + row * row_gap
+                self.canvas.create_text(
+                    60,
+                    y + cell // 2,
+                    text="count {}".format(count),
+                    font=("Segoe UI", 10, "bold"),
+                    fill="#222",
+                )
+                for col, key in enumerate(keys):
+                    x = 110 + col * (cell + 12)
+                    is_highlight = key in highlighted
+                    is_victim = row == 0 and col == len(keys) - 1
+                    if is_highlight:
+                        fill = "#F7B32B"
+                    elif is_victim:
+                        fill = "#E94F37"
+                    else:
+                        fill = node_color
+                    self.canvas.create_rectangle(
+                        x, y, x + cell, y + cell, fill=fill, outline=""
+                    )
+                    self.canvas.create_text(
+                        x + cell // 2,
+                        y + cell // 2,
+                        text=str(key),
+                        font=("Segoe UI", 11, "bold"),
+                        fill=text_color,
+                    )
+        elif self.current_data_structure in ("Bloom Filter", "Count-Min Sketch"):
+            # Bits (or counters) as a grid; lit cells are set / non-zero
+            sketch = self.data_structure
+            show_counts = hasattr(sketch, "counters")
+            cols = sketch.width if show_counts else 16
+            rows = (len(data) + cols - 1) // cols
+            cell = max(14, min(40, (canvas_width - 100) // cols))
+            left = (canvas_width - cols * cell) // 2
+            top = max(30, (canvas_height - rows * cell) // 2)
+            for i, value in enumerate(data):
+                row, col = divmod(i, cols)
+                x, y = left + col * cell, top + row * cell
+                if highlight_indices and i in highlight_indices:
+                    fill = "#F7B32B"
+                elif value:
+                    fill = node_color
+                else:
+                    fill = "#E0E0E0"
+                self.canvas.create_rectangle(
+                    x, y, x + cell - 2, y + cell - 2, fill=fill, outline=""
+                )
+                if show_counts:
+                    self.canvas.create_text(
+                        x + cell // 2 - 1,
+                        y + cell // 2 - 1,
+                        text=str(value),
+                        font=("Segoe UI", 8, "bold"),
+                        fill=text_color if value else "#777",
+                    )
+        elif self.current_data_structure == "Disjoint Set":
+            # Elements in a row; each parent pointer is an arc to the parent
+            parents = frame.parents
+            ranks = frame.ranks
+            cell = 44
+            spacing = max(cell + 8, (canvas_width - 80) // max(1, len(data)))
+            y = canvas_height // 2 + 40
+
+            def cell_x(i):
+                return 40 + i * spacing
+
+            for i, parent in enumerate(parents):
+                if parent == i:
+                    continue
+                x1, x2 = cell_x(i) + cell // 2, cell_x(parent) + cell // 2
+                lift = 30 + abs(x2 - x1) // 4
+                is_highlight = (
+                    highlight_indices
+                    and i in highlight_indices
+                    and parent in highlight_indices
+                )
+                self.canvas.create_line(
+                    x1,
+                    y,
+                    (x1 + x2) / 2,
+                    y - lift,
+                    x2,
+                    y,
+                    smooth=True,
+                    fill="#E94F37" if is_highlight else "#333",
+                    width=3 if is_highlight else 2,
+                    arrow=tk.LAST,
+                )
+
+            for i, value in enumerate(data):
+                x = cell_x(i)
+                is_root = parents[i] == i
+                is_highlight = highlight_indices and i in highlight_indices
+                if is_highlight:
+                    fill = "#F7B32B"
+                elif is_root:
+                    fill = "#2C3E50"
+                else:
+                    fill = node_color
+                self.canvas.create_rectangle(
+                    x, y, x + cell, y + cell, fill=fill, outline=""
+                )
+                self.canvas.create_text(
+                    x + cell // 2,
+                    y + cell // 2,
+                    text=str(value),
+                    font=("Segoe UI", 11, "bold"),
+                    fill=text_color,
+                )
+                if is_root:
+                    self.canvas.create_text(
+                        x + cell // 2,
+                        y + cell + 12,
+                        text="rank {}".format(ranks[i]),
+                        font=("Segoe UI", 8),
+                        fill="#555",
+                    )
+        elif self.current_data_structure == "Rope":
+            # Values in order, with a frame around each chunk of the rope
+            element_width = 44
+            gap = 4
+            chunk_gap = 24
+            y = canvas_height // 2
+            x = 40
+            index = 0
+            for chunk in frame.chunks:
+                chunk_x = x
+                for value in chunk:
+                    is_highlight = highlight_indices and index in highlight_indices
+                    self.canvas.create_rectangle(
+                        x,
+                        y - 20,
+                        x + element_width,
+                        y + 20,
+                        fill="#E94F37" if is_highlight else node_color,
+                        outline="",
+                    )
+                    self.canvas.create_text(
+                        x + element_width // 2,
+                        y,
+                        text=str(value),
+                        font=("Segoe UI", 11, "bold"),
+                        fill=text_color,
+                    )
+                    x += element_width + gap
+                    index += 1
+                self.canvas.create_rectangle(
+                    chunk_x - 6,
+                    y - 28,
+                    x + 2,
+                    y + 28,
+                    outline="#2C3E50",
+                    width=2,
+                    dash=(4, 2),
+                )
+                self.canvas.create_text(
+                    chunk_x - 6,
+                    y + 40,
+                    text="@{}".format(index - len(chunk)),
+                    anchor="w",
+                    font=("Segoe UI", 8),
+                    fill="#555",
+                )
+                x += chunk_gap
+        elif self.current_data_structure == "Radix Tree":
+            # Leaves spread left to right in key order with parents centred
+            # over their children; edges carry their labels and nodes that
+            # end a key are filled
+            nodes = frame.layout
+            children = {}
+            depth = {}
+            for node_id, parent, _, _ in nodes:
+                children.setdefault(parent, []).append(node_id)
+                depth[node_id] = 0 if parent is None else depth[parent] + 1
+            leaves = [node_id for node_id, *_ in nodes if node_id not in children]
+            gap = canvas_width / (len(leaves) + 1)
+            xs = {node_id: gap * (i + 1) for i, node_id in enumerate(leaves)}
+            for node_id, *_ in reversed(nodes):
+                if node_id not in xs:
+                    kids = children[node_id]
+                    xs[node_id] = (xs[kids[0]] + xs[kids[-1]]) / 2
+            level_height = min(80, (canvas_height - 80) / (max(depth.values()) + 1))
+            ys = {
+                node_id: 40 + level * level_height for node_id, level in depth.items()
+            }
+            radius = 12
+            highlighted = set(highlight_indices or ())
+
+            for node_id, parent, label, _ in nodes:
+                if parent is None:
+                    continue
+                on_path = node_id in highlighted and parent in highlighted
+                self.canvas.create_line(
+                    xs[parent],
+                    ys[parent],
+                    xs[node_id],
+                    ys[node_id],
+                    fill="#E94F37" if on_path else "#333",
+                    width=3 if on_path else 2,
+                )
+                self.canvas.create_text(
+                    (xs[parent] + xs[node_id]) / 2 + 6,
+                    (ys[parent] + ys[node_id]) / 2,
+                    text=label,
+                    anchor="w",
+                    font=("Segoe UI", 9, "bold"),
+                    fill="#2C3E50",
+                )
+
+            for node_id, _, _, is_key in nodes:
+                if node_id in highlighted:
+                    fill = "#F7B32B"
+                else:
+                    fill = node_color if is_key else "#D5DBE5"
+                self.canvas.create_oval(
+                    xs[node_id] - radius,
+                    ys[node_id] - radius,
+                    xs[node_id] + radius,
+                    ys[node_id] + radius,
+                    fill=fill,
+                    outline="#333",
+                )
         else:
             # Linear structures (Array, Stack, Queue, Linked List)
             element_width = 60
@@ -1201,7 +1870,67 @@ Time Complexity:
                         arrow=tk.LAST,
                     )
 
-    def update_statistics(self):
+    def draw_graph_visualization(self, highlight_indices=None):
+        """Draw the graph with a layered layout and per-vertex labels"""
+        canvas_width = self.canvas.winfo_width() or 800
+        canvas_height = self.canvas.winfo_height() or 400
+        radius = 18
+        margin = 60
+
+        positions = [
+            (
+                margin + x * (canvas_width - 2 * margin),
+                margin + y * (canvas_height - 2 * margin),
+            )
+            for x, y in layered_layout(self.graph)
+        ]
+        labels = self.graph_labels or [None] * self.graph.num_vertices
+
+        for u, v, weight in self.graph.edge_list():
+            (x1, y1), (x2, y2) = positions[u], positions[v]
+            length = math.hypot(x2 - x1, y2 - y1) or 1
+            dx, dy = (x2 - x1) / length * radius, (y2 - y1) / length * radius
+            active = bool(highlight_indices) and {u, v} <= set(highlight_indices)
+            self.canvas.create_line(
+                x1 + dx,
+                y1 + dy,
+                x2 - dx,
+                y2 - dy,
+                fill="#E94F37" if active else "#333",
+                width=3 if active else 1.5,
+                arrow=tk.LAST,
+            )
+            self.canvas.create_text(
+                (x1 + x2) / 2 + 8,
+                (y1 + y2) / 2 - 8,
+                text=f"{weight:g}",
+                font=("Segoe UI", 8),
+                fill="#555",
+            )
+
+        for v, (x, y) in enumerate(positions):
+            if highlight_indices and v in highlight_indices:
+                fill = "#F7B32B"
+            elif labels[v] is not None:
+                fill = "#4CAF50"
+            else:
+                fill = "#4F8EF7"
+            self.canvas.create_oval(
+                x - radius, y - radius, x + radius, y + radius, fill=fill, outline=""
+            )
+            self.canvas.create_text(
+                x, y, text=str(v), font=("Segoe UI", 10, "bold"), fill="white"
+            )
+            if labels[v] is not None:
+                self.canvas.create_text(
+                    x,
+                    y + radius + 10,
+                    text=str(labels[v]),
+                    font=("Segoe UI", 9, "bold"),
+                    fill="#222",
+                )
+
+    def update_statistics(self, frame=None):
         """Update the statistics display"""
         self.stats_text.delete(1.0, tk.END)
 
@@ -1210,14 +1939,43 @@ Time Complexity:
 Comparisons: {self.comparisons}
 Swaps: {self.swaps}
 Array Size: {len(self.data)}"""
+        elif self.current_mode == "graphs":
+            visited = sum(label is not None for label in self.graph_labels or [])
+            stats = f"""Steps: {self.step_count}
+Vertices: {self.graph.num_vertices}
+Edges: {self.graph.num_edges}
+Labelled vertices: {visited}"""
         else:
             if self.data_structure:
-                data = self.data_structure.to_array()
+                data = (frame or self.data_structure.frame()).data
                 stats = f"""Elements: {len(data)}
 Data Structure: {self.current_data_structure}
 Current State: {data}"""
+                memory = self.data_structure.memory_usage()
+                stats += f"""
+Memory: {memory:,} bytes"""
+                if data:
+                    stats += f" ({memory / len(data):,.1f} per element)"
+                if hasattr(self.data_structure, "hit_rate"):
+                    cache = self.data_structure
+                    stats += f"""
+Capacity: {cache.capacity}
+Hits / Misses: {cache.hits} / {cache.misses} ({cache.hit_rate:.0%})
+Evictions: {cache.evictions}"""
+                if hasattr(self.data_structure, "expected_fpr"):
+                    bloom = self.data_structure
+                    stats += f"""
+Bits set: {bloom.fill_ratio():.0%}
+Expected false positive rate: {bloom.expected_fpr():.2%}"""
+                if data and hasattr(self.data_structure, "min"):
+                    try:
+                        stats += f"""
+Min / Max: {self.data_structure.min()} / {self.data_structure.max()}"""
+                    except TypeError:
+                        pass
             else:
                 stats = "No data structure initialized"
+            self.update_history_buttons()
 
         self.stats_text.insert(1.0, stats)
 
@@ -1246,6 +2004,8 @@ Current State: {data}"""
 
         if self.current_mode == "sorting":
             self.data = [12, 8, 14, 19, 2, 7, 1, 3, 17, 4]
+        elif self.current_mode == "graphs":
+            self.graph_labels = None
         else:
             self.setup_data_structure()
 
@@ -1274,17 +2034,21 @@ Current State: {data}"""
             # kick off with current speed
             if self.after_id:
                 self.master.after_cancel(self.after_id)
-            self.after_id = self.master.after(self.animation_speed, self.sorting_step)
+            self.after_id = self.master.after(self.animation_speed, self.current_step)
 
     def add_value(self):
         """Append a new value to the array when in sorting mode."""
         if self.current_mode != "sorting" or self.sorting:
             return
 
+        text = self.add_value_entry.get().strip()
         try:
-            val = int(self.add_value_entry.get())
+            val = int(text)
         except ValueError:
-            return
+            try:
+                val = float(text)  # the sorts take any comparable values
+            except ValueError:
+                return
 
         self.data.append(val)
         self.draw_visualization()
@@ -1450,6 +2214,44 @@ Current State: {data}"""
         self.op_btn3.pack(side=tk.LEFT)
         ToolTip(self.op_btn3, "Search for a value in the data structure")
 
+        # History buttons
+        log_frame = ttk.Frame(self.ds_controls_frame)
+        log_frame.pack(fill=tk.X, pady=(8, 0))
+
+        self.undo_btn = ttk.Button(
+            log_frame,
+            text="↶ Undo",
+            command=self.ds_undo,
+            width=10,
+            bootstyle="secondary-outline rounded",
+        )
+        self.undo_btn.pack(side=tk.LEFT, padx=(0, 8))
+        ToolTip(
+            self.undo_btn,
+            "Undo the last operation by applying its inverse "
+            "(unavailable after operations that have none)",
+        )
+
+        self.redo_btn = ttk.Button(
+            log_frame,
+            text="↷ Redo",
+            command=lambda: self.ds_undo(redo=True),
+            width=10,
+            bootstyle="secondary-outline rounded",
+        )
+        self.redo_btn.pack(side=tk.LEFT, padx=(0, 8))
+        ToolTip(self.redo_btn, "Re-apply the last undone operation")
+
+        self.save_log_btn = ttk.Button(
+            log_frame,
+            text="💾 Save Log",
+            command=self.save_ds_log,
+            width=10,
+            bootstyle="secondary-outline rounded",
+        )
+        self.save_log_btn.pack(side=tk.LEFT)
+        ToolTip(self.save_log_btn, "Save the operations for replay with workload.py")
+
         # Focus highlight for DS controls and entry
         def _apply_focus_highlight(widget):
             try:
@@ -1462,7 +2264,14 @@ Current State: {data}"""
             except tk.TclError:
                 widget.configure(takefocus=True)
 
-        for _btn in [self.op_btn1, self.op_btn2, self.op_btn3]:
+        for _btn in [
+            self.op_btn1,
+            self.op_btn2,
+            self.op_btn3,
+            self.undo_btn,
+            self.redo_btn,
+            self.save_log_btn,
+        ]:
             _apply_focus_highlight(_btn)
 
         _apply_focus_highlight(self.value_entry)
@@ -1484,4 +2293,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,217 @@
+"""Headless YCSB-style workloads for the data structures.
+
+A workload is a list of ``(operation, key)`` pairs, either generated from a
+mix such as ``search=70,insert=20,delete=10`` over uniform or Zipf keys, or
+read from a script: one ``operation key`` pair per line, or an operation log
+saved from the visualizer. The runner drives any ``DATA_STRUCTURES`` class
+through the fast (non-generator) paths of its operation registry and reports
+throughput and p50 / p99 / p99.9 latency per operation.
+
+    python workload.py "Hash Table" --mix search=70,insert=20,delete=10 \\
+        --keys zipf --preload 100000 --count 1000000
+"""
+
+import argparse
+import gc
+import random
+import time
+from collections import deque
+
+from benchmarks import build_structure, percentile, zipf_trace
+from data_structures import DATA_STRUCTURES, OperationLog
+
+
+def resolve(operations, name, steps=False):
+    """``(call, label)`` where ``call(key)`` runs the registry operation
+    ``name`` from ``structure.operations()``.
+
+    Operations that take no value (pop, dequeue) ignore the key. Without a
+    fast path the step generator is drained, but only when ``steps`` is set;
+    otherwise (or for operations taking several values) returns
+    ``(None, None)``.
+    """
+    op = operations.get(name)
+    if op is None or op.arity > 1:
+        return None, None
+    if op.fast is not None:
+        target, label = op.fast, op.fast.__name__
+    elif steps and op.method is not None:
+        target = lambda *values: deque(op.method(*values), maxlen=0)
+        label = op.method.__name__ + " (steps)"
+    else:
+        return None, None
+    if op.arity == 0:
+        return lambda key: target(), label
+    return target, label
+
+
+def parse_mix(text):
+    """``"search=70,insert=20,delete=10"`` -> ``{"search": 0.7, ...}``"""
+    weights = {}
+    for part in text.split(","):
+        operation, _, weight = part.partition("=")
+        weights[operation.strip()] = float(weight)
+    total = sum(weights.values())
+    return {operation: weight / total for operation, weight in weights.items()}
+
+
+def generate_workload(
+    mix, count, keyspace, distribution="uniform", exponent=0.99, seed=0
+):
+    """``count`` operations drawn from ``mix``.
+
+    Searches and deletes pick keys from ``range(keyspace)`` (the preloaded
+    keys) uniformly or with Zipf skew; inserts add new keys past the end of
+    the key space, as YCSB does.
+    """
+    rng = random.Random(seed)
+    operations = rng.choices(list(mix), weights=list(mix.values()), k=count)
+    if distribution == "zipf":
+        keys = zipf_trace(keyspace, count, exponent, seed)
+    elif distribution == "uniform":
+        keys = [rng.randrange(keyspace) for _ in range(count)]
+    else:
+        raise ValueError("unknown key distribution {!r}".format(distribution))
+    fresh = keyspace
+    workload = []
+    for operation, key in zip(operations, keys):
+        if operation == "insert":
+            key, fresh = fresh, fresh + 1
+        workload.append((operation, key))
+    return workload
+
+
+def read_script(path):
+    """Workload from a saved ``OperationLog`` or a file of ``operation key``
+    lines; calls taking no value get key None"""
+    return [
+        (name, values[0] if values else None)
+        for name, values in OperationLog.load(path)
+    ]
+
+
+def run_workload(structure, workload, steps=False):
+    """Replay ``workload``; returns ``{operation: (method, sorted latencies
+    in ns)}`` and the total seconds spent inside the operations.
+    Operations the structure has no fast path for are skipped (and absent
+    from the results) unless ``steps`` allows the step generators."""
+    calls = {}
+    operations = structure.operations()
+    for operation in {operation for operation, _ in workload}:
+        call, name = resolve(operations, operation, steps)
+        if call is not None:
+            calls[operation] = (call, name, [])
+
+    perf_counter_ns = time.perf_counter_ns
+    gc.disable()  # keep collector pauses out of the tail
+    try:
+        for operation, key in workload:
+            entry = calls.get(operation)
+            if entry is None:
+                continue
+            call, _, samples = entry
+            t0 = perf_counter_ns()
+            try:
+                call(key)
+            except (KeyError, IndexError):
+                pass  # a miss (e.g. deleting an absent key) still counts
+            samples.append(perf_counter_ns() - t0)
+    finally:
+        gc.enable()
+
+    results = {}
+    total = 0
+    for operation, (_, name, samples) in calls.items():
+        samples.sort()
+        total += sum(samples)
+        results[operation] = (name, samples)
+    return results, total / 1e9
+
+
+def format_results(label, results, seconds, operations=()):
+    count = sum(len(samples) for _, samples in results.values())
+    lines = [
+        "{} ({:,} ops, {:,.0f} ops/sec; latencies in microseconds)".format(
+            label, count, count / seconds if seconds else 0
+        )
+    ]
+    lines.append(
+        "{:<12}{:>10}{:>12}{:>9}{:>9}{:>9}{:>10}  {}".format(
+            "op", "count", "ops/sec", "p50", "p99", "p99.9", "max", "via"
+        )
+    )
+    for operation in sorted(set(operations) - set(results)):
+        lines.append("{:<12}{:>10}  no fast path".format(operation, "-"))
+    for operation, (name, samples) in sorted(results.items()):
+        if not samples:
+            continue
+        lines.append(
+            "{:<12}{:>10,}{:>12,.0f}{:>9.2f}{:>9.2f}{:>9.2f}{:>10.1f}  {}".format(
+                operation,
+                len(samples),
+                len(samples) / (sum(samples) / 1e9),
+                percentile(samples, 0.50) / 1000,
+                percentile(samples, 0.99) / 1000,
+                percentile(samples, 0.999) / 1000,
+                samples[-1] / 1000,
+                name,
+            )
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "structures",
+        nargs="*",
+        help="structures to drive (default: all): {}".format(
+            ", ".join(DATA_STRUCTURES)
+        ),
+    )
+    parser.add_argument("--mix", default="search=70,insert=20,delete=10")
+    parser.add_argument("--keys", choices=("uniform", "zipf"), default="uniform")
+    parser.add_argument("--exponent", type=float, default=0.99)
+    parser.add_argument("--preload", type=int, default=10_000)
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument(
+        "--script", help="replay operations (or a saved operation log) from this file"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--steps",
+        action="store_true",
+        help="fall back to the (slow) step generators when there is no fast path",
+    )
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.structures if name not in DATA_STRUCTURES]
+    if unknown:
+        parser.error("unknown structure(s): {}".format(", ".join(unknown)))
+
+    if args.script:
+        workload = read_script(args.script)
+    else:
+        workload = generate_workload(
+            parse_mix(args.mix),
+            args.count,
+            args.preload,
+            args.keys,
+            args.exponent,
+            args.seed,
+        )
+    preload = random.Random(args.seed).sample(range(args.preload), args.preload)
+    for name in args.structures or DATA_STRUCTURES:
+        structure = build_structure(name, preload)
+        key_type = structure.KEY_TYPE
+        keyed = [
+            (operation, key if key is None else key_type(key))
+            for operation, key in workload
+        ]
+        results, seconds = run_workload(structure, keyed, args.steps)
+        operations = {operation for operation, _ in workload}
+        print(format_results(name, results, seconds, operations))
+        print()
+
+
+if __name__ == "__main__":
+    main()